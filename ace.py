@@ -1,7 +1,14 @@
+import atexit
+import os
 import random
 import re
 from itertools import combinations
 
+from analysis_cache import AnalysisCache, hand_key
+from hand_strength import HAND_SIZE, describe, hand_strength
+from replay_log import RotatingReplayWriter
+from speculation import Speculator
+
 class Card:
     suits = ['Spades', 'Hearts', 'Diamonds', 'Clubs']
     values = {
@@ -160,6 +167,11 @@ class BalatroPoker:
             'round_number': 1,
             'deck': []
         }
+        self.combo_cache = AnalysisCache(10000)
+        # Analyses of the likely next hands are computed while the menu waits for input
+        self.speculator = Speculator(self, self.find_combos)
+        self.recorder = None  # Optional replay_log.RotatingReplayWriter
+        self.replay_round = 0
 
     def start_round(self):
         self.game_state = {
@@ -174,6 +186,9 @@ class BalatroPoker:
         }
         for _ in range(8):
             self.deal_card()
+        if self.recorder is not None:
+            self.replay_round = self.recorder.new_round()
+            self.recorder.log_deal(self.replay_round, self.game_state['hand'])
 
     def initialize_deck(self):
         deck = []
@@ -191,6 +206,7 @@ class BalatroPoker:
             print("Deck is empty! No more cards to deal.")
 
     def play_combo(self, combo_cards):
+        self.speculator.cancel()
         removed = []
         hand = self.game_state['hand']
         # Filter combo_cards that are present in the hand
@@ -213,6 +229,9 @@ class BalatroPoker:
             chip_sum = sum(c.chip_value for c in removed)
             score = (base + chip_sum) * mult
             self.game_state['current_points'] += score
+            if self.recorder is not None:
+                self.recorder.log_play(self.replay_round, removed, combo_info['name'], score,
+                                       self.game_state['current_points'])
             print(f"Played {combo_info['name']} and earned {score} points!")
         else:
             print("No valid combo recognized! No points awarded.")
@@ -232,6 +251,7 @@ class BalatroPoker:
         return {'name': 'High Card', 'score': {'base':5, 'mult':1}}
 
     def discard_cards(self, indices):
+        self.speculator.cancel()
         hand = self.game_state['hand']
         discarded = []
         indices = list(indices)
@@ -246,6 +266,8 @@ class BalatroPoker:
         needed = 8 - len(hand)
         for _ in range(needed):
             self.deal_card()
+        if self.recorder is not None:
+            self.recorder.log_discard(self.replay_round, discarded, self.game_state['current_points'])
         print(f"Discarded {len(discarded)} cards.")
 
     def check_hand(self):
@@ -263,11 +285,12 @@ class BalatroPoker:
         for card in self.game_state['played_cards']:
             print(card)
 
-    def analyze_hand(self):
-        hand = self.game_state['hand']
-        if not hand:
-            print("No cards in hand to analyze.")
-            return
+    def find_combos(self, hand):
+        """All combos of hand sorted by score, cached by hand"""
+        key = hand_key(hand)
+        cached = self.combo_cache.get(key)
+        if cached is not None:
+            return cached
 
         all_combos = []
         # Evaluate each combo definition with its required card count
@@ -315,6 +338,16 @@ class BalatroPoker:
 
         # Sort by score descending, then by name ascending
         unique_combos.sort(key=lambda x: (-x['score'], x['name']))
+        self.combo_cache.put(key, unique_combos)
+        return unique_combos
+
+    def analyze_hand(self):
+        hand = self.game_state['hand']
+        if not hand:
+            print("No cards in hand to analyze.")
+            return
+
+        unique_combos = self.find_combos(hand)
 
         # Display the results
         print("\nPossible Combos:")
@@ -337,6 +370,9 @@ class BalatroPoker:
         else:
             print("\nNo valid combos found.")
 
+        if len(hand) == HAND_SIZE:
+            print(describe(hand_strength(hand, self.COMBO_DEFINITIONS, self.game_state['required_points'])))
+
     def show_combo_scores(self):
         print("\nCombo Scores:")
         for combo_def in self.COMBO_DEFINITIONS:
@@ -363,6 +399,7 @@ class BalatroPoker:
             print("7. Show combo scores")
             print("8. Reset round")
             print("9. Quit")
+            self.speculator.schedule()
             choice = input("Enter your choice (1-9): ").strip()
 
             if choice == '1':
@@ -406,4 +443,8 @@ class BalatroPoker:
 
 if __name__ == "__main__":
     game = BalatroPoker()
+    # Set ACELATRO_REPLAY_DIR to log every deal, play and discard there (read it with replay_stats.py)
+    if os.environ.get('ACELATRO_REPLAY_DIR'):
+        game.recorder = RotatingReplayWriter(os.environ['ACELATRO_REPLAY_DIR'], game.COMBO_DEFINITIONS)
+        atexit.register(game.recorder.close)
     game.main_loop()
\ No newline at end of file
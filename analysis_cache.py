@@ -0,0 +1,88 @@
+# Cache hasil analisis hand, dipakai bersama oleh engine dan recommendation server
+import threading
+from collections import OrderedDict
+from card_codes import card_id
+from multiset import multiset_key
+
+
+class AnalysisCache:
+    """Bounded LRU cache for analysis results, keyed by canonical card-id tuples.
+
+    Safe to share with a background thread (speculation.Speculator).
+    """
+
+    def __init__(self, max_entries=100000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, value):
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, key):
+        return key in self.entries
+
+
+def hand_key(cards):
+    """Order-independent key for a hand (analysis does not depend on card order)"""
+    return ('analyze',) + multiset_key(cards)
+
+
+def pack_combos(combos):
+    """Analysis result (list of combo dicts) -> hand-independent tuples of card ids"""
+    return tuple(
+        (combo['name'], tuple(card_id(c) for c in combo['cards']), combo['score'])
+        for combo in combos
+    )
+
+
+def unpack_combos(packed, hand):
+    """Rebuild combo dicts from packed tuples, pointing at the card objects in hand.
+
+    With several copies of a card in hand, a combo holding it n times gets the
+    first n copies, and 'count' is the number of ways to pick them.
+    """
+    by_id = {}
+    for c in hand:
+        by_id.setdefault(card_id(c), []).append(c)
+    combos = []
+    for name, ids, score in packed:
+        taken = {}
+        cards = []
+        count = 1
+        for cid in ids:
+            copies = by_id[cid]
+            used = taken.get(cid, 0)
+            cards.append(copies[used])
+            taken[cid] = used + 1
+            count = count * (len(copies) - used) // (used + 1)
+        combos.append({'name': name, 'cards': tuple(cards), 'score': score, 'count': count})
+    return combos
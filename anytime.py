@@ -0,0 +1,136 @@
+# Anytime recommendation: selalu ada jawaban dalam batas waktu, makin dalam kalau waktunya cukup
+import threading
+import time
+
+from planner import PLAYS_PER_ROUND, DISCARDS_PER_ROUND, RoundPlanner, SearchAborted
+
+
+def snapshot(game):
+    """Copy what a background search needs, so the UI can keep mutating game_state"""
+    state = game.game_state
+    return {
+        'hand': list(state['hand']),
+        'deck': list(state['deck']),
+        'current_points': state['current_points'],
+        'required_points': state['required_points'],
+        'discard_count': state['discard_count']
+    }
+
+
+def fallback_recommendation(game):
+    """Instant answer from analyze_hand(): play the highest-scoring combo"""
+    combos = game.analyze_hand()
+    if not combos:
+        return None
+    best = combos[0]
+    return {
+        'action': 'play',
+        'cards': list(best['cards']),
+        'name': best['name'],
+        'score': best['score'],
+        'probability': None,
+        'depth': 0,
+        'confidence': 0.0,
+        'source': 'analyze_hand'
+    }
+
+
+def recommend(game, budget_ms=200, max_depth=4, plays_left=PLAYS_PER_ROUND, discards_left=None,
+              cancel_event=None, on_progress=None, planner=None, state=None, initial=None):
+    """Best recommendation found within budget_ms.
+
+    Starts from the analyze_hand() fallback, then runs the round planner with
+    iterative deepening (one more decision and one more chance sample per
+    iteration) until the budget runs out, cancel_event is set, or max_depth is
+    done. The result carries 'depth' (last completed search depth) and
+    'confidence' (depth / max_depth); on_progress is called after every
+    completed depth. Background callers pass a state snapshot and the
+    fallback (initial) taken on the UI thread.
+    """
+    started = time.monotonic()
+    deadline = started + budget_ms / 1000.0
+    best = dict(initial) if initial is not None else fallback_recommendation(game)
+    if best is None:
+        return None
+    state = state or snapshot(game)
+    if discards_left is None:
+        discards_left = max(DISCARDS_PER_ROUND - state['discard_count'], 0)
+    planner = planner or RoundPlanner(game.COMBO_DEFINITIONS)
+    planner.required_points = state['required_points']
+    base_samples = planner.chance_samples
+
+    def stop_check():
+        return time.monotonic() >= deadline or (cancel_event is not None and cancel_event.is_set())
+
+    planner.stop_check = stop_check
+    try:
+        for depth in range(1, max_depth + 1):
+            if stop_check():
+                break
+            planner.max_depth = depth
+            planner.chance_samples = base_samples + depth - 1
+            try:
+                plan = planner.plan(state['hand'], state['deck'], state['current_points'],
+                                    plays_left, discards_left)
+            except SearchAborted:
+                break
+            if plan is None:
+                break
+            best = dict(plan, depth=depth, confidence=depth / max_depth, source='planner')
+            if on_progress is not None:
+                on_progress(best)
+    finally:
+        planner.stop_check = None
+        planner.chance_samples = base_samples
+    best['elapsed_ms'] = (time.monotonic() - started) * 1000.0
+    return best
+
+
+class RecommendationTask:
+    """Runs recommend() on a background thread so the UI never blocks.
+
+    result() is available immediately (the analyze_hand fallback) and improves
+    as deeper searches finish. Call cancel() when the hand changes; on_done is
+    called from the worker thread with the final recommendation.
+    """
+
+    def __init__(self, game, budget_ms=500, on_done=None, **options):
+        self.cancel_event = threading.Event()
+        self.lock = threading.Lock()
+        self.best = fallback_recommendation(game)
+        self.on_done = on_done
+        self.finished = threading.Event()
+        self.thread = threading.Thread(
+            target=self._run, args=(game, snapshot(game), budget_ms, options), daemon=True)
+        self.thread.start()
+
+    def _run(self, game, state, budget_ms, options):
+        try:
+            final = recommend(game, budget_ms, cancel_event=self.cancel_event,
+                              on_progress=self._update, state=state, initial=self.best, **options)
+            if final is not None:
+                self._update(final)
+        finally:
+            self.finished.set()
+        if self.on_done is not None and not self.cancel_event.is_set():
+            self.on_done(self.result())
+
+    def _update(self, recommendation):
+        with self.lock:
+            self.best = recommendation
+
+    def result(self):
+        """Best recommendation so far"""
+        with self.lock:
+            return self.best
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    @property
+    def done(self):
+        return self.finished.is_set()
+
+    def wait(self, timeout=None):
+        self.finished.wait(timeout)
+        return self.result()
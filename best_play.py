@@ -0,0 +1,55 @@
+# Branch-and-bound: cari satu play terbaik tanpa mengevaluasi semua combo
+from combo_stream import ComboRecord, HAND_FILTERS, HandProfile, subsets_by_chip_sum
+
+
+def best_play(hand, combo_definitions):
+    """The highest-scoring combo as a ComboRecord, or None for an empty hand.
+
+    Same answer as analyze_hand()[0] (ties included: lowest name, then the
+    first subset in combinations() order). Rules are tried in order of their
+    upper bound (base + the hand's top chips) * mult and the search stops at
+    the first rule that cannot beat the best play found so far. Inside a rule,
+    subsets are tried from the highest chip sum down, so the first one that
+    passes is the rule's best and the walk also stops once the chip sums drop
+    too low to beat the current best.
+    """
+    if not hand:
+        return None
+    ranked = sorted((c.chip_value for c in hand), reverse=True)
+    max_card = max(hand, key=lambda c: c.value)
+    best = ComboRecord((5 + max_card.chip_value) * 1, 'High Card', (max_card,))
+
+    bounded = []
+    for combo_def in combo_definitions:
+        k = combo_def['card_count']
+        if k > len(hand):
+            continue
+        bound = (combo_def['score']['base'] + sum(ranked[:k])) * combo_def['score']['mult']
+        bounded.append((-bound, combo_def['name'], combo_def))
+    bounded.sort(key=lambda item: item[:2])
+
+    profile = None
+    by_size = {}
+    for negative_bound, name, combo_def in bounded:
+        if (negative_bound, name) >= (-best.score, best.name):
+            break  # later rules have lower bounds still
+        k = combo_def['card_count']
+        hand_filter = HAND_FILTERS.get(combo_def['check'])
+        if hand_filter is not None:
+            if profile is None:
+                profile = HandProfile(hand)
+            if not hand_filter(profile, k):
+                continue
+        if k not in by_size:
+            by_size[k] = subsets_by_chip_sum(hand, k)
+        base = combo_def['score']['base']
+        mult = combo_def['score']['mult']
+        check = combo_def['check']
+        for chip_sum, cards in by_size[k]:
+            score = (base + chip_sum) * mult
+            if score < best.score or (score == best.score and name >= best.name):
+                break  # every later subset scores no more
+            if check(cards):
+                best = ComboRecord(score, name, cards)
+                break
+    return best
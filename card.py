@@ -27,6 +27,9 @@ class Card:
         'Clubs': 'black'
     }
 
+    # Which copy of the card this is in a multi-deck game (see deck_config.DeckConfig.build)
+    copy = 0
+
     # Method Constructor
     def __init__(self, suit, value):
         self.suit = suit
@@ -0,0 +1,134 @@
+# Bulk parser untuk kode kartu (seperti 'Ah 10d Ks') menjadi array id kartu
+from array import array
+from card import Card
+
+# Card id layout: suit index * 13 + (value - 2), suits in Card.suits order (0..51)
+SUIT_INDEX = {suit: i for i, suit in enumerate(Card.suits)}
+INVALID_ID = -1
+
+
+def card_id(card):
+    """Id (0..51) of a card object, works with any class that has suit/value"""
+    return SUIT_INDEX[card.suit] * 13 + card.value - 2
+
+
+def card_slot(card):
+    """Slot of one physical card: its id, plus 52 per earlier copy of it (multi-deck games)"""
+    return SUIT_INDEX[card.suit] * 13 + card.value - 2 + 52 * getattr(card, 'copy', 0)
+
+
+def card_from_id(cid, card_cls=Card):
+    """Build a card object back from its id"""
+    return card_cls(Card.suits[cid // 13], cid % 13 + 2)
+
+
+def ids_to_cards(ids, card_cls=Card):
+    return [card_from_id(cid, card_cls) for cid in ids]
+
+
+def hand_mask(ids):
+    """52-bit mask with one bit per card id"""
+    mask = 0
+    for cid in ids:
+        mask |= 1 << cid
+    return mask
+
+
+def mask_to_ids(mask):
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def _build_code_table():
+    # Every spelling Card.from_code accepts for the common forms ('Ah', 'ah', '10H', '14s', 'jd'),
+    # so the hot path is a single dict lookup per token
+    table = {}
+    for suit_code, suit in Card.suit_map.items():
+        for value in range(2, 15):
+            cid = SUIT_INDEX[suit] * 13 + value - 2
+            spellings = {str(value)}
+            spellings.update(k for k, v in Card.value_map.items() if v == value)
+            for spelling in spellings:
+                for value_part in (spelling, spelling.lower()):
+                    for suit_part in (suit_code, suit_code.upper()):
+                        table[value_part + suit_part] = cid
+    return table
+
+
+CODE_TABLE = _build_code_table()
+
+
+def code_to_id(code):
+    """Id for a single code, or INVALID_ID; same acceptance rules as Card.from_code"""
+    cid = CODE_TABLE.get(code)
+    if cid is not None:
+        return cid
+    # Rare spellings (leading zeros, embedded spaces) go through the original parser
+    card = Card.from_code(code)
+    if card is None:
+        return INVALID_ID
+    return card_id(card)
+
+
+def split_codes(line):
+    return line.replace(',', ' ').split()
+
+
+def parse_codes(line, typecode='b'):
+    """Parse a line of codes into an array of ids ('b' = int8, 'h' = int16).
+
+    Returns (ids, errors) where errors is a list of (position, token) for every
+    invalid token; position is the token index in the line. Invalid tokens are
+    left out of ids.
+    """
+    tokens = split_codes(line)
+    get = CODE_TABLE.get
+    raw = [get(token, INVALID_ID) for token in tokens]
+    if INVALID_ID not in raw:
+        return array(typecode, raw), []
+
+    ids = array(typecode)
+    errors = []
+    for position, (token, cid) in enumerate(zip(tokens, raw)):
+        if cid == INVALID_ID:
+            cid = code_to_id(token)
+        if cid == INVALID_ID:
+            errors.append((position, token))
+        else:
+            ids.append(cid)
+    return ids, errors
+
+
+def parse_mask(line):
+    """Parse a line of codes into a 52-bit hand mask; returns (mask, errors)"""
+    ids, errors = parse_codes(line)
+    return hand_mask(ids), errors
+
+
+def iter_code_file(path, typecode='b'):
+    """Yield (line_number, ids, errors) for every non-empty line of a file of hands"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            ids, errors = parse_codes(line, typecode)
+            yield line_number, ids, errors
+
+
+def iter_code_file_masks(path):
+    """Yield (line_number, mask, errors) for every non-empty line of a file of hands"""
+    for line_number, ids, errors in iter_code_file(path):
+        yield line_number, hand_mask(ids), errors
+
+
+VALUE_CODES = {value: (name if value == 10 else name[0]) for value, name in Card.values.items()}
+SUIT_CODES = {suit: code for code, suit in Card.suit_map.items()}
+
+
+def id_to_code(cid):
+    """Code string for a card id ('Ah', '10d'), accepted back by parse_codes"""
+    return VALUE_CODES[cid % 13 + 2] + SUIT_CODES[Card.suits[cid // 13]]
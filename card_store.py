@@ -0,0 +1,135 @@
+# Enhancement dan edition kartu, disimpan sebagai array paralel per slot kartu fisik (id + 52 * salinan)
+import itertools
+from array import array
+
+from card import Card
+from card_codes import card_from_id, card_slot
+
+NO_ENHANCEMENT = 0
+BONUS = 1   # +30 chips
+MULT = 2    # +4 mult
+GLASS = 3   # x2 mult
+STEEL = 4   # x1.5 mult while held in hand
+STONE = 5   # 50 chips instead of its rank
+WILD = 6    # counts as every suit
+ENHANCEMENTS = {'none': NO_ENHANCEMENT, 'bonus': BONUS, 'mult': MULT, 'glass': GLASS,
+                'steel': STEEL, 'stone': STONE, 'wild': WILD}
+
+NO_EDITION = 0
+FOIL = 1         # +50 chips
+HOLOGRAPHIC = 2  # +10 mult
+POLYCHROME = 3   # x1.5 mult
+EDITIONS = {'none': NO_EDITION, 'foil': FOIL, 'holographic': HOLOGRAPHIC, 'polychrome': POLYCHROME}
+
+# Versions only count within one store; stamps carry the owner id too
+_owners = itertools.count(1)
+
+RANK_CHIPS = [card_from_id(cid).chip_value for cid in range(52)]
+
+
+class CardStore:
+    """Enhancement and edition of every physical card, as arrays indexed by card slot.
+
+    A card's slot is its id for the first copy and id + 52 * n for the n-th
+    further copy (card_codes.card_slot), so with `copies` decks every copy
+    keeps its own enhancement. Besides the raw bytes, the store keeps the
+    derived per-card tables the scorer reads: chips, and the mult change of
+    the card as mult -> mult * xmult + mult_add (enhancement first, then
+    edition), plus held_xmult for cards that act while held in hand. Every
+    change bumps `version` and logs the slot, like hand_levels.HandLevels.
+    """
+
+    def __init__(self, copies=1):
+        self.copies = copies
+        self.enhancement = bytearray(52 * copies)
+        self.edition = bytearray(52 * copies)
+        self.chips = array('d', RANK_CHIPS * copies)
+        self.mult_add = array('d', [0.0] * (52 * copies))
+        self.xmult = array('d', [1.0] * (52 * copies))
+        self.held_xmult = array('d', [1.0] * (52 * copies))
+        self.modified = 0  # cards with an enhancement or edition
+        self.wild = 0      # wild cards
+        self.owner = next(_owners)
+        self.version = 0
+        self.changes = []  # (version, slot)
+
+    def set(self, slot, enhancement=None, edition=None):
+        """Change one card (by slot); enhancement/edition are constants or names"""
+        before = self.enhancement[slot] or self.edition[slot]
+        was_wild = self.enhancement[slot] == WILD
+        if enhancement is not None:
+            self.enhancement[slot] = ENHANCEMENTS.get(enhancement, enhancement)
+        if edition is not None:
+            self.edition[slot] = EDITIONS.get(edition, edition)
+        self.modified += bool(self.enhancement[slot] or self.edition[slot]) - bool(before)
+        self.wild += (self.enhancement[slot] == WILD) - was_wild
+        self._derive(slot)
+        self.version += 1
+        self.changes.append((self.version, slot))
+
+    def set_card(self, card, enhancement=None, edition=None):
+        self.set(card_slot(card), enhancement, edition)
+
+    def _derive(self, slot):
+        enhancement = self.enhancement[slot]
+        edition = self.edition[slot]
+        chips = 50 if enhancement == STONE else RANK_CHIPS[slot % 52]
+        mult_add, xmult = 0.0, 1.0
+        if enhancement == BONUS:
+            chips += 30
+        elif enhancement == MULT:
+            mult_add = 4.0
+        elif enhancement == GLASS:
+            xmult = 2.0
+        if edition == FOIL:
+            chips += 50
+        elif edition == HOLOGRAPHIC:
+            mult_add += 10.0
+        elif edition == POLYCHROME:
+            mult_add *= 1.5
+            xmult *= 1.5
+        self.chips[slot] = chips
+        self.mult_add[slot] = mult_add
+        self.xmult[slot] = xmult
+        self.held_xmult[slot] = 1.5 if enhancement == STEEL else 1.0
+
+    def is_plain(self):
+        return self.modified == 0
+
+    def ids_suffice(self, cards):
+        """Whether the combos and scores of cards follow from their card ids alone.
+
+        Not when one of them is wild (its suit depends on the combo) or is a
+        later copy enhanced unlike the first copy of its card.
+        """
+        if not self.wild and self.copies == 1:
+            return True
+        enhancement = self.enhancement
+        edition = self.edition
+        for c in cards:
+            slot = card_slot(c)
+            if enhancement[slot] == WILD:
+                return False
+            first = slot % 52
+            if slot != first and (enhancement[slot] != enhancement[first] or edition[slot] != edition[first]):
+                return False
+        return True
+
+    def suit_view(self, cards):
+        """cards with every wild card taking the suit of the first other card, for the combos.py checks"""
+        if not self.wild:
+            return cards
+        wild = [self.enhancement[card_slot(c)] == WILD for c in cards]
+        if not any(wild):
+            return cards
+        suit = next((c.suit for c, is_wild in zip(cards, wild) if not is_wild), cards[0].suit)
+        return tuple(Card(suit, c.value) if is_wild else c for c, is_wild in zip(cards, wild))
+
+    def changed_since(self, stamp):
+        """Slots of the cards changed after version stamp"""
+        changed = set()
+        for version, slot in reversed(self.changes):
+            if version <= stamp:
+                break
+            changed.add(slot)
+        return changed
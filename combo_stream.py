@@ -0,0 +1,227 @@
+# Streaming combo: combo dihasilkan satu per satu dari skor tertinggi, tanpa membangun seluruh daftar
+import heapq
+from collections import namedtuple
+from itertools import combinations, count, islice
+from math import comb
+from operator import itemgetter
+
+import combos
+from multiset import id_positions, multiset_combinations
+
+ComboRecord = namedtuple('ComboRecord', 'score name cards')
+
+# Up to this many k-card subsets a sort is cheaper than the lazy heap walk
+EAGER_SUBSETS = 15000
+
+_RECORD = 0      # heap entry holding a confirmed ComboRecord
+_CANDIDATE = 1   # heap entry holding an unchecked card subset
+
+
+def _has_run(values, length=5):
+    return any(all(v + step in values for step in range(length)) for v in values)
+
+
+class HandProfile:
+    """Value and suit counts of a whole hand, for the hand-level filters below"""
+
+    def __init__(self, hand):
+        self.value_counts = {}
+        self.suit_values = {}
+        self.suit_counts = {}
+        for c in hand:
+            self.value_counts[c.value] = self.value_counts.get(c.value, 0) + 1
+            self.suit_values.setdefault(c.suit, set()).add(c.value)
+            self.suit_counts[c.suit] = self.suit_counts.get(c.suit, 0) + 1
+        self.counts = sorted(self.value_counts.values(), reverse=True)
+
+
+# Necessary conditions on the whole hand for any subset to pass a combos.py check;
+# rules whose check is not listed here are always walked
+HAND_FILTERS = {
+    combos.is_royal_flush: lambda p, k: any({10, 11, 12, 13, 14} <= values
+                                            for values in p.suit_values.values()),
+    combos.is_straight_flush: lambda p, k: any(_has_run(values) for values in p.suit_values.values()),
+    combos.is_flush: lambda p, k: max(p.suit_counts.values()) >= k,
+    combos.is_straight: lambda p, k: _has_run(p.value_counts),
+    combos.is_four_of_a_kind: lambda p, k: p.counts[0] >= 4,
+    combos.is_full_house: lambda p, k: p.counts[0] >= 3 and len(p.counts) > 1 and p.counts[1] >= 2,
+    combos.is_three_of_a_kind: lambda p, k: p.counts[0] >= 3,
+    combos.is_two_pair: lambda p, k: len(p.counts) > 1 and p.counts[1] >= 2,
+    combos.is_pair: lambda p, k: p.counts[0] >= 2,
+}
+
+
+class ChipSumSubsets:
+    """Distinct k-card subsets of hand as (chip_sum, cards), highest chip sum first, made on demand.
+
+    Cards are ranked by chip value and a subset is a set of k ranks; a heap
+    pops the best one and pushes its successors (one rank moved down by one),
+    each scoring no more than it, so only the subsets actually read are ever
+    built. Cards keep their hand order and equal sums keep combinations()
+    order, so ties break the same way analyze_hand() meets them. Copies of a
+    card (multi deck hands) are interchangeable: each card multiset appears
+    once, as its earliest copies. Subsets already made are kept, so several
+    rules can walk the same object. Hands with at most EAGER_SUBSETS subsets
+    are simply sorted up front, in the same order.
+    """
+
+    def __init__(self, hand, k):
+        n = len(hand)
+        self.hand = hand
+        self.n = n
+        self.items = []
+        self.heap = []
+        self.seen = set()
+        if not 0 < k <= n:
+            return
+        if comb(n, k) <= EAGER_SUBSETS:
+            if len(id_positions(hand)) < n:
+                self.items = [(sum(c.chip_value for c in cards), cards)
+                              for cards, _ in multiset_combinations(hand, k)]
+            else:
+                chips = [c.chip_value for c in hand]
+                self.items = list(zip(map(sum, combinations(chips, k)), combinations(hand, k)))
+            self.items.sort(key=itemgetter(0), reverse=True)
+            return
+        order = sorted(range(n), key=lambda i: (-hand[i].chip_value, i))
+        chips = [hand[i].chip_value for i in order]
+        # One int per subset, smallest first: (top - chip sum), then the complement of
+        # its hand position mask (position p is bit n-1-p, so a larger mask is an
+        # earlier combinations() tuple), then its rank mask (rank r is bit r)
+        self.top = sum(chips[:k])
+        full = (1 << n) - 1
+        position_bits = [1 << (n - 1 - i) for i in order]
+        # Moving rank r down to r+1 adds the same amount to any key holding r but not r+1
+        self.moves = {1 << r: ((chips[r] - chips[r + 1]) << 2 * n)
+                      + ((position_bits[r] - position_bits[r + 1]) << n) + (1 << r)
+                      for r in range(n - 1)}
+        self.last = (1 << (n - 1)) - 1  # ranks that can still move down
+        self.full = full
+        self.hand_bits = [1 << (n - 1 - p) for p in range(n)]
+        # (later copy, earlier copy) position bits; only set for multi deck hands
+        self.previous = None
+        positions = id_positions(hand)
+        if len(positions) < n:
+            self.previous = [(1 << (n - 1 - after), 1 << (n - 1 - before))
+                             for copies in positions.values()
+                             for before, after in zip(copies, copies[1:])]
+        start = ((full ^ sum(position_bits[:k])) << n) | ((1 << k) - 1)
+        self.heap.append(start)
+        self.seen.add(start)
+
+    def _advance(self):
+        """Make the next subset; False once every subset has been made"""
+        heap = self.heap
+        if not heap:
+            return False
+        seen = self.seen
+        moves = self.moves
+        n = self.n
+        full = self.full
+        while heap:
+            key = heapq.heappop(heap)
+            ranks = key & full
+            movable = ranks & ~(ranks >> 1) & self.last
+            while movable:
+                low = movable & -movable
+                movable ^= low
+                successor = key + moves[low]
+                if successor not in seen:
+                    seen.add(successor)
+                    heapq.heappush(heap, successor)
+            mask = full ^ (key >> n & full)
+            if self.previous is not None and any(mask & after and not mask & before
+                                                 for after, before in self.previous):
+                continue  # a later copy stands in for an earlier one: same multiset
+            self.items.append((self.top - (key >> 2 * n),
+                               tuple([c for c, bit in zip(self.hand, self.hand_bits) if mask & bit])))
+            return True
+        return False
+
+    def has(self, index):
+        """Whether there is a subset at index"""
+        while index >= len(self.items):
+            if not self._advance():
+                return False
+        return True
+
+    def __getitem__(self, index):
+        if not self.has(index):
+            raise IndexError(index)
+        return self.items[index]
+
+    def __iter__(self):
+        index = 0
+        while self.has(index):
+            yield self.items[index]
+            index += 1
+
+
+def subsets_by_chip_sum(hand, k):
+    """Every distinct k-card subset of hand as (chip_sum, cards), highest chip sum first (lazy)"""
+    return ChipSumSubsets(hand, k)
+
+
+def iter_combos(hand, combo_definitions):
+    """Yield ComboRecord(score, name, cards) for every qualifying combo, highest score first.
+
+    Same combos, scores and order as analyze_hand(), but lazy: each rule walks
+    its card subsets from the highest chip sum down, and a subset is only
+    checked once its would-be score is the best left on the heap. Taking the
+    first K records therefore skips every subset that could not rank in the
+    top K, and rules the whole hand cannot satisfy are never walked at all.
+    """
+    if not hand:
+        return
+    profile = HandProfile(hand)
+    by_size = {}
+    heap = []
+    sequence = count()
+    for combo_def in combo_definitions:
+        k = combo_def['card_count']
+        if k > len(hand):
+            continue
+        hand_filter = HAND_FILTERS.get(combo_def['check'])
+        if hand_filter is not None and not hand_filter(profile, k):
+            continue
+        if k not in by_size:
+            by_size[k] = subsets_by_chip_sum(hand, k)
+        score = (combo_def['score']['base'] + by_size[k][0][0]) * combo_def['score']['mult']
+        heap.append((-score, combo_def['name'], _CANDIDATE, next(sequence),
+                     (combo_def, by_size[k], 0)))
+
+    max_card = max(hand, key=lambda c: c.value)
+    high_card_score = (5 + max_card.chip_value) * 1
+    heap.append((-high_card_score, 'High Card', _RECORD, next(sequence),
+                 ComboRecord(high_card_score, 'High Card', (max_card,))))
+    heapq.heapify(heap)
+
+    while heap:
+        negative_score, name, kind, _, payload = heapq.heappop(heap)
+        if kind == _RECORD:
+            yield payload
+            continue
+        combo_def, subsets, index = payload
+        items = subsets.items
+        check = combo_def['check']
+        base = combo_def['score']['base']
+        mult = combo_def['score']['mult']
+        # Keep walking this rule while its next subset still ranks before the heap top
+        while True:
+            cards = items[index][1]
+            if check(cards):
+                heapq.heappush(heap, (negative_score, name, _RECORD, next(sequence),
+                                      ComboRecord(-negative_score, name, cards)))
+            index += 1
+            if index == len(items) and not subsets.has(index):
+                break
+            negative_score = -(base + items[index][0]) * mult
+            if heap and (heap[0][0], heap[0][1]) <= (negative_score, name):
+                heapq.heappush(heap, (negative_score, name, _CANDIDATE, next(sequence),
+                                      (combo_def, subsets, index)))
+                break
+
+
+def top_combos(hand, combo_definitions, k=5):
+    """The k best combos of the hand, checking only what is needed to rank them"""
+    return list(islice(iter_combos(hand, combo_definitions), k))
@@ -1,4 +1,9 @@
 # Rules untuk menentukan combo
+def definitions_signature(combo_definitions):
+    """Names, card counts and scores of combo definitions: tables built from them are only valid for these"""
+    return [[d['name'], d['card_count'], d['score']['base'], d['score']['mult']]
+            for d in combo_definitions]
+
 def is_royal_flush(cards):
     if len(cards) != 5:
         return False
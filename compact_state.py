@@ -0,0 +1,120 @@
+# Game state ringkas dengan layout tetap, murah untuk di-copy saat search dan simulasi
+from card import Card
+from card_codes import card_id, card_from_id, hand_mask, mask_to_ids
+
+HAND_SIZE = 8
+
+
+class CompactState:
+    """Fixed-layout round state: bitmasks for card sets, the deck as bytes plus a cursor.
+
+    The deck bytes are never modified (dealing only moves the cursor), so
+    copy() shares them and costs the same as copying a handful of ints.
+    deck[cursor] is the next card dealt, i.e. game_state['deck'][-1].
+    """
+    __slots__ = ('hand', 'deck', 'cursor', 'played', 'discarded', 'current_points',
+                 'required_points', 'round_number', 'discard_count', 'plays_made')
+
+    def __init__(self, hand=0, deck=b'', cursor=0, played=0, discarded=0, current_points=0,
+                 required_points=300, round_number=1, discard_count=0, plays_made=0):
+        self.hand = hand
+        self.deck = deck
+        self.cursor = cursor
+        self.played = played
+        self.discarded = discarded
+        self.current_points = current_points
+        self.required_points = required_points
+        self.round_number = round_number
+        self.discard_count = discard_count
+        self.plays_made = plays_made
+
+    def copy(self):
+        return CompactState(self.hand, self.deck, self.cursor, self.played, self.discarded,
+                            self.current_points, self.required_points, self.round_number,
+                            self.discard_count, self.plays_made)
+
+    __copy__ = copy
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __eq__(self, other):
+        if not isinstance(other, CompactState):
+            return NotImplemented
+        return self.key() == other.key()
+
+    def __hash__(self):
+        return hash(self.key())
+
+    def key(self):
+        return (self.hand, self.deck, self.cursor, self.played, self.discarded,
+                self.current_points, self.required_points, self.round_number,
+                self.discard_count, self.plays_made)
+
+    @property
+    def deck_left(self):
+        return len(self.deck) - self.cursor
+
+    @property
+    def deck_mask(self):
+        return hand_mask(self.deck[self.cursor:])
+
+    def hand_ids(self):
+        return mask_to_ids(self.hand)
+
+    def hand_size(self):
+        return bin(self.hand).count('1')
+
+    def deal(self, count=None):
+        """Deal from the deck until the hand has HAND_SIZE cards (or count cards)"""
+        if count is None:
+            count = HAND_SIZE - self.hand_size()
+        end = min(self.cursor + count, len(self.deck))
+        for cid in self.deck[self.cursor:end]:
+            self.hand |= 1 << cid
+        self.cursor = end
+
+    def play(self, cards_mask, score):
+        """Move cards_mask from hand to played, add score and refill the hand"""
+        cards_mask &= self.hand
+        self.hand &= ~cards_mask
+        self.played |= cards_mask
+        self.current_points += score
+        self.plays_made += 1
+        self.deal()
+
+    def discard(self, cards_mask):
+        """Move cards_mask from hand to discarded and refill the hand"""
+        cards_mask &= self.hand
+        self.hand &= ~cards_mask
+        self.discarded |= cards_mask
+        self.discard_count += 1
+        self.deal()
+
+    @classmethod
+    def from_dict(cls, game_state):
+        """Build from a BalatroPoker game_state dict"""
+        return cls(
+            hand=hand_mask(card_id(c) for c in game_state['hand']),
+            deck=bytes(card_id(c) for c in reversed(game_state['deck'])),
+            cursor=0,
+            played=hand_mask(card_id(c) for c in game_state['played_cards']),
+            discarded=hand_mask(card_id(c) for c in game_state['discarded']),
+            current_points=game_state['current_points'],
+            required_points=game_state['required_points'],
+            round_number=game_state['round_number'],
+            discard_count=game_state['discard_count']
+        )
+
+    def to_dict(self, card_cls=Card):
+        """game_state dict for the frontends; card lists come out in id order"""
+        return {
+            'hand': [card_from_id(cid, card_cls) for cid in mask_to_ids(self.hand)],
+            'played_cards': [card_from_id(cid, card_cls) for cid in mask_to_ids(self.played)],
+            'discarded': [card_from_id(cid, card_cls) for cid in mask_to_ids(self.discarded)],
+            'discard_count': self.discard_count,
+            'required_points': self.required_points,
+            'current_points': self.current_points,
+            'round_number': self.round_number,
+            'deck': [card_from_id(cid, card_cls) for cid in reversed(self.deck[self.cursor:])]
+        }
@@ -0,0 +1,63 @@
+# Konfigurasi deck: jumlah deck, rank/suit yang dibuang dan salinan kartu tambahan
+from collections import Counter
+
+from card import Card
+from card_codes import card_from_id, card_id, code_to_id, INVALID_ID
+
+
+class DeckConfig:
+    """Which cards a deck holds. Every physical copy becomes its own Card object.
+
+    decks: number of standard 52-card decks; removed_ranks / removed_suits:
+    values (2..14) or suit names left out of every deck; extra: card codes or
+    Card objects added on top (one entry per copy), e.g. ['Ah', 'Ah'].
+    """
+
+    def __init__(self, decks=1, removed_ranks=(), removed_suits=(), extra=()):
+        self.decks = decks
+        self.removed_ranks = set(removed_ranks)
+        self.removed_suits = set(removed_suits)
+        self.extra = []
+        for card in extra:
+            cid = code_to_id(card) if isinstance(card, str) else card_id(card)
+            if cid == INVALID_ID:
+                raise ValueError(f"Invalid card code: {card}")
+            self.extra.append(cid)
+
+    def card_ids(self):
+        """Ids of every card in the deck, copies repeated"""
+        ids = []
+        for _ in range(self.decks):
+            for suit in Card.suits:
+                if suit in self.removed_suits:
+                    continue
+                for value in range(2, 15):
+                    if value not in self.removed_ranks:
+                        ids.append(card_id(Card(suit, value)))
+        return ids + self.extra
+
+    def build(self, card_cls=Card):
+        """Unshuffled list of card objects; the n-th copy of a card gets copy = n (from 0)"""
+        cards = []
+        copies = Counter()
+        for cid in self.card_ids():
+            card = card_from_id(cid, card_cls)
+            if copies[cid]:
+                card.copy = copies[cid]
+            copies[cid] += 1
+            cards.append(card)
+        return cards
+
+    def counts(self):
+        """Counter of card id -> copies in the deck"""
+        return Counter(self.card_ids())
+
+    def __len__(self):
+        return len(self.card_ids())
+
+    @property
+    def standard(self):
+        return self.decks == 1 and not self.removed_ranks and not self.removed_suits and not self.extra
+
+
+STANDARD = DeckConfig()
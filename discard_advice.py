@@ -0,0 +1,35 @@
+# Saran discard: estimasi skor terbaik setelah membuang kartu dan menarik kartu baru
+import random
+from itertools import combinations
+
+from best_play import best_play
+
+
+def best_score(cards, combo_definitions):
+    """Highest immediate score among all combos in cards (High Card included)"""
+    best = best_play(cards, combo_definitions)
+    return best.score if best is not None else 0
+
+
+def advise_discards(hand, deck, combo_definitions, max_discard=3, samples=12, top=3, rng=None):
+    """Rank discard options by expected best score after redrawing.
+
+    Every subset of up to max_discard cards is evaluated by drawing `samples`
+    random replacements from deck. Keeping the hand (no discard) is included as
+    the baseline. Returns up to `top` dicts with 'discard' (tuple of cards) and
+    'expected_score', best first.
+    """
+    rng = rng or random.Random()
+    deck = list(deck)
+    options = [{'discard': (), 'expected_score': float(best_score(hand, combo_definitions))}]
+    for size in range(1, min(max_discard, len(hand)) + 1):
+        if size > len(deck):
+            break
+        for discard in combinations(hand, size):
+            kept = [c for c in hand if c not in discard]
+            total = 0
+            for _ in range(samples):
+                total += best_score(kept + rng.sample(deck, size), combo_definitions)
+            options.append({'discard': discard, 'expected_score': total / samples})
+    options.sort(key=lambda option: -option['expected_score'])
+    return options[:top]
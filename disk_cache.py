@@ -0,0 +1,217 @@
+# Cache analisis di disk (SQLite): dipakai bersama antar sesi dan antar proses
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+from analysis_cache import AnalysisCache
+from combos import definitions_signature
+
+SCHEMA_VERSION = 2  # 2: server results moved to their own keys
+
+
+def definitions_stamp(combo_definitions):
+    """Version stamp of the cached results: schema version plus the combo rules and scores"""
+    text = json.dumps([SCHEMA_VERSION, definitions_signature(combo_definitions)])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+
+def _freeze(value):
+    """JSON arrays back to tuples, so values read from disk match what was stored"""
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    if isinstance(value, dict):
+        return {key: _freeze(item) for key, item in value.items()}
+    return value
+
+
+class DiskCache:
+    """Key-value cache in a SQLite file, with the interface of AnalysisCache.
+
+    Keys are tuples (e.g. analysis_cache.hand_key) and values anything JSON
+    can hold; both are stored as JSON text. The file runs in WAL mode, so
+    any number of processes can read while one writes. Entries carry a
+    last-used time and the least recently used are evicted once there are
+    more than max_entries; reads only record their use in memory and write
+    it back every touch_batch reads (or on put/flush), to keep readers from
+    contending for the write lock. When the definitions stamp stored in the
+    file differs from combo_definitions, the old entries are dropped.
+    """
+
+    def __init__(self, path, combo_definitions, max_entries=500000, touch_batch=256, timeout=10.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.touch_batch = touch_batch
+        self.timeout = timeout
+        self.stamp = definitions_stamp(combo_definitions)
+        self.lock = threading.Lock()
+        self.touched = {}
+        self.puts = 0
+        self.recount_every = 512
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self.db = sqlite3.connect(path, timeout=timeout, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                self.db.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+                self.db.execute("CREATE TABLE IF NOT EXISTS entries "
+                                "(key TEXT PRIMARY KEY, value TEXT NOT NULL, used REAL NOT NULL)")
+                self.db.execute("CREATE INDEX IF NOT EXISTS entries_used ON entries (used)")
+                row = self.db.execute("SELECT value FROM meta WHERE key = 'stamp'").fetchone()
+                if row is None or row[0] != self.stamp:
+                    self.db.execute("DELETE FROM entries")
+                    self.db.execute("INSERT OR REPLACE INTO meta VALUES ('stamp', ?)", (self.stamp,))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+            self.count = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    @staticmethod
+    def _key(key):
+        return json.dumps(key, separators=(',', ':'))
+
+    def get(self, key):
+        text_key = self._key(key)
+        with self.lock:
+            row = self.db.execute("SELECT value FROM entries WHERE key = ?", (text_key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.touched[text_key] = time.time()
+            if len(self.touched) >= self.touch_batch:
+                self._flush_touched()
+        return _freeze(json.loads(row[0]))
+
+    def put(self, key, value):
+        text_key = self._key(key)
+        text_value = json.dumps(value, separators=(',', ':'))
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                exists = self.db.execute("SELECT 1 FROM entries WHERE key = ?", (text_key,)).fetchone()
+                self.db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)",
+                                (text_key, text_value, time.time()))
+                if exists is None:
+                    self.count += 1
+                self.puts += 1
+                if self.puts % self.recount_every == 0:
+                    # Other processes add entries too; resync the local count now and then
+                    self.count = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+                self._write_touched()
+                if self.count > self.max_entries:
+                    self._evict()
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+    def _write_touched(self):
+        if self.touched:
+            self.db.executemany("UPDATE entries SET used = ? WHERE key = ?",
+                                [(used, key) for key, used in self.touched.items()])
+            self.touched = {}
+
+    def _flush_touched(self, wait=False):
+        # Reads flush without waiting: while another process holds the write lock the
+        # batch stays in memory (recency is best-effort) and is written on a later try
+        if not wait:
+            self.db.execute("PRAGMA busy_timeout = 0")
+        try:
+            self.db.execute("BEGIN IMMEDIATE")
+        except sqlite3.OperationalError:
+            return
+        finally:
+            if not wait:
+                self.db.execute(f"PRAGMA busy_timeout = {int(self.timeout * 1000)}")
+        try:
+            self._write_touched()
+            self.db.execute("COMMIT")
+        except sqlite3.OperationalError:
+            self.db.execute("ROLLBACK")
+
+    def _evict(self):
+        """Drop the least recently used entries down to 90% of max_entries (other processes add too)"""
+        self.count = self.db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+        excess = self.count - int(self.max_entries * 0.9)
+        if excess > 0 and self.count > self.max_entries:
+            self.db.execute("DELETE FROM entries WHERE key IN "
+                            "(SELECT key FROM entries ORDER BY used LIMIT ?)", (excess,))
+            self.count -= excess
+            self.evicted += excess
+
+    def flush(self):
+        """Write back pending last-used times, waiting for the write lock up to the timeout"""
+        with self.lock:
+            self._flush_touched(wait=True)
+
+    def clear(self):
+        with self.lock:
+            self.db.execute("DELETE FROM entries")
+            self.touched = {}
+            self.count = 0
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, key):
+        with self.lock:
+            return self.db.execute("SELECT 1 FROM entries WHERE key = ?", (self._key(key),)).fetchone() is not None
+
+
+class TieredCache:
+    """In-memory AnalysisCache in front of a DiskCache; misses fall through to disk and are kept in memory"""
+
+    def __init__(self, disk, max_entries=100000):
+        self.memory = AnalysisCache(max_entries)
+        self.disk = disk
+
+    def get(self, key):
+        value = self.memory.get(key)
+        if value is None:
+            value = self.disk.get(key)
+            if value is not None:
+                self.memory.put(key, value)
+        return value
+
+    def put(self, key, value):
+        self.memory.put(key, value)
+        self.disk.put(key, value)
+
+    def clear(self):
+        self.memory.clear()
+        self.disk.clear()
+
+    @property
+    def hits(self):
+        return self.memory.hits + self.disk.hits
+
+    @property
+    def misses(self):
+        return self.disk.misses
+
+    @property
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def __len__(self):
+        return len(self.disk)
+
+    def __contains__(self, key):
+        return key in self.memory or key in self.disk
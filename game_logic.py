@@ -5,6 +5,15 @@ from card import Card
 from combos import (is_royal_flush, is_straight_flush, is_four_of_a_kind,
                     is_full_house, is_flush, is_straight, is_three_of_a_kind,
                     is_two_pair, is_pair)
+from analysis_cache import hand_key, pack_combos, unpack_combos
+from combo_stream import ComboRecord, iter_combos, top_combos
+from scoring import ScoringPipeline
+from hand_levels import HandLevels, refresh_packed
+from card_store import CardStore
+from deck_config import STANDARD
+from multiset import combo_ways, multiset_combinations
+from hand_strength import HAND_SIZE, describe, hand_strength
+from history import GameHistory
 
 # Frame Knowledge Representation untuk game state
 class BalatroPoker:
@@ -65,8 +74,11 @@ class BalatroPoker:
         }
     ]
 
-    def __init__(self, page: ft.Page = None):
+    def __init__(self, page: ft.Page = None, analysis_cache=None, deck_config=STANDARD):
         self.page = page
+        self.deck_config = deck_config  # deck_config.DeckConfig: decks, removed ranks, extra copies
+        self.analysis_cache = analysis_cache  # Optional AnalysisCache shared across instances
+        self.disk_cache = None  # Optional disk_cache.DiskCache shared across sessions and processes
         self.game_state = {
             'hand': [],
             'played_cards': [],
@@ -80,6 +92,15 @@ class BalatroPoker:
         self.selected_indices = []
         self.combo_info = None
         self.notification = None
+        self.history = GameHistory(self)
+        self.recorder = None  # Optional replay_log.RotatingReplayWriter
+        self.speculator = None  # Optional speculation.Speculator, run while the UI is idle
+        self.replay_round = 0
+        self.levels = HandLevels(self.COMBO_DEFINITIONS)
+        # Enhancements/editions per physical card, room for every copy the deck holds
+        self.card_store = CardStore(max(deck_config.counts().values(), default=1))
+        self.scoring = ScoringPipeline()
+        self.scorer = self.compile_scorer()
 
     def start_round(self):
         self.game_state = {
@@ -94,15 +115,17 @@ class BalatroPoker:
         }
         self.selected_indices = []
         self.combo_info = None
+        self.history.reset()
         for _ in range(8):
             self.deal_card()
+        if self.recorder is not None:
+            self.replay_round = self.recorder.new_round()
+            self.recorder.log_deal(self.replay_round, self.game_state['hand'])
         self.update_ui()
+        self.speculate()
 
     def initialize_deck(self):
-        deck = []
-        for suit in Card.suits:
-            for value in range(2, 15):
-                deck.append(Card(suit, value))
+        deck = self.deck_config.build(Card)
         random.shuffle(deck)
         return deck
 
@@ -130,36 +153,42 @@ class BalatroPoker:
         if not combo_info:
             self.show_notification("No valid combo recognized! No points awarded.")
             return
+
+        if self.speculator is not None:
+            self.speculator.cancel()
+        with self.history.record(f"Play {combo_info['name']}"):
+            # Remove cards from hand
+            removed = []
+            for i in sorted(self.selected_indices, reverse=True):
+                removed.append(hand.pop(i))
         
-        # Remove cards from hand
-        removed = []
-        for i in sorted(self.selected_indices, reverse=True):
-            removed.append(hand.pop(i))
-        
-        self.game_state['played_cards'].extend(removed)
-        needed = 8 - len(hand)
-        for _ in range(needed):
-            self.deal_card()
-            
-        # Calculate and add score
-        base = combo_info['score']['base']
-        mult = combo_info['score']['mult']
-        chip_sum = sum(c.chip_value for c in removed)
-        score = (base + chip_sum) * mult
-        self.game_state['current_points'] += score
+            # Calculate and add score (the cards still in hand count as held)
+            self.levels.sync(self.scorer)
+            self.scorer.sync_cards()
+            score = self.scorer.score(combo_info['name'], removed, hand)
+            self.game_state['current_points'] += score
+
+            self.game_state['played_cards'].extend(removed)
+            needed = 8 - len(hand)
+            for _ in range(needed):
+                self.deal_card()
         
+        if self.recorder is not None:
+            self.recorder.log_play(self.replay_round, removed, combo_info['name'], score,
+                                   self.game_state['current_points'])
         self.show_notification(f"Played {combo_info['name']} and earned {score} points!")
         self.selected_indices = []
         self.update_ui()
+        self.speculate()
 
     def identify_combo(self, combo_cards):
-        for combo_def in self.COMBO_DEFINITIONS:
+        for combo_def in self.levels.definitions():
             required_count = combo_def['card_count']
             if len(combo_cards) < required_count:
                 continue
             check_func = combo_def['check']
-            # Apply the check function to the first required_count cards
-            if check_func(combo_cards[:required_count]):
+            # Apply the check function to the first required_count cards (wild cards fit any suit)
+            if check_func(self.card_store.suit_view(combo_cards[:required_count])):
                 return {
                     'name': combo_def['name'],
                     'score': combo_def['score']
@@ -170,78 +199,218 @@ class BalatroPoker:
         if not self.selected_indices:
             self.show_notification("No cards selected to discard!")
             return
+
+        if self.speculator is not None:
+            self.speculator.cancel()
+        with self.history.record(f"Discard {len(self.selected_indices)} cards"):
+            hand = self.game_state['hand']
+            discarded = []
         
-        hand = self.game_state['hand']
-        discarded = []
-        
-        # Sort descending to avoid index shifting issues
-        for i in sorted(self.selected_indices, reverse=True):
-            discarded.append(hand.pop(i))
+            # Sort descending to avoid index shifting issues
+            for i in sorted(self.selected_indices, reverse=True):
+                discarded.append(hand.pop(i))
             
-        self.game_state['discarded'].extend(discarded)
-        needed = 8 - len(hand)
-        for _ in range(needed):
-            self.deal_card()
+            self.game_state['discarded'].extend(discarded)
+            self.game_state['discard_count'] += 1
+            needed = 8 - len(hand)
+            for _ in range(needed):
+                self.deal_card()
             
+        if self.recorder is not None:
+            self.recorder.log_discard(self.replay_round, discarded, self.game_state['current_points'])
         self.show_notification(f"Discarded {len(discarded)} cards.")
         self.selected_indices = []
         self.update_ui()
+        self.speculate()
+
+    def undo(self):
+        if not self.history.undo():
+            self.show_notification("Nothing to undo!")
+            return
+        if self.recorder is not None:
+            self.recorder.log_undo(self.replay_round, self.game_state['current_points'])
+        self.selected_indices = []
+        self.show_notification("Undid last action.")
+        self.speculate()
+
+    def redo(self, branch=None):
+        if not self.history.redo(branch):
+            self.show_notification("Nothing to redo!")
+            return
+        if self.recorder is not None:
+            self.recorder.log_redo(self.replay_round, self.game_state['current_points'], branch)
+        self.selected_indices = []
+        self.show_notification("Redid last action.")
+        self.speculate()
+
+    def speculate(self):
+        """Hand the settled state to the speculator, once per action.
+
+        Levels and scorer are synced here, on the UI thread; the speculator's
+        worker only reads them (analyze_cards(hand, sync=False)).
+        """
+        if self.speculator is None:
+            return
+        self.levels.sync(self.scorer)
+        self.scorer.sync_cards()
+        self.speculator.schedule()
 
     def analyze_hand(self):
         hand = self.game_state['hand']
         if not hand:
             self.show_notification("No cards in hand to analyze.")
             return []
+        return self.analyze_cards(hand)
 
-        all_combos = []
+    def analyze_cards(self, hand, sync=True):
+        """Every combo of hand, best first, through the analysis cache when there is one.
+
+        sync=False skips bringing the scorer up to date, for callers off the UI thread.
+        """
+        if sync:
+            self.levels.sync(self.scorer)
+            self.scorer.sync_cards()
+        stamp = self.cache_stamp()
+        cache_key = None
+        # Cached analyses are keyed by card ids: hands with wild cards or with copies
+        # enhanced apart from each other are analyzed afresh every time
+        by_ids = self.card_store.ids_suffice(hand)
+        if self.analysis_cache is not None and by_ids:
+            cache_key = hand_key(hand)
+            cached = self.analysis_cache.get(cache_key)
+            if cached is not None:
+                cached_stamp, packed = cached
+                if cached_stamp != stamp:
+                    # Rescore only the combos whose level or cards changed since this entry was stored
+                    changed, changed_cards = self.changed_since(cached_stamp)
+                    packed = refresh_packed(packed, changed, self.scorer, changed_cards)
+                    self.analysis_cache.put(cache_key, (stamp, packed))
+                return unpack_combos(packed, hand)
+
+        # The disk cache only holds analyses under the plain combo scores (same in every session)
+        persist = self.disk_cache is not None and self.base_scores()
+        if persist:
+            cache_key = cache_key or hand_key(hand)
+            packed = self.disk_cache.get(cache_key)
+            if packed is not None:
+                if self.analysis_cache is not None:
+                    self.analysis_cache.put(cache_key, (stamp, packed))
+                return unpack_combos(packed, hand)
+
+        plays = []
+        ways = []
         # Evaluate each combo definition with its required card count
         for combo_def in self.COMBO_DEFINITIONS:
             required_count = combo_def['card_count']
             if required_count > len(hand):
                 continue
-            # Generate all combinations of required_count cards
-            for combo in combinations(hand, required_count):
+            if by_ids:
+                # Generate every distinct multiset of required_count cards (copies from
+                # multiple decks are generated once, with the number of ways to pick them)
+                candidates = multiset_combinations(hand, required_count)
+            else:
+                candidates = ((combo, 1) for combo in combinations(hand, required_count))
+            for combo, count in candidates:
                 # Check if this combination meets the combo_def's criteria
-                if combo_def['check'](combo):
-                    base = combo_def['score']['base']
-                    mult = combo_def['score']['mult']
-                    chip_sum = sum(c.chip_value for c in combo)
-                    score = (base + chip_sum) * mult
-                    all_combos.append({
-                        'name': combo_def['name'],
-                        'cards': combo,
-                        'score': score
-                    })
+                if combo_def['check'](combo if by_ids else self.card_store.suit_view(combo)):
+                    plays.append((combo_def['name'], combo))
+                    ways.append(count)
 
         # Add High Card combo
-        high_card_combo = None
-        if hand:
-            max_card = max(hand, key=lambda c: c.value)
-            chip_sum = max_card.chip_value
-            score = (5 + chip_sum) * 1
-            high_card_combo = {
-                'name': 'High Card',
-                'cards': (max_card,),
-                'score': score
-            }
-            all_combos.append(high_card_combo)
-
-        # Remove duplicate combinations and sort by score
-        unique_combos = []
-        seen = set()
-        for combo in all_combos:
-            # Use a frozenset of card object IDs to track duplicates
-            cards_tuple = tuple(sorted(combo['cards'], key=lambda x: x.value))
-            combo_key = (combo['name'], cards_tuple)
-            if combo_key not in seen:
-                seen.add(combo_key)
-                unique_combos.append(combo)
+        max_card = max(hand, key=lambda c: c.value)
+        plays.append(('High Card', (max_card,)))
+        ways.append(combo_ways((max_card,), hand) if by_ids else 1)
+
+        # Score every candidate in one batch through the compiled scorer
+        unique_combos = [
+            {'name': name, 'cards': cards, 'score': score, 'count': count}
+            for (name, cards), score, count in zip(plays, self.scorer.evaluate_many(plays), ways)
+        ]
 
         # Sort by score descending, then by name ascending
         unique_combos.sort(key=lambda x: (-x['score'], x['name']))
+
+        if cache_key is not None:
+            packed = pack_combos(unique_combos)
+            if self.analysis_cache is not None:
+                self.analysis_cache.put(cache_key, (stamp, packed))
+            if persist:
+                self.disk_cache.put(cache_key, packed)
         
         return unique_combos
 
+    def cache_stamp(self):
+        """Stamp of cached analyses: owner and version of the hand levels and the card store"""
+        return (self.levels.owner, self.levels.version, self.card_store.owner, self.card_store.version)
+
+    def changed_since(self, stamp):
+        """Combo names and card ids whose scores may differ from an analysis stamped `stamp`.
+
+        The cache can be shared by several games; an entry stored by another
+        game's levels or card store is rescored in full.
+        """
+        levels_owner, levels_version, cards_owner, cards_version = stamp
+        if levels_owner == self.levels.owner:
+            changed = self.levels.changed_since(levels_version)
+        else:
+            changed = set(self.levels.position)
+        if cards_owner == self.card_store.owner:
+            # Cached entries only hold hands whose copies score alike, under the first copy's id
+            changed_cards = {slot % 52 for slot in self.card_store.changed_since(cards_version)}
+        else:
+            changed_cards = range(52)
+        return changed, changed_cards
+
+    def iter_combos(self):
+        """Combos of the current hand as ComboRecord(score, name, cards), best first, lazily"""
+        if not self.streamable():
+            return iter(self.top_combos(None))
+        return iter_combos(self.game_state['hand'], self.levels.definitions())
+
+    def top_combos(self, k=5):
+        """The k best combos of the current hand, without analyzing the whole hand"""
+        hand = self.game_state['hand']
+        if self.analysis_cache is not None and hand and hand_key(hand) in self.analysis_cache:
+            # Already analyzed (e.g. precomputed by the speculator): just read it back
+            return [ComboRecord(c['score'], c['name'], c['cards']) for c in self.analyze_cards(hand)[:k]]
+        if not self.streamable():
+            combos = self.analyze_hand() if self.game_state['hand'] else []
+            return [ComboRecord(c['score'], c['name'], c['cards']) for c in combos[:k]]
+        return top_combos(self.game_state['hand'], self.levels.definitions(), k)
+
+    def base_scores(self):
+        """Whether every score is the combo definitions' own: no modifiers, levels or enhancements"""
+        return self.scorer.plain and all(self.levels.level(combo_def['name']) == 1
+                                         for combo_def in self.levels.all_definitions())
+
+    def streamable(self):
+        """Whether scores are plain (base + chip_sum) * mult, the ordering combo_stream relies on"""
+        return self.scorer.plain and self.levels.level('High Card') == 1
+
+    def compile_scorer(self):
+        scorer = self.scoring.compile(self.levels.all_definitions(), self.card_store)
+        scorer.version = self.levels.version
+        return scorer
+
+    def set_modifiers(self, modifiers):
+        """Replace the jokers/modifiers (scoring.ChipAdd, MultAdd, MultTimes, CardTrigger)"""
+        self.scoring = ScoringPipeline(modifiers)
+        self.scorer = self.compile_scorer()
+        if self.analysis_cache is not None:
+            self.analysis_cache.clear()  # cached scores came from the old modifiers
+
+    def enhance(self, card, enhancement=None, edition=None):
+        """Give a card an enhancement/edition (card_store names such as 'glass', 'foil')"""
+        self.card_store.set_card(card, enhancement, edition)
+        self.scorer.sync_cards()
+        self.update_ui()
+
+    def level_up(self, name, count=1):
+        """Raise a combo's level (a planet card); cached analyses are repaired lazily"""
+        self.levels.level_up(name, count)
+        self.levels.sync(self.scorer)
+        self.update_ui()
+
     def toggle_card_selection(self, index):
         if index not in self.selected_indices and len(self.selected_indices) >= 5:
             self.show_notification("You can only select up to 5 cards!")
@@ -294,15 +463,15 @@ class BalatroPoker:
         return card_container
 
     def build_combo_details(self):
-        combos = self.analyze_hand()
+        combos = self.top_combos(5)  # Show top 5 combos
         
         if not combos:
             return [ft.Text("No valid combos found.")]
         
         combo_list = []
-        for i, combo in enumerate(combos[:5]):  # Show top 5 combos
+        for i, combo in enumerate(combos):
             card_indices = []
-            for card in combo['cards']:
+            for card in combo.cards:
                 try:
                     idx = self.game_state['hand'].index(card)
                     card_indices.append(idx)
@@ -323,7 +492,7 @@ class BalatroPoker:
                         margin=2,
                         bgcolor="#e0e0e0",
                         border_radius=5
-                    ) for card in combo['cards']
+                    ) for card in combo.cards
                 ],
                 wrap=True
             )
@@ -331,8 +500,8 @@ class BalatroPoker:
             
             combo_container = ft.Container(
                 content=ft.Column([
-                    ft.Text(f"{combo['name']}", weight="bold"),
-                    ft.Text(f"Score: {combo['score']}"),
+                    ft.Text(f"{combo.name}", weight="bold"),
+                    ft.Text(f"Score: {combo.score}"),
                     card_row,  # Use the row for cards here
                     ft.ElevatedButton(
                         text="Select Cards",
@@ -394,7 +563,25 @@ class BalatroPoker:
         
         # Create combo list
         combo_details = self.build_combo_details()
+
+        # Percentile of the dealt hand among all possible deals
+        strength_text = ""
+        if len(self.game_state['hand']) == HAND_SIZE:
+            strength_text = describe(hand_strength(self.game_state['hand'], self.levels.definitions(),
+                                                   self.game_state['required_points']))
         
+        # What-if branches: every action recorded from this point, the active one preselected
+        branches = self.history.branches()
+        active = self.history.current.active
+        branch_picker = ft.Dropdown(
+            label="Redo branch",
+            width=220,
+            options=[ft.dropdown.Option(key=str(i), text=f"{i + 1}. {label}") for i, label in enumerate(branches)],
+            value=str(self.history.current.children.index(active)) if active is not None else None,
+            on_change=lambda e: self.redo(int(e.control.value)),
+            visible=len(branches) > 1
+        )
+
         # Create notification display
         notification_display = ft.Text(
             self.notification if self.notification else "",
@@ -422,7 +609,8 @@ class BalatroPoker:
                     ft.Container(
                         content=ft.Column([
                             ft.Text("Your Hand:", weight="bold", size=18),
-                            ft.Row(hand_cards, wrap=True)
+                            ft.Row(hand_cards, wrap=True),
+                            ft.Text(strength_text, size=14, italic=True)
                         ]),
                         padding=10,
                         bgcolor="#f8f8f8",
@@ -443,6 +631,19 @@ class BalatroPoker:
                             on_click=lambda _: self.discard_cards(),
                             disabled=len(self.selected_indices) == 0
                         ),
+                        ft.ElevatedButton(
+                            "Undo",
+                            icon=ft.icons.UNDO,
+                            on_click=lambda _: self.undo(),
+                            disabled=not self.history.can_undo()
+                        ),
+                        ft.ElevatedButton(
+                            "Redo",
+                            icon=ft.icons.REDO,
+                            on_click=lambda _: self.redo(),
+                            disabled=not self.history.can_redo()
+                        ),
+                        branch_picker,
                         ft.ElevatedButton(
                             "Reset Round",
                             icon=ft.icons.REFRESH,
@@ -487,21 +688,17 @@ class BalatroPoker:
                                         ft.DataTable(
                                             columns=[
                                                 ft.DataColumn(ft.Text("Combo")),
+                                                ft.DataColumn(ft.Text("Level")),
                                                 ft.DataColumn(ft.Text("Base")),
                                                 ft.DataColumn(ft.Text("Multiplier"))
                                             ],
                                             rows=[
                                                 ft.DataRow(cells=[
                                                     ft.DataCell(ft.Text(combo['name'])),
+                                                    ft.DataCell(ft.Text(str(self.levels.level(combo['name'])))),
                                                     ft.DataCell(ft.Text(str(combo['score']['base']))),
                                                     ft.DataCell(ft.Text(str(combo['score']['mult'])))
-                                                ]) for combo in self.COMBO_DEFINITIONS
-                                            ] + [
-                                                ft.DataRow(cells=[
-                                                    ft.DataCell(ft.Text("High Card")),
-                                                    ft.DataCell(ft.Text("5")),
-                                                    ft.DataCell(ft.Text("1"))
-                                                ])
+                                                ]) for combo in self.levels.all_definitions()
                                             ]
                                         )
                                     ]),
@@ -1,6 +1,14 @@
 import tkinter as tk
+import atexit
+import os
 import random
 from itertools import combinations
+from analysis_cache import AnalysisCache, hand_key
+from hand_strength import HAND_SIZE, describe, hand_strength
+from history import GameHistory
+from metrics import cache_gauges, instrument, serve_metrics, write_at_exit
+from replay_log import RotatingReplayWriter
+from speculation import Speculator
 
 class Card:
     suits = ['Spades', 'Hearts', 'Diamonds', 'Clubs']
@@ -175,6 +183,12 @@ class BalatroPoker:
             'round_number': 1,
             'deck': []
         }
+        self.history = GameHistory(self)
+        self.analysis_cache = AnalysisCache(10000)
+        # Analyses of the likely next hands are computed between clicks
+        self.speculator = Speculator(self, self.analyze_cards)
+        self.recorder = None  # Optional replay_log.RotatingReplayWriter
+        self.replay_round = 0
 
     def start_round(self):
         self.game_state = {
@@ -188,8 +202,12 @@ class BalatroPoker:
             'round_number': self.game_state.get('round_number', 1) + 1,
             'deck': self.initialize_deck()
         }
+        self.history.reset()
         for _ in range(8):
             self.deal_card()
+        if self.recorder is not None:
+            self.replay_round = self.recorder.new_round()
+            self.recorder.log_deal(self.replay_round, self.game_state['hand'])
 
     def initialize_deck(self):
         deck = []
@@ -207,6 +225,7 @@ class BalatroPoker:
             print("Deck is empty! No more cards to deal.")
 
     def play_combo(self, combo_cards):
+        self.speculator.cancel()
         removed = []
         hand = self.game_state['hand']
         valid_combo = []
@@ -215,15 +234,21 @@ class BalatroPoker:
                 if h_card == card:
                     valid_combo.append(h_card)
                     break
-        for card in valid_combo:
-            hand.remove(card)
-            removed.append(card)
-        self.game_state['played_cards'].extend(removed)
-        needed = 8 - len(hand)
-        for _ in range(needed):
-            self.deal_card()
-        combo_info = self.identify_combo(removed)
-        self.game_state['plays_remaining'] -= 1
+        # Labels name the cards, so what-if branches can be told apart in the branch menu
+        with self.history.record("Play " + ", ".join(map(repr, valid_combo))):
+            for card in valid_combo:
+                hand.remove(card)
+                removed.append(card)
+            self.game_state['played_cards'].extend(removed)
+            needed = 8 - len(hand)
+            for _ in range(needed):
+                self.deal_card()
+            combo_info = self.identify_combo(removed)
+            self.game_state['plays_remaining'] -= 1
+        if self.recorder is not None and removed:
+            score = (combo_info['score']['base'] + sum(c.chip_value for c in removed)) * combo_info['score']['mult']
+            self.recorder.log_play(self.replay_round, removed, combo_info['name'], score,
+                                   self.game_state['current_points'])
         return combo_info
 
     def identify_combo(self, combo_cards):
@@ -240,19 +265,37 @@ class BalatroPoker:
         return {'name': 'High Card', 'score': {'base':5, 'mult':1}}
 
     def discard_cards(self, indices):
+        self.speculator.cancel()
         if self.game_state['discard_count'] >= 5:
             return False  # Cannot discard more than 5 times per round
         hand = self.game_state['hand']
         discarded = []
         indices = sorted(list(set(indices)), reverse=True)
-        for idx in indices:
-            if 0 <= idx < len(hand):
-                discarded.append(hand.pop(idx))
-        self.game_state['discarded'].extend(discarded)
-        self.game_state['discard_count'] += 1
-        needed = 8 - len(hand)
-        for _ in range(needed):
-            self.deal_card()
+        with self.history.record("Discard " + ", ".join(repr(hand[i]) for i in reversed(indices) if 0 <= i < len(hand))):
+            for idx in indices:
+                if 0 <= idx < len(hand):
+                    discarded.append(hand.pop(idx))
+            self.game_state['discarded'].extend(discarded)
+            self.game_state['discard_count'] += 1
+            needed = 8 - len(hand)
+            for _ in range(needed):
+                self.deal_card()
+        if self.recorder is not None:
+            self.recorder.log_discard(self.replay_round, discarded, self.game_state['current_points'])
+        return True
+
+    def undo(self):
+        if not self.history.undo():
+            return False
+        if self.recorder is not None:
+            self.recorder.log_undo(self.replay_round, self.game_state['current_points'])
+        return True
+
+    def redo(self, branch=None):
+        if not self.history.redo(branch):
+            return False
+        if self.recorder is not None:
+            self.recorder.log_redo(self.replay_round, self.game_state['current_points'], branch)
         return True
 
     def check_hand(self):
@@ -271,6 +314,14 @@ class BalatroPoker:
                 'recommendation': None,
                 'combo_list': []
             }
+        return self.analyze_cards(hand)
+
+    def analyze_cards(self, hand):
+        """Recommendation and combo list for hand, cached by hand"""
+        key = hand_key(hand)
+        cached = self.analysis_cache.get(key)
+        if cached is not None:
+            return cached
 
         all_combos = []
         for combo_def in self.COMBO_DEFINITIONS:
@@ -337,10 +388,12 @@ class BalatroPoker:
                 'cards': [c.gui_string() for c in best_combo['cards']]
             }
 
-        return {
+        result = {
             'recommendation': recommendation,
             'combo_list': combo_list
         }
+        self.analysis_cache.put(key, result)
+        return result
 
 class PokerGUI:
     def __init__(self, master, poker_game):
@@ -390,6 +443,15 @@ class PokerGUI:
         self.discard_button = tk.Button(self.command_frame, text="Discard Cards", command=self.discard_cards, bg="#C6D481", fg="white", font=("Arial", 12))
         self.discard_button.pack(fill="x", pady=5)
 
+        self.undo_button = tk.Button(self.command_frame, text="Undo", command=self.undo, bg="#2A2C2E", fg="white", font=("Arial", 12))
+        self.undo_button.pack(fill="x", pady=5)
+
+        self.redo_button = tk.Button(self.command_frame, text="Redo", command=self.redo, bg="#2A2C2E", fg="white", font=("Arial", 12))
+        self.redo_button.pack(fill="x", pady=5)
+
+        self.branch_button = tk.Button(self.command_frame, text="Redo Branch...", command=self.pick_branch, bg="#2A2C2E", fg="white", font=("Arial", 12))
+        self.branch_button.pack(fill="x", pady=5)
+
         # Stats panel
         self.stats_frame = tk.Frame(self.command_frame, bg="#2A2C2E")
         self.stats_frame.pack(fill="y", expand=True)
@@ -430,6 +492,8 @@ class PokerGUI:
         else:
             combo_text += "No valid combo found. Consider discarding.\n"
 
+        combo_text += self.hand_strength_text()
+
         combo_text += "\nAvailable Combos:\n"
         for combo in combo_list:
             combo_text += f"{combo['name']}: Base {combo['base']} | Mult: x{combo['mult']} | Total: {combo['score_total']}\n"
@@ -437,6 +501,15 @@ class PokerGUI:
 
         self.combo_analysis_label.config(text=combo_text)
 
+    def hand_strength_text(self):
+        """Percentile line for a full hand, empty otherwise"""
+        game_state = self.poker_game.game_state
+        if len(game_state['hand']) != HAND_SIZE:
+            return ""
+        strength = hand_strength(game_state['hand'], self.poker_game.COMBO_DEFINITIONS,
+                                 game_state['required_points'])
+        return describe(strength) + "\n"
+
     def update_hand_display(self):
         for widget in self.hand_canvas.winfo_children():
             widget.destroy()
@@ -526,14 +599,47 @@ class PokerGUI:
         else:
             self.combo_analysis_label.config(text="Discard failed.")
 
+    def undo(self):
+        if self.poker_game.undo():
+            self.refresh_after_history()
+            self.combo_analysis_label.config(text="Undid last action.")
+        else:
+            self.combo_analysis_label.config(text="Nothing to undo.")
+
+    def redo(self, branch=None):
+        if self.poker_game.redo(branch):
+            self.refresh_after_history()
+            self.combo_analysis_label.config(text="Redid last action.")
+        else:
+            self.combo_analysis_label.config(text="Nothing to redo.")
+
+    def pick_branch(self):
+        """Menu of every action recorded from this point (what-if branches); picking one redoes it"""
+        branches = self.poker_game.history.branches()
+        if not branches:
+            self.combo_analysis_label.config(text="Nothing to redo.")
+            return
+        menu = tk.Menu(self.master, tearoff=0)
+        for i, label in enumerate(branches):
+            menu.add_command(label=f"{i + 1}. {label}", command=lambda i=i: self.redo(i))
+        button = self.branch_button
+        menu.tk_popup(button.winfo_rootx(), button.winfo_rooty() + button.winfo_height())
+
+    def refresh_after_history(self):
+        self.update_hand_display()
+        self.update_combo_display()
+        self.update_cards_available()
+        self.update_plays_remaining()
+
     def update_combo_display(self):
         analysis_result = self.poker_game.analyze_hand()
         combo_list = analysis_result['combo_list']
-        combo_text = "Available Combos:\n"
+        combo_text = self.hand_strength_text() + "Available Combos:\n"
         for combo in combo_list:
             combo_text += f"{combo['name']}: Base {combo['base']} | Mult: x{combo['mult']} | Total: {combo['score_total']}\n"
             combo_text += f"Cards: {', '.join(combo['cards'])}\n"
         self.combo_analysis_label.config(text=combo_text)
+        self.poker_game.speculator.schedule()  # idle until the next click
 
     def update_cards_available(self):
         for widget in self.cards_available_frame.winfo_children():
@@ -575,7 +681,24 @@ class PokerGUI:
 if __name__ == "__main__":
     root = tk.Tk()
     game = BalatroPoker()
+    # Set ACELATRO_REPLAY_DIR to log every deal, play, discard, undo and redo there (see replay_stats.py)
+    if os.environ.get('ACELATRO_REPLAY_DIR'):
+        game.recorder = RotatingReplayWriter(os.environ['ACELATRO_REPLAY_DIR'], game.COMBO_DEFINITIONS)
+        atexit.register(game.recorder.close)
     game.start_round()
     app = PokerGUI(root, game)
+    # Set ACELATRO_METRICS_PORT to serve latency metrics at http://127.0.0.1:<port>/metrics,
+    # ACELATRO_METRICS_FILE to write them to a file on exit
+    metrics_port = os.environ.get('ACELATRO_METRICS_PORT')
+    metrics_file = os.environ.get('ACELATRO_METRICS_FILE')
+    if metrics_port or metrics_file:
+        instrument(game, ('analyze_hand', 'identify_combo', 'play_combo', 'discard_cards'))
+        instrument(app, ('update_hand_display', 'update_combo_display', 'update_cards_available'),
+                   prefix='ui_')
+        cache_gauges(game.analysis_cache, 'analysis_cache')
+    if metrics_port:
+        serve_metrics(int(metrics_port))
+    if metrics_file:
+        write_at_exit(metrics_file)
     app.update_cards_available()
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,120 @@
+# Level combo (planet card): base dan mult per combo yang naik selama run, dengan version stamp
+import itertools
+
+from scoring import HIGH_CARD
+
+# Chips and mult added per level above 1, as the planet cards do
+LEVEL_BONUS = {
+    'Royal Flush': (40, 4),
+    'Straight Flush': (40, 4),
+    'Four of a Kind': (30, 3),
+    'Full House': (25, 2),
+    'Flush': (15, 2),
+    'Straight': (30, 3),
+    'Three of a Kind': (20, 2),
+    'Two Pair': (20, 1),
+    'Pair': (15, 1),
+    'High Card': (10, 1),
+}
+DEFAULT_BONUS = (10, 1)
+
+# Versions only count within one instance; stamps carry the owner id too
+_owners = itertools.count(1)
+
+
+class HandLevels:
+    """Per-run combo levels on top of COMBO_DEFINITIONS (High Card included).
+
+    Every change bumps `version` and is logged with the combo it touched, so
+    anything stamped with an older version can ask changed_since(stamp) and
+    update just those combos instead of starting over. Versions are per
+    instance: `owner` tells apart stamps of different HandLevels.
+    """
+
+    def __init__(self, combo_definitions):
+        self.base_definitions = list(combo_definitions) + [HIGH_CARD]
+        self.position = {combo_def['name']: i for i, combo_def in enumerate(self.base_definitions)}
+        self.levels = {name: 1 for name in self.position}
+        self.effective = [dict(combo_def) for combo_def in self.base_definitions]
+        self.owner = next(_owners)
+        self.version = 0
+        self.changes = []  # (version, combo name)
+
+    def level(self, name):
+        return self.levels[name]
+
+    def score(self, name):
+        """Current {'base', 'mult'} of a combo"""
+        return self.effective[self.position[name]]['score']
+
+    def set_level(self, name, level):
+        level = max(1, level)
+        if self.levels[name] == level:
+            return
+        self.levels[name] = level
+        base_def = self.base_definitions[self.position[name]]
+        chips, mult = LEVEL_BONUS.get(name, DEFAULT_BONUS)
+        self.effective[self.position[name]] = dict(base_def, score={
+            'base': base_def['score']['base'] + chips * (level - 1),
+            'mult': base_def['score']['mult'] + mult * (level - 1)
+        })
+        self.version += 1
+        self.changes.append((self.version, name))
+
+    def level_up(self, name, count=1):
+        self.set_level(name, self.levels[name] + count)
+
+    def reset(self):
+        for name in self.levels:
+            self.set_level(name, 1)
+
+    def definitions(self):
+        """COMBO_DEFINITIONS with current scores (High Card excluded, as in the class constant)"""
+        return self.effective[:-1]
+
+    def all_definitions(self):
+        """Current definitions including High Card, the layout CompiledScorer uses"""
+        return list(self.effective)
+
+    def changed_since(self, stamp):
+        """Names of the combos whose level changed after version stamp"""
+        changed = set()
+        for version, name in reversed(self.changes):
+            if version <= stamp:
+                break
+            changed.add(name)
+        return changed
+
+    def sync(self, scorer):
+        """Patch a CompiledScorer's tables for the combos changed since its version"""
+        if scorer.version == self.version:
+            return
+        for name in self.changed_since(scorer.version):
+            score = self.score(name)
+            scorer.set_combo_score(name, score['base'], score['mult'])
+        scorer.version = self.version
+
+
+def refresh_packed(packed, changed, scorer, changed_cards=()):
+    """Bring a packed analysis (see analysis_cache.pack_combos) up to date.
+
+    Levels and card enhancements never change which combos a hand holds, only
+    their scores (hands with wild cards are never cached), so only entries of
+    a changed combo or holding a changed card are rescored, then the list is
+    re-sorted. The sort is stable, so ties keep
+    their cached order.
+    """
+    changed_cards = set(changed_cards)
+
+    def stale(name, ids):
+        return name in changed or not changed_cards.isdisjoint(ids)
+
+    if not any(stale(name, ids) for name, ids, _ in packed):
+        return packed
+    index = scorer.index
+    rescored = [
+        (name, ids, scorer.score_ids(index[name], ids) if stale(name, ids) else score)
+        for name, ids, score in packed
+    ]
+    rescored.sort(key=lambda entry: (-entry[2], entry[0]))
+    return tuple(rescored)
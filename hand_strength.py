@@ -0,0 +1,257 @@
+# Persentil kekuatan hand 8 kartu: tabel CDF yang dibangun sekali, dibaca lazy dari disk
+import argparse
+import json
+import os
+import random
+from bisect import bisect_left, bisect_right
+from concurrent.futures import ProcessPoolExecutor
+
+from best_play import best_play
+from combos import definitions_signature
+
+HAND_SIZE = 8
+# Blind targets the clear probability is estimated for; lookups use the nearest one
+TARGETS = (300, 450, 600, 900, 1200)
+TABLE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'hand_strength.json')
+# Deals a key needs before its clear rate is used instead of a coarser key's
+MIN_DEALS = 8
+RANK_CODES = '23456789TJQKA'
+
+_tables = {}
+
+
+def backoff_keys(cards):
+    """Keys of a hand from finest to coarsest; lookups use the finest one sampled often enough.
+
+    None depends on suit labels. The levels are: the ranks with the suit
+    lengths, the ranks of the paired
+    cards with the longest suit and rank run, the multiplicity pattern with
+    the longest suit and run, the pattern with the longest suit, the pattern,
+    and the empty key (every deal).
+    """
+    rank_counts = {}
+    suit_counts = {}
+    for c in cards:
+        rank_counts[c.value] = rank_counts.get(c.value, 0) + 1
+        suit_counts[c.suit] = suit_counts.get(c.suit, 0) + 1
+    ranks = ''.join(RANK_CODES[value - 2] * rank_counts[value] for value in sorted(rank_counts, reverse=True))
+    suit_lengths = ''.join(str(n) for n in sorted(suit_counts.values(), reverse=True))
+    paired = ''.join(RANK_CODES[value - 2] * n for value, n in
+                     sorted(rank_counts.items(), key=lambda item: (-item[1], -item[0])) if n > 1) or '-'
+    pattern = ''.join(str(n) for n in sorted(rank_counts.values(), reverse=True))
+    longest = run = 0
+    for value in range(2, 15):
+        run = run + 1 if value in rank_counts else 0
+        longest = max(longest, run)
+    suit = max(suit_counts.values())
+    return [f"r:{ranks}/{suit_lengths}", f"p:{paired}/{suit}/{longest}",
+            f"s:{pattern}/{suit}/{longest}", f"s:{pattern}/{suit}", f"s:{pattern}", '']
+
+
+def ordinal(n):
+    """1st, 2nd, 3rd, 4th, ..., 11th, 12th, 13th, ..., 21st"""
+    if 10 <= n % 100 <= 20:
+        return f"{n}th"
+    return f"{n}{ {1: 'st', 2: 'nd', 3: 'rd'}.get(n % 10, 'th') }"
+
+
+def _lookup(table, keys):
+    """Clear rate of the finest of keys (see backoff_keys) sampled at least MIN_DEALS times"""
+    for k in keys:
+        entry = table.get(k)
+        if entry is not None and (entry[1] >= MIN_DEALS or k == ''):
+            return entry[0]
+    return None
+
+
+class StrengthTable:
+    """Best-score CDF, and per target the clear probability by backoff key and its CDF"""
+
+    def __init__(self, data):
+        self.data = data
+        self.samples = data['samples']
+        self.score_values = [value for value, _ in data['score_cdf']]
+        self.score_below = [below for _, below in data['score_cdf']]
+        self.targets = sorted(int(target) for target in data['clear'])
+        self.clear = {int(target): table for target, table in data['clear'].items()}
+        self.clear_cdf = {int(target): ([value for value, _ in cdf], [below for _, below in cdf])
+                          for target, cdf in data['clear_cdf'].items()}
+
+    def nearest_target(self, required_points):
+        return min(self.targets, key=lambda target: (abs(target - required_points), target))
+
+    @staticmethod
+    def _percentile(values, below, total, x):
+        """Mid-rank percentile of x: share of deals below it plus half of the ties, in %"""
+        lo = bisect_left(values, x)
+        hi = bisect_right(values, x)
+        under = below[lo] if lo < len(below) else total
+        over = below[hi] if hi < len(below) else total
+        return 100.0 * (under + (over - under) / 2) / total
+
+    def score_percentile(self, score):
+        return self._percentile(self.score_values, self.score_below, self.samples, score)
+
+    def clear_probability(self, keys, target):
+        return _lookup(self.clear[target], keys)
+
+    def clear_percentile(self, probability, target):
+        values, below = self.clear_cdf[target]
+        return self._percentile(values, below, self.samples, probability)
+
+
+def load_table(path=TABLE_PATH):
+    """The table at path, read on first use and kept in memory; None if it was never built"""
+    if path not in _tables:
+        try:
+            with open(path, encoding='utf-8') as f:
+                _tables[path] = StrengthTable(json.load(f))
+        except (OSError, ValueError):
+            _tables[path] = None
+    return _tables[path]
+
+
+def hand_strength(cards, combo_definitions, required_points=300, path=TABLE_PATH):
+    """Percentiles of a dealt 8-card hand among all deals, or None when unavailable.
+
+    Returns a dict with best_score, score_percentile, clear_probability and
+    clear_percentile (percentiles in 0..100); the clear columns are for the
+    built target nearest to required_points, reported as target.
+    """
+    if len(cards) != HAND_SIZE:
+        return None
+    table = load_table(path)
+    if table is None or table.data['definitions'] != definitions_signature(combo_definitions):
+        return None
+    score = best_play(cards, combo_definitions).score
+    target = table.nearest_target(required_points)
+    probability = table.clear_probability(backoff_keys(cards), target)
+    return {
+        'best_score': score,
+        'score_percentile': round(table.score_percentile(score), 1),
+        'target': target,
+        'clear_probability': round(probability, 3),
+        'clear_percentile': round(table.clear_percentile(probability, target), 1),
+    }
+
+
+def describe(strength):
+    """One-line summary for the UIs"""
+    if strength is None:
+        return "Hand strength: no table for these combo scores (python hand_strength.py --build)"
+    return (f"Hand strength: best score {strength['best_score']} beats "
+            f"{strength['score_percentile']:.0f}% of deals, chance to reach {strength['target']} "
+            f"~{strength['clear_probability'] * 100:.0f}% ({ordinal(round(strength['clear_percentile']))} percentile)")
+
+
+# ---- Builder -------------------------------------------------------------------------
+
+def _sample_deals(task):
+    """Best score, backoff keys and clear rate per target over `rollouts` rounds, for a batch of deals"""
+    from planner import CARDS
+    from run_engine import RunConfig, Run, chase_strategy
+
+    seed, deals, rollouts, combo_definitions, targets = task
+    rng = random.Random(seed)
+    configs = [RunConfig(antes=1, ante_targets=(target,), blinds=(('Blind', 1.0),)) for target in targets]
+    rows = []
+    for _ in range(deals):
+        hand_ids = rng.sample(range(52), HAND_SIZE)
+        hand = [CARDS[cid] for cid in hand_ids]
+        rates = []
+        for config in configs:
+            cleared = 0
+            for _ in range(rollouts):
+                run = Run(config, combo_definitions, rng.random())
+                # Replace the random opening deal with this one
+                run.hand = list(hand_ids)
+                run.draw = [cid for cid in range(52) if cid not in hand_ids]
+                run.rng.shuffle(run.draw)
+                while not run.over:
+                    action, positions = chase_strategy(run)
+                    if action == 'discard' and run.discards_left > 0:
+                        run.discard(positions)
+                    else:
+                        run.play(positions)
+                cleared += run.won
+            rates.append(cleared / rollouts)
+        rows.append((best_play(hand, combo_definitions).score, backoff_keys(hand), rates))
+    return rows
+
+
+def _cdf(values):
+    """[[value, count of samples below value], ...] over the sorted distinct values"""
+    values = sorted(values)
+    cdf = []
+    for i, value in enumerate(values):
+        if not cdf or cdf[-1][0] != value:
+            cdf.append([value, i])
+    return cdf
+
+
+def build_table(combo_definitions, deals=100000, rollouts=2, targets=TARGETS, workers=None,
+                seed=0, path=TABLE_PATH, batch=250):
+    """Sample deals, estimate clear rates by rollout with the chase strategy, write the table"""
+    tasks = [(seed * 1000003 + start, min(batch, deals - start), rollouts, combo_definitions,
+              targets) for start in range(0, deals, batch)]
+    rows = []
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for batch_rows in pool.map(_sample_deals, tasks):
+            rows.extend(batch_rows)
+
+    clear = {}
+    clear_cdf = {}
+    for t, target in enumerate(targets):
+        # Clear probability per key at every backoff level (the mean over its deals); keys
+        # sampled too rarely to be used are left out
+        sums = {}
+        for _, keys, rates in rows:
+            for k in keys:
+                total, count = sums.get(k, (0.0, 0))
+                sums[k] = (total + rates[t], count + 1)
+        table = {k: [round(total / count, 4), count] for k, (total, count) in sums.items()
+                 if count >= MIN_DEALS or k == ''}
+        clear[str(target)] = table
+        clear_cdf[str(target)] = _cdf(_lookup(table, keys) for _, keys, _ in rows)
+
+    data = {
+        'definitions': definitions_signature(combo_definitions),
+        'samples': len(rows),
+        'rollouts': rollouts,
+        'score_cdf': _cdf(score for score, _, _ in rows),
+        'clear_cdf': clear_cdf,
+        'clear': clear,
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, separators=(',', ':'))
+    _tables.pop(path, None)
+    return data
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the hand-strength percentile table")
+    parser.add_argument('--build', action='store_true', help="sample deals and write the table")
+    parser.add_argument('--deals', type=int, default=100000)
+    parser.add_argument('--rollouts', type=int, default=2)
+    parser.add_argument('--target', type=int, default=300, help="required points for a lookup")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--path', default=TABLE_PATH)
+    parser.add_argument('hand', nargs='*', help="8 card codes to look up, e.g. Ah Kh 10d ...")
+    args = parser.parse_args()
+
+    from game_logic import BalatroPoker
+    if args.build:
+        data = build_table(BalatroPoker.COMBO_DEFINITIONS, args.deals, args.rollouts,
+                           workers=args.workers, seed=args.seed, path=args.path)
+        print(f"Wrote {args.path}: {data['samples']} deals, {len(data['clear'][str(TARGETS[0])])} keys")
+    if args.hand:
+        from card_codes import ids_to_cards, parse_codes
+        ids, errors = parse_codes(' '.join(args.hand))
+        if errors:
+            parser.error(f"invalid card codes: {', '.join(token for _, token in errors)}")
+        print(describe(hand_strength(ids_to_cards(ids), BalatroPoker.COMBO_DEFINITIONS, args.target, args.path)))
+
+
+if __name__ == "__main__":
+    main()
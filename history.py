@@ -0,0 +1,125 @@
+# Undo/redo dan what-if branching untuk game_state, dengan journal per aksi
+from contextlib import contextmanager
+
+APPEND_ONLY = ('played_cards', 'discarded')
+DECK_TAIL = 16  # an action deals at most a hand's worth of cards
+
+
+class HistoryNode:
+    """One recorded action: only what it changed, so its size does not grow with the session"""
+    __slots__ = ('parent', 'children', 'active', 'label', 'hand_before', 'hand_after',
+                 'dealt', 'appended', 'scalars_before', 'scalars_after')
+
+    def __init__(self, parent, label):
+        self.parent = parent
+        self.children = []
+        self.active = None  # child that redo() follows
+        self.label = label
+        self.hand_before = ()
+        self.hand_after = ()
+        self.dealt = ()
+        self.appended = {}
+        self.scalars_before = {}
+        self.scalars_after = {}
+
+
+class GameHistory:
+    """Journaled history of a BalatroPoker game_state, as a tree of actions.
+
+    Wrap every mutating action in record(); undo() and redo() then walk the
+    tree by applying each node's changes backwards or forwards. Recording a new
+    action after an undo starts a new branch; the old one stays reachable
+    through branches() and redo(branch).
+    """
+
+    def __init__(self, game):
+        self.game = game
+        self.reset()
+
+    def reset(self):
+        """Forget everything (a new round replaces the whole game_state)"""
+        self.root = HistoryNode(None, 'Start of round')
+        self.current = self.root
+
+    @contextmanager
+    def record(self, label):
+        state = self.game.game_state
+        hand_before = tuple(state['hand'])
+        deck_len = len(state['deck'])
+        deck_tail = state['deck'][-DECK_TAIL:]
+        lengths = {key: len(state[key]) for key in APPEND_ONLY}
+        scalars = {key: value for key, value in state.items() if not isinstance(value, list)}
+        yield
+        if self.game.game_state is not state:
+            return
+
+        node = HistoryNode(self.current, label)
+        node.hand_before = hand_before
+        node.hand_after = tuple(state['hand'])
+        dealt_count = deck_len - len(state['deck'])
+        node.dealt = tuple(deck_tail[len(deck_tail) - dealt_count:]) if dealt_count else ()
+        node.appended = {key: tuple(state[key][lengths[key]:]) for key in APPEND_ONLY
+                         if len(state[key]) > lengths[key]}
+        for key, value in state.items():
+            if not isinstance(value, list) and scalars.get(key) != value:
+                node.scalars_before[key] = scalars.get(key)
+                node.scalars_after[key] = value
+        if (node.hand_before == node.hand_after and not node.dealt and not node.appended
+                and not node.scalars_after):
+            return
+        self.current.children.append(node)
+        self.current.active = node
+        self.current = node
+
+    def can_undo(self):
+        return self.current is not self.root
+
+    def can_redo(self):
+        return self.current.active is not None
+
+    def undo(self):
+        """Step back one action; returns False when there is nothing to undo"""
+        node = self.current
+        if node is self.root:
+            return False
+        state = self.game.game_state
+        state['hand'][:] = node.hand_before
+        state['deck'].extend(node.dealt)
+        for key, cards in node.appended.items():
+            del state[key][len(state[key]) - len(cards):]
+        state.update(node.scalars_before)
+        node.parent.active = node
+        self.current = node.parent
+        return True
+
+    def redo(self, branch=None):
+        """Replay the next action (or the given branch index); False when there is none"""
+        if branch is not None:
+            if not 0 <= branch < len(self.current.children):
+                return False
+            self.current.active = self.current.children[branch]
+        node = self.current.active
+        if node is None:
+            return False
+        state = self.game.game_state
+        state['hand'][:] = node.hand_after
+        if node.dealt:
+            del state['deck'][-len(node.dealt):]
+        for key, cards in node.appended.items():
+            state[key].extend(cards)
+        state.update(node.scalars_after)
+        self.current = node
+        return True
+
+    def branches(self):
+        """Labels of the actions recorded from the current position"""
+        return [child.label for child in self.current.children]
+
+    def path(self):
+        """Labels from the start of the round to the current position"""
+        labels = []
+        node = self.current
+        while node is not self.root:
+            labels.append(node.label)
+            node = node.parent
+        return labels[::-1]
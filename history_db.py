@@ -0,0 +1,320 @@
+# Riwayat permainan di SQLite: round, aksi, kartu dan combo dengan index untuk query cepat
+import argparse
+import sqlite3
+import time
+from datetime import datetime
+
+from card_codes import card_id, code_to_id, id_to_code, INVALID_ID
+from replay_log import (KIND_DEAL, KIND_PLAY, KIND_DISCARD, KIND_UNDO, KIND_REDO, KIND_NAMES, ActionTree,
+                        combo_names)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS rounds (
+    id INTEGER PRIMARY KEY,
+    started REAL NOT NULL,
+    ended REAL NOT NULL,
+    final_points INTEGER NOT NULL,
+    plays INTEGER NOT NULL,
+    discards INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS combos (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS actions (
+    id INTEGER PRIMARY KEY,
+    round_id INTEGER NOT NULL REFERENCES rounds (id),
+    seq INTEGER NOT NULL,
+    kind INTEGER NOT NULL,
+    combo_id INTEGER REFERENCES combos (id),
+    score INTEGER NOT NULL,
+    points INTEGER NOT NULL,
+    time REAL NOT NULL,
+    undone INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS cards (
+    action_id INTEGER NOT NULL REFERENCES actions (id),
+    position INTEGER NOT NULL,
+    card INTEGER NOT NULL,
+    PRIMARY KEY (action_id, position)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS actions_combo_score ON actions (combo_id, score);
+CREATE INDEX IF NOT EXISTS actions_score ON actions (score);
+CREATE INDEX IF NOT EXISTS actions_time ON actions (time);
+CREATE INDEX IF NOT EXISTS actions_round ON actions (round_id, seq);
+CREATE INDEX IF NOT EXISTS rounds_started ON rounds (started);
+CREATE INDEX IF NOT EXISTS cards_card ON cards (card);
+"""
+
+
+class _Action:
+    """One logged action waiting to be written (action_id is set once it is)"""
+    __slots__ = ('kind', 'combo', 'score', 'points', 'time', 'cards', 'undone', 'target', 'action_id')
+
+    def __init__(self, kind, combo, score, points, at, cards):
+        self.kind = kind
+        self.combo = combo
+        self.score = score
+        self.points = points
+        self.time = at
+        self.cards = cards
+        self.undone = False
+        self.target = None  # the play/discard an undo or redo acts on
+        self.action_id = None
+
+
+class HistoryStore:
+    """Game history in a SQLite file, usable as BalatroPoker.recorder.
+
+    Implements the recorder calls of replay_log.RotatingReplayWriter. The
+    actions of a round are kept in memory and written in one transaction
+    (executemany per table) when the next round starts, on flush() or on
+    close(); a flush in the middle of a round appends to the same round row.
+    Undo and redo are stored as actions too, and flag the play or discard
+    they take back as undone; queries and round counters skip those. A redo
+    of an older what-if branch puts back that branch's action.
+    """
+
+    def __init__(self, path, combo_definitions, timeout=10.0):
+        self.path = path
+        self.db = sqlite3.connect(path, timeout=timeout, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self.db.execute("PRAGMA table_info(actions)")]
+        if columns and 'undone' not in columns:
+            self.db.execute("ALTER TABLE actions ADD COLUMN undone INTEGER NOT NULL DEFAULT 0")
+        self.db.executescript(SCHEMA)
+        self.db.executemany("INSERT OR IGNORE INTO combos (name) VALUES (?)",
+                            [(name,) for name in combo_names(combo_definitions)])
+        self.combo_ids = dict(self.db.execute("SELECT name, id FROM combos"))
+        self.next_round = 1
+        self.round_ids = {}  # recorder round id -> rounds.id once written
+        self.pending = {}    # recorder round id -> [Action] not written yet
+        self.trees = {}      # recorder round id -> ActionTree of its plays and discards, for undo/redo
+
+    def new_round(self):
+        """Id for a new round; pass it to every log call of that round"""
+        self.flush()
+        round_id = self.next_round
+        self.next_round += 1
+        self.pending[round_id] = []
+        self.trees = {round_id: ActionTree()}  # earlier rounds are over, no more undo there
+        return round_id
+
+    def log_deal(self, round_id, cards, points=0):
+        self._log(round_id, KIND_DEAL, cards, None, 0, points)
+
+    def log_play(self, round_id, cards, combo_name, score, points):
+        self._log(round_id, KIND_PLAY, cards, combo_name, score, points)
+
+    def log_discard(self, round_id, cards, points):
+        self._log(round_id, KIND_DISCARD, cards, None, 0, points)
+
+    def log_undo(self, round_id, points):
+        self._log(round_id, KIND_UNDO, (), None, 0, points)
+
+    def log_redo(self, round_id, points, branch=None):
+        """branch is the GameHistory.redo() index when a branch was picked"""
+        self._log(round_id, KIND_REDO, (), None, 0, points, branch)
+
+    def _log(self, round_id, kind, cards, combo_name, score, points, branch=None):
+        action = _Action(kind, combo_name, score, points, time.time(), [card_id(c) for c in cards])
+        self.pending.setdefault(round_id, []).append(action)
+        tree = self.trees.setdefault(round_id, ActionTree())
+        if kind == KIND_PLAY or kind == KIND_DISCARD:
+            tree.add(action)
+        elif kind == KIND_UNDO:
+            action.target = tree.undo()
+            if action.target is not None:
+                action.target.undone = True
+        elif kind == KIND_REDO:
+            action.target = tree.redo(branch)
+            if action.target is not None:
+                action.target.undone = False
+        if action.target is not None and action.target.action_id is not None:
+            # Already written by an earlier flush: update its flag with the next write
+            self.pending[round_id].append(action.target)
+
+    def _combo_id(self, name):
+        if name is None:
+            return None
+        combo = self.combo_ids.get(name)
+        if combo is None:
+            self.db.execute("INSERT OR IGNORE INTO combos (name) VALUES (?)", (name,))
+            combo = self.combo_ids[name] = self.db.execute(
+                "SELECT id FROM combos WHERE name = ?", (name,)).fetchone()[0]
+        return combo
+
+    def flush(self):
+        """Write every buffered action, one transaction for all rounds"""
+        if not any(self.pending.values()):
+            return
+        unwritten = [action for actions in self.pending.values() for action in actions
+                     if action.action_id is None]
+        self.db.execute("BEGIN IMMEDIATE")
+        try:
+            for round_key, actions in self.pending.items():
+                if actions:
+                    self._write_round(round_key, actions)
+            self.db.execute("COMMIT")
+        except Exception:
+            self.db.execute("ROLLBACK")
+            for action in unwritten:
+                action.action_id = None
+            raise
+        self.pending = {round_key: [] for round_key in self.pending if round_key == self.next_round - 1}
+
+    def _write_round(self, round_key, actions):
+        new = [action for action in actions if action.action_id is None]
+        rewritten = {id(action): action for action in actions if action.action_id is not None}
+        rid = self.round_ids.get(round_key)
+        if rid is None:
+            rid = self.db.execute(
+                "INSERT INTO rounds (started, ended, final_points, plays, discards) VALUES (?, ?, ?, ?, ?)",
+                (new[0].time, new[-1].time, new[-1].points, 0, 0)).lastrowid
+            self.round_ids[round_key] = rid
+            seq = 0
+        else:
+            seq = self.db.execute("SELECT COUNT(*) FROM actions WHERE round_id = ?", (rid,)).fetchone()[0]
+
+        # Action ids are assigned here so the card rows can be inserted in the same batch
+        first_id = (self.db.execute("SELECT MAX(id) FROM actions").fetchone()[0] or 0) + 1
+        action_rows = []
+        card_rows = []
+        for offset, action in enumerate(new):
+            action.action_id = first_id + offset
+            action_rows.append((action.action_id, rid, seq + offset, action.kind, self._combo_id(action.combo),
+                                action.score, action.points, action.time, int(action.undone)))
+            card_rows.extend((action.action_id, position, cid) for position, cid in enumerate(action.cards))
+        self.db.executemany("INSERT INTO actions VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", action_rows)
+        self.db.executemany("INSERT INTO cards VALUES (?, ?, ?)", card_rows)
+        self.db.executemany("UPDATE actions SET undone = ? WHERE id = ?",
+                            [(int(action.undone), action.action_id) for action in rewritten.values()])
+
+        # Counters of the round's standing actions (undo can take back ones written earlier)
+        last = new[-1] if new else None
+        self.db.execute(
+            "UPDATE rounds SET ended = COALESCE(?, ended), final_points = COALESCE(?, final_points), "
+            "plays = (SELECT COUNT(*) FROM actions WHERE round_id = ? AND kind = ? AND undone = 0), "
+            "discards = (SELECT COUNT(*) FROM actions WHERE round_id = ? AND kind = ? AND undone = 0) "
+            "WHERE id = ?",
+            (last and last.time, last and last.points, rid, KIND_PLAY, rid, KIND_DISCARD, rid))
+
+    def close(self):
+        self.flush()
+        self.db.close()
+
+    # ---- Queries -------------------------------------------------------------------------
+
+    def plays(self, combo=None, min_score=None, max_score=None, since=None, until=None, card=None,
+              limit=100):
+        """Logged plays, highest score first, as dicts (round, time, combo, score, points, cards).
+
+        combo is a combo name, since/until are timestamps, card a card code
+        or id; e.g. plays('Flush', min_score=200) for all Flushes over 200.
+        """
+        where = ["a.kind = ?", "a.undone = 0"]
+        params = [KIND_PLAY]
+        if combo is not None:
+            where.append("a.combo_id = ?")
+            params.append(self.combo_ids.get(combo, -1))
+        if min_score is not None:
+            where.append("a.score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            where.append("a.score <= ?")
+            params.append(max_score)
+        if since is not None:
+            where.append("a.time >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("a.time < ?")
+            params.append(until)
+        if card is not None:
+            cid = code_to_id(card) if isinstance(card, str) else card
+            if cid == INVALID_ID:
+                raise ValueError(f"Invalid card code: {card}")
+            where.append("a.id IN (SELECT action_id FROM cards WHERE card = ?)")
+            params.append(cid)
+        sql = ("SELECT a.id, a.round_id, a.time, c.name, a.score, a.points FROM actions a "
+               "LEFT JOIN combos c ON c.id = a.combo_id WHERE " + " AND ".join(where) +
+               " ORDER BY a.score DESC")
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        rows = self.db.execute(sql, params).fetchall()
+        cards = self._cards([row[0] for row in rows])
+        return [{'round': round_id, 'time': at, 'combo': name, 'score': score, 'points': points,
+                 'cards': cards.get(action_id, [])}
+                for action_id, round_id, at, name, score, points in rows]
+
+    def round_actions(self, round_id):
+        """Every action of a stored round in order, as dicts (kind, combo, score, points, cards, undone)"""
+        rows = self.db.execute(
+            "SELECT a.id, a.kind, c.name, a.score, a.points, a.time, a.undone FROM actions a "
+            "LEFT JOIN combos c ON c.id = a.combo_id WHERE a.round_id = ? ORDER BY a.seq",
+            (round_id,)).fetchall()
+        cards = self._cards([row[0] for row in rows])
+        return [{'kind': KIND_NAMES[kind], 'combo': name, 'score': score, 'points': points,
+                 'time': at, 'cards': cards.get(action_id, []), 'undone': bool(undone)}
+                for action_id, kind, name, score, points, at, undone in rows]
+
+    def combo_counts(self, since=None):
+        """Plays and mean score per combo type"""
+        sql = ("SELECT c.name, COUNT(*), AVG(a.score) FROM actions a JOIN combos c ON c.id = a.combo_id "
+               "WHERE a.kind = ? AND a.undone = 0")
+        params = [KIND_PLAY]
+        if since is not None:
+            sql += " AND a.time >= ?"
+            params.append(since)
+        sql += " GROUP BY c.name ORDER BY COUNT(*) DESC"
+        return [{'combo': name, 'plays': count, 'mean_score': round(mean, 1)}
+                for name, count, mean in self.db.execute(sql, params)]
+
+    def _cards(self, action_ids):
+        """action id -> card codes, in play order"""
+        cards = {}
+        for start in range(0, len(action_ids), 500):
+            chunk = action_ids[start:start + 500]
+            marks = ",".join("?" * len(chunk))
+            for action_id, _, cid in self.db.execute(
+                    f"SELECT action_id, position, card FROM cards WHERE action_id IN ({marks}) "
+                    "ORDER BY action_id, position", chunk):
+                cards.setdefault(action_id, []).append(id_to_code(cid))
+        return cards
+
+
+def _timestamp(text):
+    return datetime.fromisoformat(text).timestamp() if text else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query a game history database")
+    parser.add_argument('path')
+    parser.add_argument('--combo', default=None, help="combo name, e.g. Flush")
+    parser.add_argument('--min-score', type=int, default=None)
+    parser.add_argument('--max-score', type=int, default=None)
+    parser.add_argument('--since', default=None, help="ISO date, e.g. 2024-05-01")
+    parser.add_argument('--until', default=None, help="ISO date")
+    parser.add_argument('--card', default=None, help="only plays with this card, e.g. Ah")
+    parser.add_argument('--limit', type=int, default=20)
+    parser.add_argument('--summary', action='store_true', help="plays and mean score per combo")
+    args = parser.parse_args()
+
+    store = HistoryStore(args.path, [])
+    if args.summary:
+        for row in store.combo_counts(_timestamp(args.since)):
+            print(f"{row['combo']:<16} {row['plays']:>8} plays, mean score {row['mean_score']}")
+        return
+    started = time.perf_counter()
+    rows = store.plays(args.combo, args.min_score, args.max_score, _timestamp(args.since),
+                       _timestamp(args.until), args.card, args.limit)
+    elapsed = (time.perf_counter() - started) * 1000
+    for row in rows:
+        when = datetime.fromtimestamp(row['time']).strftime('%Y-%m-%d %H:%M')
+        print(f"{when}  round {row['round']:<6} {row['combo']:<16} {row['score']:>5}  {' '.join(row['cards'])}")
+    print(f"{len(rows)} plays ({elapsed:.1f} ms)")
+
+
+if __name__ == "__main__":
+    main()
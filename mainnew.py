@@ -1,13 +1,41 @@
 # main.py
+import atexit
+import os
 import flet as ft
+from analysis_cache import AnalysisCache
+from disk_cache import DiskCache
 from game_logic import BalatroPoker
+from history_db import HistoryStore
+from speculation import Speculator
+from metrics import instrument_game, serve_metrics, write_at_exit
+
+# Set ACELATRO_METRICS_PORT to serve latency metrics at http://127.0.0.1:<port>/metrics
+METRICS_PORT = os.environ.get('ACELATRO_METRICS_PORT')
+# Set ACELATRO_METRICS_FILE to write them to a file on exit (.json for JSON, Prometheus text otherwise)
+METRICS_FILE = os.environ.get('ACELATRO_METRICS_FILE')
+# Set ACELATRO_CACHE_DB to a file path to keep hand analyses across sessions
+CACHE_DB = os.environ.get('ACELATRO_CACHE_DB')
+# Set ACELATRO_HISTORY_DB to a file path to keep every played round (query it with history_db.py)
+HISTORY_DB = os.environ.get('ACELATRO_HISTORY_DB')
 
 def main(page: ft.Page):
     page.title = "Balatro Poker Assistant"
     page.theme_mode = ft.ThemeMode.LIGHT
     
-    # Create the game instance
-    game = BalatroPoker(page)
+    # Create the game instance; likely next hands are analyzed while the player thinks
+    game = BalatroPoker(page, analysis_cache=AnalysisCache())
+    game.speculator = Speculator(game, lambda cards: game.analyze_cards(cards, sync=False))
+    if CACHE_DB:
+        game.disk_cache = DiskCache(CACHE_DB, game.COMBO_DEFINITIONS)
+    if HISTORY_DB:
+        game.recorder = HistoryStore(HISTORY_DB, game.COMBO_DEFINITIONS)
+        atexit.register(game.recorder.close)
+    if METRICS_PORT or METRICS_FILE:
+        instrument_game(game)
+    if METRICS_PORT:
+        serve_metrics(int(METRICS_PORT))
+    if METRICS_FILE:
+        write_at_exit(METRICS_FILE)
     
     # Set up the game
     game.start_round()
@@ -0,0 +1,229 @@
+# Latency histogram, counter dan export metrics (Prometheus text / JSON) untuk operasi engine
+import atexit
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SUB_BUCKET_BITS = 5               # 32 sub-buckets per power of two: about 3% relative error
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_MICROS = (1 << 40) - 1        # about 12 days
+BUCKET_COUNT = (40 - SUB_BUCKET_BITS + 2) * SUB_BUCKETS
+QUANTILES = (0.5, 0.9, 0.99, 0.999)
+
+
+def _bucket_index(micros):
+    if micros < SUB_BUCKETS:
+        return micros
+    shift = micros.bit_length() - SUB_BUCKET_BITS - 1
+    return (shift + 1) * SUB_BUCKETS + (micros >> shift) - SUB_BUCKETS
+
+
+def _bucket_upper(index):
+    """Largest value that lands in a bucket"""
+    if index < SUB_BUCKETS:
+        return index
+    shift = index // SUB_BUCKETS - 1
+    sub = index % SUB_BUCKETS + SUB_BUCKETS
+    return ((sub + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of latencies in microseconds; recording is O(1)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.counts = [0] * BUCKET_COUNT
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def record(self, seconds):
+        micros = min(max(int(seconds * 1e6), 0), MAX_MICROS)
+        with self.lock:
+            self.counts[_bucket_index(micros)] += 1
+            self.count += 1
+            self.total += seconds
+            if self.min is None or seconds < self.min:
+                self.min = seconds
+            if self.max is None or seconds > self.max:
+                self.max = seconds
+
+    def quantile(self, q):
+        """Latency in seconds at quantile q (0..1), None when empty"""
+        with self.lock:
+            if not self.count:
+                return None
+            target = max(1, int(q * self.count + 0.5))
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= target:
+                    return min(_bucket_upper(index) / 1e6, self.max)
+        return self.max
+
+    def snapshot(self):
+        return {
+            'count': self.count,
+            'sum_seconds': self.total,
+            'min_seconds': self.min,
+            'max_seconds': self.max,
+            'quantiles': {str(q): self.quantile(q) for q in QUANTILES}
+        }
+
+
+class MetricsRegistry:
+    """Named histograms, counters and gauges (gauges are callables read at export time)"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.help = {}
+
+    def histogram(self, name, help_text=''):
+        with self.lock:
+            if name not in self.histograms:
+                self.histograms[name] = LatencyHistogram()
+                self.help[name] = help_text
+            return self.histograms[name]
+
+    def inc(self, name, amount=1, help_text=''):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+            self.help.setdefault(name, help_text)
+
+    def gauge(self, name, read, help_text=''):
+        with self.lock:
+            self.gauges[name] = read
+            self.help[name] = help_text
+
+    @contextmanager
+    def timed(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.histogram(name).record(time.perf_counter() - started)
+
+    def snapshot(self):
+        """JSON-ready view of every metric"""
+        return {
+            'timestamp': time.time(),
+            'histograms': {name: h.snapshot() for name, h in list(self.histograms.items())},
+            'counters': dict(self.counters),
+            'gauges': {name: read() for name, read in list(self.gauges.items())}
+        }
+
+    def prometheus_text(self):
+        """Prometheus text exposition (histograms exported as summaries)"""
+        lines = []
+        for name, histogram in sorted(self.histograms.items()):
+            metric = f"acelatro_{name}_seconds"
+            lines.append(f"# HELP {metric} {self.help.get(name) or name + ' latency'}")
+            lines.append(f"# TYPE {metric} summary")
+            for q in QUANTILES:
+                value = histogram.quantile(q)
+                lines.append(f'{metric}{{quantile="{q}"}} {"NaN" if value is None else repr(value)}')
+            lines.append(f"{metric}_sum {histogram.total!r}")
+            lines.append(f"{metric}_count {histogram.count}")
+        for name, value in sorted(self.counters.items()):
+            metric = f"acelatro_{name}_total"
+            lines.append(f"# HELP {metric} {self.help.get(name) or name}")
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        for name, read in sorted(self.gauges.items()):
+            metric = f"acelatro_{name}"
+            lines.append(f"# HELP {metric} {self.help.get(name) or name}")
+            lines.append(f"# TYPE {metric} gauge")
+            lines.append(f"{metric} {float(read())!r}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path):
+        """Write a snapshot to path: JSON if it ends with .json, Prometheus text otherwise"""
+        if path.endswith('.json'):
+            data = json.dumps(self.snapshot(), indent=2)
+        else:
+            data = self.prometheus_text()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(data)
+
+
+REGISTRY = MetricsRegistry()
+
+
+def instrument(obj, method_names, registry=REGISTRY, prefix=''):
+    """Wrap bound methods of obj so every call is timed into histogram <prefix><method>"""
+    for method_name in method_names:
+        method = getattr(obj, method_name)
+        histogram = registry.histogram(prefix + method_name, f"{method_name} latency")
+
+        @functools.wraps(method)
+        def timed_method(*args, _method=method, _histogram=histogram, **kwargs):
+            started = time.perf_counter()
+            try:
+                return _method(*args, **kwargs)
+            finally:
+                _histogram.record(time.perf_counter() - started)
+
+        setattr(obj, method_name, timed_method)
+    return obj
+
+
+def cache_gauges(cache, name, registry=REGISTRY):
+    """Export hit rate and size of an AnalysisCache-like object (hits, misses, __len__)"""
+    registry.gauge(f"{name}_hit_ratio", lambda: cache.hit_rate, f"{name} hit ratio")
+    registry.gauge(f"{name}_entries", lambda: len(cache), f"{name} entries")
+    registry.gauge(f"{name}_hits", lambda: cache.hits, f"{name} hits")
+    registry.gauge(f"{name}_misses", lambda: cache.misses, f"{name} misses")
+
+
+def instrument_game(game, registry=REGISTRY):
+    """Time the engine operations and UI refresh of a game_logic.BalatroPoker instance"""
+    instrument(game, ('analyze_hand', 'top_combos', 'identify_combo', 'play_combo', 'discard_cards',
+                      'update_ui'), registry)
+    if game.analysis_cache is not None:
+        cache_gauges(game.analysis_cache, 'analysis_cache', registry)
+    return game
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        registry = self.server.registry
+        if self.path == '/metrics':
+            data, content_type = registry.prometheus_text(), 'text/plain; version=0.0.4'
+        elif self.path == '/metrics.json':
+            data, content_type = json.dumps(registry.snapshot()), 'application/json'
+        else:
+            self.send_error(404)
+            return
+        body = data.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def write_at_exit(path, registry=REGISTRY):
+    """Write a snapshot to path (MetricsRegistry.write) when the process exits"""
+    atexit.register(registry.write, path)
+
+
+def serve_metrics(port=9464, registry=REGISTRY):
+    """Serve /metrics and /metrics.json on localhost from a background thread"""
+    server = ThreadingHTTPServer(('127.0.0.1', port), _MetricsHandler)
+    server.daemon_threads = True
+    server.registry = registry
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
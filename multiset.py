@@ -0,0 +1,66 @@
+# Kombinasi kartu sebagai multiset: kartu kembar (multi-deck) dihitung sekali, dengan jumlah caranya
+from itertools import combinations
+from math import comb
+
+from card_codes import card_id
+
+
+def id_positions(cards):
+    """card id -> positions of its copies in cards, in order"""
+    positions = {}
+    for i, c in enumerate(cards):
+        positions.setdefault(card_id(c), []).append(i)
+    return positions
+
+
+def multiset_combinations(cards, k):
+    """Yield (combo, ways) for every distinct k-card multiset of cards.
+
+    combo is the first combinations(cards, k) tuple with that multiset and the
+    results come in combinations() order, so without duplicates this is
+    exactly combinations() with ways=1. ways counts the physical card choices
+    that give the same multiset (copies of a card id are interchangeable).
+    """
+    positions = id_positions(cards)
+    if len(positions) == len(cards):
+        for combo in combinations(cards, k):
+            yield combo, 1
+        return
+    groups = list(positions.values())
+    picks = []
+
+    def choose(group, remaining, ways, chosen):
+        if remaining == 0:
+            picks.append((sorted(chosen), ways))
+            return
+        if group == len(groups):
+            return
+        copies = groups[group]
+        for take in range(min(len(copies), remaining), -1, -1):
+            choose(group + 1, remaining - take, ways * comb(len(copies), take), chosen + copies[:take])
+
+    choose(0, k, 1, [])
+    picks.sort()
+    for chosen, ways in picks:
+        yield tuple(cards[i] for i in chosen), ways
+
+
+def multiset_key(cards):
+    """Order- and copy-independent key of a combo: its sorted card ids"""
+    return tuple(sorted(card_id(c) for c in cards))
+
+
+def combo_ways(combo, hand):
+    """How many physical choices of cards from hand give the multiset of combo"""
+    in_hand = {}
+    for c in hand:
+        cid = card_id(c)
+        in_hand[cid] = in_hand.get(cid, 0) + 1
+    wanted = {}
+    for c in combo:
+        cid = card_id(c)
+        wanted[cid] = wanted.get(cid, 0) + 1
+    ways = 1
+    for cid, count in wanted.items():
+        ways *= comb(in_hand.get(cid, 0), count)
+    return ways
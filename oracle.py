@@ -0,0 +1,341 @@
+# Oracle ronde dengan urutan deck diketahui: beam search untuk skor akhir tertinggi
+import argparse
+import heapq
+import os
+import random
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from best_play import best_play
+from card_codes import card_id, hand_mask, mask_to_ids
+from combo_stream import HAND_FILTERS, HandProfile, subsets_by_chip_sum
+from compact_state import CompactState
+from planner import CARDS, DISCARDS_PER_ROUND, HAND_SIZE, PLAYS_PER_ROUND
+from run_engine import identify_combo
+from scoring import ScoringPipeline
+
+
+def play_bound(cards, combo_definitions):
+    """Upper bound on any single play made from cards: best (base + top chips) * mult over feasible rules"""
+    if not cards:
+        return 0
+    ranked = sorted((c.chip_value for c in cards), reverse=True)
+    profile = HandProfile(cards)
+    bound = (5 + ranked[0]) * 1
+    for combo_def in combo_definitions:
+        k = combo_def['card_count']
+        if k > len(cards):
+            continue
+        hand_filter = HAND_FILTERS.get(combo_def['check'])
+        if hand_filter is not None and not hand_filter(profile, k):
+            continue
+        bound = max(bound, (combo_def['score']['base'] + sum(ranked[:k])) * combo_def['score']['mult'])
+    return bound
+
+
+class BeamOracle:
+    """Best final score of a round whose deck order is known, by beam search.
+
+    Every level applies one action (a play or a discard) to each state in the
+    beam. Children that reach the same hand, deck position and remaining
+    plays/discards are merged (the one with more points wins, since the rest
+    of the round is then identical), children whose points plus
+    plays_left * play_bound cannot beat the best finished line are pruned,
+    and the next beam keeps the `width` most promising children for every
+    (plays left, discards left) pair, so lines that spent a discard compete
+    only with lines that did the same. The greedy line (best play every
+    time) seeds the best finished line, so the result is never below greedy.
+    Plays and discards follow the planner's action space: the best
+    `play_candidates` plays, and discards around the best
+    `discard_candidates` plays, throwing away each of discard_sizes of the
+    lowest-chip other cards. Scores use the combo definitions' base scores;
+    a graded play is scored as the game scores it, kickers included.
+    """
+
+    def __init__(self, combo_definitions, width=8, lookahead=10, play_candidates=3, discard_candidates=3,
+                 discard_sizes=(1, 3, 5), cache_size=50000):
+        self.combo_definitions = combo_definitions
+        self.width = width
+        self.lookahead = lookahead
+        self.play_candidates = play_candidates
+        self.discard_candidates = discard_candidates
+        self.discard_sizes = discard_sizes
+        self.scorer = ScoringPipeline().compile(combo_definitions)
+        self.play_cache = OrderedDict()
+        self.play_cache_size = cache_size
+        self.deck = b''
+        self.nodes = 0
+        self.merged = 0
+        self.pruned = 0
+
+    def ranked_plays(self, hand_bits):
+        """(score, name, ids) of the best play of every rule the hand satisfies, best first.
+
+        One play per rule keeps the candidates varied and stops each rule's
+        walk at its first passing subset, like best_play, instead of
+        enumerating every combo of the hand.
+        """
+        plays = self.play_cache.get(hand_bits)
+        if plays is not None:
+            self.play_cache.move_to_end(hand_bits)
+            return plays
+        cards = [CARDS[cid] for cid in mask_to_ids(hand_bits)]
+        profile = HandProfile(cards)
+        by_size = {}
+        found = {}
+        for combo_def in self.combo_definitions:
+            k = combo_def['card_count']
+            if k > len(cards):
+                continue
+            hand_filter = HAND_FILTERS.get(combo_def['check'])
+            if hand_filter is not None and not hand_filter(profile, k):
+                continue
+            if k not in by_size:
+                by_size[k] = subsets_by_chip_sum(cards, k)
+            check = combo_def['check']
+            for chip_sum, subset in by_size[k]:
+                if check(subset):
+                    ids = tuple(card_id(c) for c in subset)
+                    score = (combo_def['score']['base'] + chip_sum) * combo_def['score']['mult']
+                    if ids not in found or found[ids][0] < score:
+                        found[ids] = (score, combo_def['name'], ids)
+                    break
+        max_card = max(cards, key=lambda c: c.value)
+        ids = (card_id(max_card),)
+        if ids not in found:
+            found[ids] = ((5 + max_card.chip_value) * 1, 'High Card', ids)
+        plays = sorted(found.values(), key=lambda play: (-play[0], play[1]))
+        self.play_cache[hand_bits] = plays
+        if len(self.play_cache) > self.play_cache_size:
+            self.play_cache.popitem(last=False)
+        return plays
+
+    def actions(self, hand_bits, plays_left, discards_left):
+        """Candidate (kind, ids, name, score) actions, as in RoundPlanner.actions"""
+        plays = self.ranked_plays(hand_bits)
+        actions = []
+        if plays_left > 0:
+            actions.extend(('play', ids, name, score) for score, name, ids in plays[:self.play_candidates])
+        if discards_left > 0:
+            hand_ids = mask_to_ids(hand_bits)
+            discards = set()
+            for _, _, ids in plays[:self.discard_candidates]:
+                rest = sorted((cid for cid in hand_ids if cid not in ids),
+                              key=lambda cid: CARDS[cid].chip_value)
+                for size in self.discard_sizes:
+                    discard = tuple(rest[:size])
+                    if discard and discard not in discards:
+                        discards.add(discard)
+                        actions.append(('discard', discard, None, 0))
+        return actions
+
+    @staticmethod
+    def _deal(hand_bits, deck, cursor):
+        need = HAND_SIZE - bin(hand_bits).count('1')
+        end = min(cursor + need, len(deck))
+        for cid in deck[cursor:end]:
+            hand_bits |= 1 << cid
+        return hand_bits, end
+
+    def _priority(self, node):
+        """Beam order within a level: points plus the play_bound of the hand and the next cards.
+
+        The deck is known, so the cards the remaining discards could bring in
+        (up to `lookahead`) count towards the potential of the hand.
+        """
+        points, hand_bits, cursor, _, discards_left, _ = node
+        coming = self.deck[cursor:cursor + min(self.lookahead, 5 * discards_left)]
+        cards = [CARDS[cid] for cid in mask_to_ids(hand_bits)]
+        cards.extend(CARDS[cid] for cid in coming)
+        return points + play_bound(cards, self.combo_definitions)
+
+    def select(self, children):
+        """Next beam: the `width` best children for every (plays left, discards left) pair"""
+        levels = {}
+        for node in children:
+            levels.setdefault((node[3], node[4]), []).append(node)
+        beam = []
+        for nodes in levels.values():
+            beam.extend(heapq.nlargest(self.width, nodes, key=self._priority))
+        return beam
+
+    def greedy(self, hand_bits, deck, cursor, points, plays_left):
+        """Final points and actions of playing the best combo every time"""
+        path = None
+        while plays_left > 0 and hand_bits:
+            score, name, ids = self.ranked_plays(hand_bits)[0]
+            path = (('play', ids, name, score), path)
+            points += score
+            plays_left -= 1
+            hand_bits, cursor = self._deal(hand_bits & ~hand_mask(ids), deck, cursor)
+        return points, path
+
+    def solve(self, state, plays_left=None, discards_left=None):
+        """Best line for a CompactState; deck[cursor:] is the exact order of the coming cards.
+
+        Returns a dict with 'score' (final points), 'actions' (list of dicts
+        with 'action', 'cards' as ids, 'name' and 'score'), 'greedy_score'
+        and the search counters 'nodes', 'merged' and 'pruned'.
+        """
+        if plays_left is None:
+            plays_left = max(PLAYS_PER_ROUND - state.plays_made, 0)
+        if discards_left is None:
+            discards_left = max(DISCARDS_PER_ROUND - state.discard_count, 0)
+        deck = self.deck = state.deck
+        self.nodes = self.merged = self.pruned = 0
+
+        # No play can use a card beyond the most the round can draw (5 per action)
+        window = deck[state.cursor:state.cursor + 5 * (plays_left + discards_left)]
+        bound = play_bound([CARDS[cid] for cid in mask_to_ids(state.hand) + list(window)],
+                           self.combo_definitions)
+        greedy_score, best_path = self.greedy(state.hand, deck, state.cursor,
+                                              state.current_points, plays_left)
+        best_score = greedy_score
+
+        beam = [(state.current_points, state.hand, state.cursor, plays_left, discards_left, None)]
+        while beam:
+            children = {}
+            for points, hand_bits, cursor, plays, discards, path in beam:
+                for action in self.actions(hand_bits, plays, discards):
+                    self.nodes += 1
+                    kind, ids, _, score = action
+                    if kind == 'play':
+                        child = (points + score, plays - 1, discards)
+                    else:
+                        child = (points, plays, discards - 1)
+                    child_points, child_plays, child_discards = child
+                    child_hand, child_cursor = self._deal(hand_bits & ~hand_mask(ids), deck, cursor)
+                    child_path = (action, path)
+                    if child_plays == 0 or not child_hand:
+                        if child_points > best_score:
+                            best_score, best_path = child_points, child_path
+                        continue
+                    if child_points + child_plays * bound <= best_score:
+                        self.pruned += 1
+                        continue
+                    key = (child_hand, child_cursor, child_plays, child_discards)
+                    other = children.get(key)
+                    if other is not None:
+                        self.merged += 1
+                        if other[0] >= child_points:
+                            continue
+                    children[key] = (child_points, child_hand, child_cursor, child_plays,
+                                     child_discards, child_path)
+            beam = self.select(children.values())
+
+        actions = []
+        while best_path is not None:
+            (kind, ids, name, score), best_path = best_path
+            actions.append({'action': kind, 'cards': list(ids), 'name': name, 'score': score})
+        actions.reverse()
+        return {
+            'score': best_score,
+            'actions': actions,
+            'greedy_score': greedy_score,
+            'nodes': self.nodes,
+            'merged': self.merged,
+            'pruned': self.pruned
+        }
+
+    def solve_game(self, game, plays_left=PLAYS_PER_ROUND, discards_left=None, deck=None):
+        """solve() for a BalatroPoker game_state.
+
+        deck, if given, is the coming cards in deal order (first dealt first);
+        otherwise game_state['deck'] is used as it stands. Card objects in the
+        result are taken from the hand and the deck.
+        """
+        state = CompactState.from_dict(game.game_state)
+        coming = list(deck) if deck is not None else list(reversed(game.game_state['deck']))
+        state.deck = bytes(card_id(c) for c in coming)
+        ids = [card_id(c) for c in game.game_state['hand']] + list(state.deck)
+        if len(set(ids)) < len(ids):
+            raise ValueError("The oracle needs distinct cards (single-deck games only)")
+        result = self.solve(state, plays_left, discards_left)
+        by_id = {card_id(c): c for c in list(game.game_state['hand']) + coming}
+        for action in result['actions']:
+            action['cards'] = [by_id[cid] for cid in action['cards']]
+        return result
+
+    def grade(self, state, action, plays_left=None, discards_left=None):
+        """How much an action ('play' | 'discard', card ids) gives up against the oracle line.
+
+        Returns a dict with 'oracle' (best final score from state), 'after'
+        (best final score after taking the action) and 'regret' (their difference).
+        """
+        if plays_left is None:
+            plays_left = max(PLAYS_PER_ROUND - state.plays_made, 0)
+        if discards_left is None:
+            discards_left = max(DISCARDS_PER_ROUND - state.discard_count, 0)
+        best = self.solve(state, plays_left, discards_left)['score']
+        kind, ids = action
+        after = state.copy()
+        if kind == 'play':
+            name = identify_combo([CARDS[cid] for cid in ids], self.combo_definitions)
+            held = [cid for cid in mask_to_ids(state.hand) if cid not in ids]
+            after.play(hand_mask(ids), self.scorer.score_ids(self.scorer.index[name], ids, held))
+            plays_left -= 1
+        else:
+            after.discard(hand_mask(ids))
+            discards_left -= 1
+        if plays_left == 0 or not after.hand:
+            value = after.current_points
+        else:
+            value = self.solve(after, plays_left, discards_left)['score']
+        return {'oracle': best, 'after': value, 'regret': best - value}
+
+
+def random_round(seed):
+    """A fresh round (CompactState) with a shuffled deck"""
+    deck = list(range(52))
+    random.Random(seed).shuffle(deck)
+    state = CompactState(deck=bytes(deck))
+    state.deal()
+    return state
+
+
+def _solve_batch(task):
+    states, combo_definitions, options = task
+    oracle = BeamOracle(combo_definitions, **options)
+    return [(result['score'], result['greedy_score'])
+            for result in (oracle.solve(state) for state in states)]
+
+
+def solve_many(states, combo_definitions, workers=None, chunk=100, **options):
+    """(oracle score, greedy score) for many CompactStates, spread over a process pool"""
+    states = list(states)
+    tasks = [(states[start:start + chunk], combo_definitions, options)
+             for start in range(0, len(states), chunk)]
+    workers = workers or os.cpu_count()
+    results = []
+    if workers == 1:
+        for batch in map(_solve_batch, tasks):
+            results.extend(batch)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for batch in pool.map(_solve_batch, tasks):
+                results.extend(batch)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Oracle scores of random rounds with a known deck order")
+    parser.add_argument('--rounds', type=int, default=1000)
+    parser.add_argument('--width', type=int, default=8)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    from game_logic import BalatroPoker
+    states = [random_round(args.seed * 1000003 + i) for i in range(args.rounds)]
+    started = time.perf_counter()
+    results = solve_many(states, BalatroPoker.COMBO_DEFINITIONS, args.workers, width=args.width)
+    elapsed = time.perf_counter() - started
+    oracle = sum(score for score, _ in results) / len(results)
+    greedy = sum(score for _, score in results) / len(results)
+    print(f"{len(results)} rounds in {elapsed:.1f}s ({len(results) / elapsed * 60:.0f} per minute)")
+    print(f"mean oracle score {oracle:.1f}, mean greedy score {greedy:.1f}")
+
+
+if __name__ == "__main__":
+    main()
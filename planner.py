@@ -0,0 +1,314 @@
+# Expectimax round planner: mencari urutan play/discard dengan peluang tertinggi mencapai required_points
+import random
+from bisect import bisect_left
+from collections import OrderedDict
+from itertools import combinations
+
+from best_play import best_play
+from card import Card
+from card_codes import card_id, card_from_id, hand_mask, mask_to_ids
+from combos import definitions_signature
+
+PLAYS_PER_ROUND = 3
+DISCARDS_PER_ROUND = 5
+HAND_SIZE = 8
+# The leaf estimate's fresh-hand scores: quantiles of the best score over sampled deals
+FRESH_QUANTILES = 20
+FRESH_DEALS = 2000
+# Totals of several fresh hands are thinned to this many quantiles (20 ** plays otherwise)
+MAX_FRESH_SUMS = 1024
+
+# One shared Card object per id so the rule checks in combos.py can run on ids
+CARDS = [card_from_id(cid, Card) for cid in range(52)]
+
+
+class SearchAborted(Exception):
+    """Raised inside a search when its stop_check says time is up or it was cancelled"""
+
+
+class TranspositionTable:
+    """Fixed-size table of search results, indexed by key modulo size.
+
+    Each slot holds (key, depth, value, generation). A new result replaces the
+    slot when the slot is empty, belongs to an older search (generation), or
+    was searched no deeper than the new result; otherwise the deeper result is
+    kept. Lookups only accept entries searched at least as deep as requested.
+    Entries of older searches are still read: the key holds the whole node,
+    blind target included, so they answer the same question.
+    """
+
+    def __init__(self, size=1 << 18):
+        self.size = size
+        self.slots = [None] * size
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.rejected = 0
+
+    def new_search(self):
+        """Age existing entries so they give way to results of the next search"""
+        self.generation += 1
+
+    def get(self, key, depth):
+        entry = self.slots[key % self.size]
+        if entry is not None and entry[0] == key and entry[1] >= depth:
+            self.hits += 1
+            return entry[2]
+        self.misses += 1
+        return None
+
+    def put(self, key, depth, value):
+        index = key % self.size
+        entry = self.slots[index]
+        if entry is None or entry[3] != self.generation or entry[1] <= depth:
+            self.slots[index] = (key, depth, value, self.generation)
+            self.stores += 1
+        else:
+            self.rejected += 1
+
+    def clear(self):
+        self.slots = [None] * self.size
+
+
+def state_key(hand, deck, points, plays_left, discards_left, required_points):
+    """Integer key for a node (hand and deck as masks); stable across processes"""
+    return hash((hand, deck, points, plays_left, discards_left, required_points)) & 0xFFFFFFFFFFFFFFFF
+
+
+_fresh_scores = {}
+_fresh_sums = {}
+
+
+def _quantiles(values, count):
+    """count evenly spaced quantiles (at 0.5/count, 1.5/count, ...) of sorted values"""
+    return tuple(values[(2 * i + 1) * len(values) // (2 * count)] for i in range(count))
+
+
+def fresh_hand_scores(combo_definitions):
+    """Best immediate score of a random 8-card hand at its 2.5%, 7.5%, ..., 97.5% points.
+
+    Sampled once per process for each set of combo scores (a fixed seed, so
+    every process gets the same table).
+    """
+    signature = repr(definitions_signature(combo_definitions))
+    scores = _fresh_scores.get(signature)
+    if scores is None:
+        rng = random.Random(0)
+        best = sorted(best_play([CARDS[cid] for cid in rng.sample(range(52), HAND_SIZE)],
+                                combo_definitions).score for _ in range(FRESH_DEALS))
+        scores = _fresh_scores[signature] = _quantiles(best, FRESH_QUANTILES)
+    return scores
+
+
+def fresh_hand_sums(scores, plays):
+    """Sorted totals of `plays` fresh hands, every mix of scores equally likely.
+
+    Past MAX_FRESH_SUMS totals the list is thinned to that many quantiles
+    after each hand, so its size stops growing with plays.
+    """
+    sums = _fresh_sums.get((scores, plays))
+    if sums is None:
+        sums = [0]
+        for _ in range(plays):
+            sums = sorted(total + score for total in sums for score in scores)
+            if len(sums) > MAX_FRESH_SUMS:
+                sums = list(_quantiles(sums, MAX_FRESH_SUMS))
+        _fresh_sums[(scores, plays)] = sums
+    return sums
+
+
+class RoundPlanner:
+    """Searches play/discard decisions to maximize the chance of reaching required_points.
+
+    Decision nodes try the best `play_candidates` plays and `discard_candidates`
+    discard options; chance nodes average over `chance_samples` random draws
+    from the unseen deck. Past max_depth decisions a node is scored by a greedy
+    estimate: the chance that the best play now plus a fresh hand's best play
+    for every later play reaches the target.
+    """
+
+    def __init__(self, combo_definitions, required_points=300, max_depth=2, chance_samples=3,
+                 play_candidates=3, discard_candidates=3, max_discard=5, table=None, seed=None):
+        self.combo_definitions = combo_definitions
+        self.required_points = required_points
+        self.max_depth = max_depth
+        self.chance_samples = chance_samples
+        self.play_candidates = play_candidates
+        self.discard_candidates = discard_candidates
+        self.max_discard = max_discard
+        self.table = table if table is not None else TranspositionTable()
+        self.rng = random.Random(seed)
+        self.play_cache = OrderedDict()
+        self.play_cache_size = 50000
+        self.nodes = 0
+        self.stop_check = None  # Optional callable; when it returns True the search raises SearchAborted
+        self.fresh_scores = fresh_hand_scores(combo_definitions)
+
+    def plan(self, hand, deck, points=0, plays_left=PLAYS_PER_ROUND, discards_left=DISCARDS_PER_ROUND):
+        """Best next action for a hand of card objects.
+
+        Returns a dict with 'action' ('play' or 'discard'), 'cards' (objects
+        from hand), 'name' and 'score' for plays, and 'probability' of clearing.
+        """
+        by_id = {card_id(c): c for c in hand}
+        best = self.plan_bits(hand_mask(by_id), hand_mask(card_id(c) for c in deck), points,
+                              plays_left, discards_left)
+        if best is None:
+            return None
+        return dict(best, cards=[by_id[cid] for cid in best['cards']])
+
+    def plan_bits(self, hand_bits, deck_bits, points, plays_left, discards_left):
+        """plan() on card masks; 'cards' in the result are card ids"""
+        self.table.new_search()
+        best = None
+        for action in self.actions(hand_bits, plays_left, discards_left):
+            value = self.action_value(action, hand_bits, deck_bits, points, plays_left,
+                                      discards_left, self.max_depth)
+            if best is None or value > best[0]:
+                best = (value, action)
+        if best is None:
+            return None
+        value, (kind, ids, name, score) = best
+        return {
+            'action': kind,
+            'cards': list(ids),
+            'name': name,
+            'score': score,
+            'probability': value
+        }
+
+    def plan_compact(self, state):
+        """plan_bits() for a CompactState; the deck order is treated as unknown"""
+        self.required_points = state.required_points
+        return self.plan_bits(state.hand, state.deck_mask, state.current_points,
+                              max(PLAYS_PER_ROUND - state.plays_made, 0),
+                              max(DISCARDS_PER_ROUND - state.discard_count, 0))
+
+    def plan_game(self, game, plays_left=PLAYS_PER_ROUND, discards_left=None):
+        """plan() for a BalatroPoker game_state"""
+        state = game.game_state
+        if discards_left is None:
+            discards_left = max(DISCARDS_PER_ROUND - state['discard_count'], 0)
+        self.required_points = state['required_points']
+        return self.plan(state['hand'], state['deck'], state['current_points'],
+                         plays_left, discards_left)
+
+    def ranked_plays(self, hand_bits):
+        """(score, name, ids) for every qualifying combo in the hand, best first"""
+        plays = self.play_cache.get(hand_bits)
+        if plays is not None:
+            self.play_cache.move_to_end(hand_bits)
+            return plays
+        cards = [CARDS[cid] for cid in mask_to_ids(hand_bits)]
+        found = {}
+        for combo_def in self.combo_definitions:
+            required_count = combo_def['card_count']
+            base = combo_def['score']['base']
+            mult = combo_def['score']['mult']
+            for combo in combinations(cards, required_count):
+                if combo_def['check'](combo):
+                    ids = tuple(card_id(c) for c in combo)
+                    key = (combo_def['name'], ids)
+                    if key not in found:
+                        found[key] = (base + sum(c.chip_value for c in combo)) * mult
+        if cards:
+            max_card = max(cards, key=lambda c: c.value)
+            found[('High Card', (card_id(max_card),))] = (5 + max_card.chip_value) * 1
+        plays = sorted(((score, name, ids) for (name, ids), score in found.items()),
+                       key=lambda play: (-play[0], play[1]))
+        self.play_cache[hand_bits] = plays
+        if len(self.play_cache) > self.play_cache_size:
+            self.play_cache.popitem(last=False)
+        return plays
+
+    def actions(self, hand_bits, plays_left, discards_left):
+        """Candidate (kind, ids, name, score) actions for a decision node"""
+        plays = self.ranked_plays(hand_bits)
+        actions = []
+        if plays_left > 0:
+            seen = set()
+            for score, name, ids in plays:
+                if ids in seen:
+                    continue
+                seen.add(ids)
+                actions.append(('play', ids, name, score))
+                if len(actions) >= self.play_candidates:
+                    break
+        if discards_left > 0:
+            # Keep the cards of one of the best plays and throw away the rest (lowest chips first)
+            hand_ids = mask_to_ids(hand_bits)
+            discards = []
+            for _, _, ids in plays:
+                rest = sorted((cid for cid in hand_ids if cid not in ids),
+                              key=lambda cid: CARDS[cid].chip_value)
+                discard = tuple(rest[:self.max_discard])
+                if discard and discard not in discards:
+                    discards.append(discard)
+                if len(discards) >= self.discard_candidates:
+                    break
+            actions.extend(('discard', ids, None, 0) for ids in discards)
+        return actions
+
+    def apply_action(self, action, hand_bits, points, plays_left, discards_left):
+        """State after an action, before the redraw: (terminal value or None, kept, points, plays, discards)"""
+        kind, ids, _, score = action
+        kept = hand_bits & ~hand_mask(ids)
+        if kind == 'play':
+            points += score
+            plays_left -= 1
+            if points >= self.required_points:
+                return 1.0, kept, points, plays_left, discards_left
+            if plays_left == 0:
+                return 0.0, kept, points, plays_left, discards_left
+        else:
+            discards_left -= 1
+        return None, kept, points, plays_left, discards_left
+
+    def action_value(self, action, hand_bits, deck_bits, points, plays_left, discards_left, depth):
+        """Chance node: expected value of an action averaged over sampled redraws"""
+        terminal, kept, points, plays_left, discards_left = self.apply_action(
+            action, hand_bits, points, plays_left, discards_left)
+        if terminal is not None:
+            return terminal
+        deck_ids = mask_to_ids(deck_bits)
+        draw = min(HAND_SIZE - bin(kept).count('1'), len(deck_ids))
+        if draw == 0:
+            return self.value(kept, deck_bits, points, plays_left, discards_left, depth - 1)
+        total = 0.0
+        for _ in range(self.chance_samples):
+            drawn = hand_mask(self.rng.sample(deck_ids, draw))
+            total += self.value(kept | drawn, deck_bits & ~drawn, points, plays_left,
+                                discards_left, depth - 1)
+        return total / self.chance_samples
+
+    def value(self, hand_bits, deck_bits, points, plays_left, discards_left, depth):
+        """Decision node: probability of clearing with the best action"""
+        self.nodes += 1
+        if self.stop_check is not None and self.stop_check():
+            raise SearchAborted()
+        if points >= self.required_points:
+            return 1.0
+        if plays_left == 0 or not hand_bits:
+            return 0.0
+        if depth <= 0:
+            return self.estimate(hand_bits, points, plays_left)
+
+        key = state_key(hand_bits, deck_bits, points, plays_left, discards_left, self.required_points)
+        cached = self.table.get(key, depth)
+        if cached is not None:
+            return cached
+        best = 0.0
+        for action in self.actions(hand_bits, plays_left, discards_left):
+            best = max(best, self.action_value(action, hand_bits, deck_bits, points, plays_left,
+                                               discards_left, depth))
+            if best >= 1.0:
+                break
+        self.table.put(key, depth, best)
+        return best
+
+    def estimate(self, hand_bits, points, plays_left):
+        """Leaf heuristic: probability that greedy play reaches the target"""
+        needed = self.required_points - points - self.ranked_plays(hand_bits)[0][0]
+        sums = fresh_hand_sums(self.fresh_scores, plays_left - 1)
+        return (len(sums) - bisect_left(sums, needed)) / len(sums)
@@ -0,0 +1,322 @@
+# Local HTTP recommendation service: analyze_hand, identify_combo dan discard advice sebagai JSON endpoint
+import argparse
+import json
+import random
+import threading
+import queue
+import time
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from analysis_cache import AnalysisCache
+from card_codes import parse_codes, ids_to_cards, id_to_code
+from metrics import REGISTRY, cache_gauges, write_at_exit
+from planner import HAND_SIZE
+
+ENDPOINTS = ('analyze', 'identify', 'discard')
+# Cache keys start with the endpoint under this prefix: the server stores JSON-ready results, so
+# they must never meet the game's packed analyses (analysis_cache.hand_key) in a shared disk cache
+KEY_PREFIX = 'server-'
+MAX_DISCARD_LIMIT = 5
+MAX_PLAY_CARDS = 5  # the game plays at most 5 cards
+MAX_SAMPLES = 200
+
+# One BalatroPoker per worker process, built once by the pool initializer
+_worker_game = None
+
+
+def _init_worker():
+    global _worker_game
+    from game_logic import BalatroPoker
+    _worker_game = BalatroPoker()
+
+
+def _run_analyze(game, hand_ids):
+    hand = ids_to_cards(hand_ids)
+    by_obj = {id(c): cid for c, cid in zip(hand, hand_ids)}
+    game.game_state['hand'] = hand
+    return [
+        {'name': combo['name'], 'cards': [id_to_code(by_obj[id(c)]) for c in combo['cards']],
+         'score': combo['score']}
+        for combo in game.analyze_hand()
+    ]
+
+
+def _run_identify(game, card_id_lists):
+    """Identify many plays, then score them all in one scorer.evaluate_many call"""
+    plays = []
+    infos = []
+    for card_ids in card_id_lists:
+        cards = ids_to_cards(card_ids)
+        combo_info = game.identify_combo(cards)
+        plays.append((combo_info['name'], cards))
+        infos.append(combo_info)
+    game.levels.sync(game.scorer)
+    return [
+        {'name': combo_info['name'], 'base': combo_info['score']['base'],
+         'mult': combo_info['score']['mult'], 'points': points}
+        for combo_info, points in zip(infos, game.scorer.evaluate_many(plays))
+    ]
+
+
+def _run_discard(game, key):
+    from discard_advice import advise_discards
+    _, hand_ids, deck_ids, max_discard, samples = key
+    hand = ids_to_cards(hand_ids)
+    by_obj = {id(c): cid for c, cid in zip(hand, hand_ids)}
+    # Seed from the request so identical requests give identical (cacheable) answers in every
+    # process; hash() of a tuple holding str is salted per process
+    options = advise_discards(hand, ids_to_cards(deck_ids), game.COMBO_DEFINITIONS,
+                              max_discard=max_discard, samples=samples, top=5,
+                              rng=random.Random(zlib.crc32(repr(key).encode())))
+    return [
+        {'discard': [id_to_code(by_obj[id(c)]) for c in option['discard']],
+         'expected_score': round(option['expected_score'], 2)}
+        for option in options
+    ]
+
+
+def _run_batch(kind, keys):
+    """Evaluate a batch of same-kind requests inside a worker process.
+
+    Identify requests are scored together; an analysis or a discard search
+    is its own walk over one hand, so those batches save the pool round
+    trip and pickling per request rather than evaluation work.
+    """
+    game = _worker_game
+    if kind == KEY_PREFIX + 'analyze':
+        return [_run_analyze(game, list(key[1:])) for key in keys]
+    if kind == KEY_PREFIX + 'identify':
+        return _run_identify(game, [list(key[1:]) for key in keys])
+    return [_run_discard(game, key) for key in keys]
+
+
+class RequestBatcher:
+    """Collects concurrent requests for a short window and ships them to the pool in batches"""
+
+    def __init__(self, pool, cache, max_batch=64, window_ms=2.0):
+        self.pool = pool
+        self.cache = cache
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self.lock = threading.Lock()
+        self.inflight = {}
+        self.pending = queue.Queue()
+        self.batches = 0
+        self.thread = threading.Thread(target=self._loop, daemon=True)
+        self.thread.start()
+
+    def submit(self, key):
+        """Future resolving to the JSON-ready result for key (key[0] is KEY_PREFIX + the endpoint)"""
+        future = Future()
+        with self.lock:
+            cached = self.cache.get(key)
+            if cached is not None:
+                future.set_result(cached)
+                return future
+            waiters = self.inflight.get(key)
+            if waiters is not None:
+                waiters.append(future)
+                return future
+            self.inflight[key] = [future]
+        self.pending.put(key)
+        return future
+
+    def _loop(self):
+        while True:
+            batch = [self.pending.get()]
+            deadline = time.monotonic() + self.window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            by_kind = {}
+            for key in batch:
+                by_kind.setdefault(key[0], []).append(key)
+            for kind, keys in by_kind.items():
+                self.batches += 1
+                task = self.pool.submit(_run_batch, kind, keys)
+                task.add_done_callback(lambda task, keys=keys: self._finish(keys, task))
+
+    def _finish(self, keys, task):
+        error = task.exception()
+        results = task.result() if error is None else [None] * len(keys)
+        for key, result in zip(keys, results):
+            with self.lock:
+                if error is None:
+                    self.cache.put(key, result)
+                waiters = self.inflight.pop(key, [])
+            for future in waiters:
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+
+def _parse_cards(value):
+    if isinstance(value, list):
+        value = ' '.join(str(code) for code in value)
+    ids, errors = parse_codes(value or '')
+    return list(ids), errors
+
+
+def build_key(endpoint, body):
+    """Request body -> (cache key, None) or (None, error dict)"""
+    field = 'cards' if endpoint == 'identify' else 'hand'
+    ids, errors = _parse_cards(body.get(field))
+    if errors:
+        return None, {'error': f"invalid card codes in '{field}'", 'invalid': errors}
+    if not ids:
+        return None, {'error': f"'{field}' is empty"}
+    if len(set(ids)) != len(ids):
+        return None, {'error': f"duplicate cards in '{field}'"}
+    limit = MAX_PLAY_CARDS if endpoint == 'identify' else HAND_SIZE
+    if len(ids) > limit:
+        return None, {'error': f"'{field}' holds {len(ids)} cards, at most {limit} allowed"}
+    if endpoint == 'analyze':
+        return (KEY_PREFIX + 'analyze',) + tuple(sorted(ids)), None
+    if endpoint == 'identify':
+        return (KEY_PREFIX + 'identify',) + tuple(ids), None
+
+    if body.get('deck') is None:
+        deck_ids = [cid for cid in range(52) if cid not in ids]
+    else:
+        deck_ids, errors = _parse_cards(body['deck'])
+        if errors:
+            return None, {'error': "invalid card codes in 'deck'", 'invalid': errors}
+        overlap = set(ids).intersection(deck_ids)
+        if overlap:
+            return None, {'error': "'deck' contains cards from 'hand'",
+                          'invalid': [id_to_code(cid) for cid in sorted(overlap)]}
+    max_discard = min(int(body.get('max_discard', 3)), MAX_DISCARD_LIMIT)
+    samples = min(int(body.get('samples', 12)), MAX_SAMPLES)
+    if max_discard < 1:
+        return None, {'error': "'max_discard' must be at least 1"}
+    if samples < 1:
+        return None, {'error': "'samples' must be at least 1"}
+    return (KEY_PREFIX + 'discard', tuple(ids), tuple(sorted(deck_ids)), max_discard, samples), None
+
+
+class RecommendationServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # bots connect in bursts; the default backlog of 5 resets connections
+
+
+class RecommendationHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path == '/metrics':
+            self._send_text(REGISTRY.prometheus_text())
+            return
+        if self.path == '/metrics.json':
+            self._send(200, REGISTRY.snapshot())
+            return
+        if self.path != '/health':
+            self._send(404, {'error': 'not found'})
+            return
+        batcher = self.server.batcher
+        self._send(200, {
+            'status': 'ok',
+            'cache_entries': len(batcher.cache),
+            'cache_hit_rate': round(batcher.cache.hit_rate, 4),
+            'batches': batcher.batches
+        })
+
+    def do_POST(self):
+        endpoint = self.path.strip('/')
+        if endpoint not in ENDPOINTS:
+            self._send(404, {'error': 'not found'})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            body = json.loads(self.rfile.read(length) or b'{}')
+            key, error = build_key(endpoint, body)
+        except (ValueError, TypeError, AttributeError) as e:
+            key, error = None, {'error': f"bad request: {e}"}
+        if error:
+            self._send(400, error)
+            return
+        REGISTRY.inc(f"requests_{endpoint}", help_text=f"{endpoint} requests")
+        try:
+            with REGISTRY.timed(f"request_{endpoint}"):
+                result = self.server.batcher.submit(key).result(timeout=self.server.request_timeout)
+        except Exception as e:
+            REGISTRY.inc(f"errors_{endpoint}", help_text=f"{endpoint} errors")
+            self._send(500, {'error': str(e)})
+            return
+        self._send(200, {'result': result})
+
+    def _send(self, status, payload):
+        data = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_text(self, text):
+        data = text.encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def make_server(port=8765, workers=None, max_batch=64, window_ms=2.0, cache_size=100000,
+                request_timeout=30.0, disk_cache=None):
+    """Build a localhost-only server; call serve_forever() on the result.
+
+    disk_cache is the path of a disk_cache.DiskCache file behind the memory
+    cache, so results (discard EVs above all) survive restarts and are shared
+    by every server using the same file.
+    """
+    pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker)
+    server = RecommendationServer(('127.0.0.1', port), RecommendationHandler)
+    server.pool = pool
+    cache = AnalysisCache(cache_size)
+    if disk_cache:
+        from disk_cache import DiskCache, TieredCache
+        from game_logic import BalatroPoker
+        cache = TieredCache(DiskCache(disk_cache, BalatroPoker.COMBO_DEFINITIONS), cache_size)
+    server.batcher = RequestBatcher(pool, cache, max_batch, window_ms)
+    cache_gauges(server.batcher.cache, 'server_cache')
+    server.request_timeout = request_timeout
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Acelatro local recommendation service")
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--workers', type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument('--batch-size', type=int, default=64)
+    parser.add_argument('--window-ms', type=float, default=2.0, help="how long to gather a batch")
+    parser.add_argument('--cache-size', type=int, default=100000)
+    parser.add_argument('--disk-cache', default=None, help="SQLite file that persists results across runs")
+    parser.add_argument('--metrics-file', default=None,
+                        help="write the metrics here on exit (.json for JSON, Prometheus text otherwise)")
+    args = parser.parse_args()
+    if args.metrics_file:
+        write_at_exit(args.metrics_file)
+
+    server = make_server(args.port, args.workers, args.batch_size, args.window_ms, args.cache_size,
+                         disk_cache=args.disk_cache)
+    print(f"Serving recommendations on http://127.0.0.1:{args.port} (POST /analyze, /identify, /discard, GET /metrics)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        server.pool.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+# Replay log biner: setiap deal, play dan discard sebagai record berukuran tetap
+import glob
+import mmap
+import os
+import struct
+import time
+from collections import namedtuple
+
+from card_codes import card_id
+
+MAGIC = b'ACELOG1\x00'
+FILE_HEADER = struct.Struct('<8sII')  # magic, record size, reserved
+RECORD = struct.Struct('<dIIIBBBB8s')  # timestamp, round, score, points, kind, count, combo, flags, cards
+MAX_CARDS = 8
+NO_COMBO = 255
+NO_CARD = 255
+NO_BRANCH = 0  # flags of a redo: 0 follows the last undone action, n + 1 redoes branch n
+
+KIND_DEAL = 1
+KIND_PLAY = 2
+KIND_DISCARD = 3
+KIND_UNDO = 4
+KIND_REDO = 5
+KIND_NAMES = {KIND_DEAL: 'deal', KIND_PLAY: 'play', KIND_DISCARD: 'discard',
+              KIND_UNDO: 'undo', KIND_REDO: 'redo'}
+
+ReplayRecord = namedtuple('ReplayRecord',
+                          'timestamp round_id score points kind combo cards branch')
+
+
+def combo_names(combo_definitions):
+    """Combo index table used in the log: COMBO_DEFINITIONS order, then High Card"""
+    return [combo_def['name'] for combo_def in combo_definitions] + ['High Card']
+
+
+class _TreeNode:
+    __slots__ = ('parent', 'item', 'children', 'active')
+
+    def __init__(self, parent, item):
+        self.parent = parent
+        self.item = item
+        self.children = []
+        self.active = None
+
+
+class ActionTree:
+    """The plays and discards of one round as a tree, walked like history.GameHistory.
+
+    add() starts a new branch after an undo, redo(branch) picks one of the
+    branches by the index GameHistory.branches() shows; path() gives the
+    standing items. Items are whatever the caller logs.
+    """
+
+    def __init__(self):
+        self.root = _TreeNode(None, None)
+        self.current = self.root
+
+    def add(self, item):
+        node = _TreeNode(self.current, item)
+        self.current.children.append(node)
+        self.current.active = node
+        self.current = node
+
+    def undo(self):
+        """Item taken back, or None at the start of the round"""
+        node = self.current
+        if node is self.root:
+            return None
+        node.parent.active = node
+        self.current = node.parent
+        return node.item
+
+    def redo(self, branch=None):
+        """Item put back (the given branch index, else the last undone one), or None"""
+        if branch is not None and 0 <= branch < len(self.current.children):
+            self.current.active = self.current.children[branch]
+        node = self.current.active
+        if node is None:
+            return None
+        self.current = node
+        return node.item
+
+    def path(self):
+        items = []
+        node = self.current
+        while node is not self.root:
+            items.append(node.item)
+            node = node.parent
+        return items[::-1]
+
+
+class RotatingReplayWriter:
+    """Append-only writer of fixed-size records, buffered and rotated by file size.
+
+    Records are packed into a preallocated buffer and written in blocks of
+    buffer_records, so logging an action costs one struct.pack_into call.
+    Files are named <prefix>-00001.bin, <prefix>-00002.bin, ... in directory.
+    """
+
+    def __init__(self, directory, combo_definitions, prefix='replay', max_bytes=64 << 20,
+                 buffer_records=4096):
+        self.directory = directory
+        self.prefix = prefix
+        self.max_records = max(1, (max_bytes - FILE_HEADER.size) // RECORD.size)
+        self.combo_index = {name: i for i, name in enumerate(combo_names(combo_definitions))}
+        self.buffer = bytearray(RECORD.size * buffer_records)
+        self.buffer_records = buffer_records
+        self.buffered = 0
+        self.file = None
+        self.file_records = 0
+        os.makedirs(directory, exist_ok=True)
+        existing = sorted(glob.glob(os.path.join(directory, f"{prefix}-*.bin")))
+        self.file_number = int(existing[-1][-9:-4]) if existing else 0
+        self.next_round = 1
+        if existing and os.path.getsize(existing[-1]) >= FILE_HEADER.size + RECORD.size:
+            with ReplayFile(existing[-1]) as last:
+                self.next_round = last[-1].round_id + 1
+
+    def new_round(self):
+        """Id for a new round; pass it to every log call of that round"""
+        round_id = self.next_round
+        self.next_round += 1
+        return round_id
+
+    def log_deal(self, round_id, cards, points=0):
+        self._log(KIND_DEAL, round_id, cards, 0, points, NO_COMBO)
+
+    def log_play(self, round_id, cards, combo_name, score, points):
+        self._log(KIND_PLAY, round_id, cards, score, points, self.combo_index.get(combo_name, NO_COMBO))
+
+    def log_discard(self, round_id, cards, points):
+        self._log(KIND_DISCARD, round_id, cards, 0, points, NO_COMBO)
+
+    def log_undo(self, round_id, points):
+        self._log(KIND_UNDO, round_id, (), 0, points, NO_COMBO)
+
+    def log_redo(self, round_id, points, branch=None):
+        """branch is the GameHistory.redo() index when a branch was picked"""
+        self._log(KIND_REDO, round_id, (), 0, points, NO_COMBO,
+                  NO_BRANCH if branch is None else branch + 1)
+
+    def _log(self, kind, round_id, cards, score, points, combo, flags=NO_BRANCH):
+        ids = bytes(card_id(c) for c in cards[:MAX_CARDS])
+        RECORD.pack_into(self.buffer, self.buffered * RECORD.size, time.time(), round_id,
+                         score, points, kind, len(ids), combo, flags,
+                         ids.ljust(MAX_CARDS, bytes([NO_CARD])))
+        self.buffered += 1
+        if self.buffered == self.buffer_records:
+            self.flush()
+
+    def flush(self):
+        written = 0
+        while written < self.buffered:
+            if self.file is None or self.file_records >= self.max_records:
+                self._rotate()
+            count = min(self.buffered - written, self.max_records - self.file_records)
+            self.file.write(self.buffer[written * RECORD.size:(written + count) * RECORD.size])
+            self.file_records += count
+            written += count
+        self.buffered = 0
+        if self.file is not None:
+            self.file.flush()
+
+    def _rotate(self):
+        if self.file is not None:
+            self.file.close()
+        self.file_number += 1
+        path = os.path.join(self.directory, f"{self.prefix}-{self.file_number:05d}.bin")
+        self.file = open(path, 'wb')
+        self.file.write(FILE_HEADER.pack(MAGIC, RECORD.size, 0))
+        self.file_records = 0
+
+    def close(self):
+        self.flush()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def log_files(path):
+    """A single log file, or every log file in a directory in write order"""
+    if os.path.isdir(path):
+        return sorted(glob.glob(os.path.join(path, '*.bin')))
+    return [path]
+
+
+def _check_header(header, path):
+    if len(header) < FILE_HEADER.size:
+        raise ValueError(f"{path}: not a replay log (file too short)")
+    magic, record_size, _ = FILE_HEADER.unpack(header)
+    if magic != MAGIC or record_size != RECORD.size:
+        raise ValueError(f"{path}: not a replay log or unsupported version")
+
+
+def _to_record(fields):
+    timestamp, round_id, score, points, kind, count, combo, flags, cards = fields
+    return ReplayRecord(timestamp, round_id, score, points, kind,
+                        None if combo == NO_COMBO else combo, tuple(cards[:count]),
+                        flags - 1 if kind == KIND_REDO and flags != NO_BRANCH else None)
+
+
+def iter_records(path, chunk_records=8192):
+    """Stream records from a file or directory, reading chunk_records at a time"""
+    for file_path in log_files(path):
+        with open(file_path, 'rb') as f:
+            _check_header(f.read(FILE_HEADER.size), file_path)
+            while True:
+                chunk = f.read(RECORD.size * chunk_records)
+                if not chunk:
+                    break
+                usable = len(chunk) - len(chunk) % RECORD.size  # ignore a torn final record
+                for fields in RECORD.iter_unpack(chunk[:usable]):
+                    yield _to_record(fields)
+
+
+class ReplayFile:
+    """Random access to one log file through mmap, without reading it into memory"""
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        _check_header(self.map[:FILE_HEADER.size], path)
+        self.count = (len(self.map) - FILE_HEADER.size) // RECORD.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+        return _to_record(RECORD.unpack_from(self.map, FILE_HEADER.size + index * RECORD.size))
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
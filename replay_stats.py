@@ -0,0 +1,296 @@
+# Laporan agregat dari replay log / output simulasi, dihitung kolom per kolom dengan NumPy
+import argparse
+import json
+import os
+
+import numpy as np
+
+from replay_log import (FILE_HEADER, RECORD, KIND_DEAL, KIND_PLAY, KIND_DISCARD, KIND_UNDO,
+                        KIND_REDO, NO_BRANCH, ActionTree, combo_names, log_files)
+
+RECORD_DTYPE = np.dtype([
+    ('timestamp', '<f8'), ('round_id', '<u4'), ('score', '<u4'), ('points', '<u4'),
+    ('kind', 'u1'), ('count', 'u1'), ('combo', 'u1'), ('flags', 'u1'), ('cards', 'u1', (8,))
+])
+assert RECORD_DTYPE.itemsize == RECORD.size
+
+# Starting-hand classes, strongest first (the best combo already present in the dealt cards)
+HAND_CLASSES = ['Straight Flush', 'Four of a Kind', 'Full House', 'Flush', 'Straight',
+                'Three of a Kind', 'Two Pair', 'Pair', 'High Card']
+
+
+def open_columns(path):
+    """Memory-mapped structured array for one .bin replay log or .npy file of records"""
+    if path.endswith('.npy'):
+        return np.load(path, mmap_mode='r')
+    # A torn last record (crash during a write) is left out, as replay_log.iter_records does
+    count = max(os.path.getsize(path) - FILE_HEADER.size, 0) // RECORD_DTYPE.itemsize
+    if not count:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', offset=FILE_HEADER.size, shape=(count,))
+
+
+def export_npy(records, path):
+    """Write records (e.g. simulation output converted to RECORD_DTYPE) as a .npy file"""
+    np.save(path, np.asarray(records, dtype=RECORD_DTYPE))
+
+
+def hand_classes(cards):
+    """Vectorized starting-hand class index (into HAND_CLASSES) for an (N, 8) array of card ids"""
+    n = len(cards)
+    suits = cards // 13
+    ranks = cards % 13
+    rows = np.repeat(np.arange(n), cards.shape[1])
+    rank_counts = np.zeros((n, 13), dtype=np.int8)
+    np.add.at(rank_counts, (rows, ranks.ravel()), 1)
+    suit_rank = np.zeros((n, 4, 13), dtype=bool)
+    suit_rank[rows, suits.ravel(), ranks.ravel()] = True
+
+    def has_run(present):
+        # Five consecutive ranks present (no ace-low straight, like combos.is_straight)
+        run = present[..., 0:9].copy()
+        for shift in range(1, 5):
+            run &= present[..., shift:shift + 9]
+        return run.any(axis=-1)
+
+    max_count = rank_counts.max(axis=1)
+    pairs = (rank_counts >= 2).sum(axis=1)
+    conditions = [
+        has_run(suit_rank).any(axis=1),
+        max_count >= 4,
+        (max_count >= 3) & (pairs >= 2),
+        suit_rank.sum(axis=2).max(axis=1) >= 5,
+        has_run(rank_counts > 0),
+        max_count >= 3,
+        pairs >= 2,
+        pairs >= 1,
+    ]
+    return np.select(conditions, np.arange(len(conditions)), default=len(conditions))
+
+
+class ReplayReport:
+    """Streaming aggregates over replay records; memory is bounded by the number of rounds.
+
+    Undo and redo are replayed so the report reflects each round's final
+    state. Feed every record to mark() first, then to add(): rounds marked as
+    holding an undo or redo are replayed action by action (they are rare),
+    the rest are folded in column by column.
+    """
+
+    def __init__(self, names, required_points=300):
+        self.names = names
+        self.required_points = required_points
+        self.combo_count = np.zeros(len(names), dtype=np.int64)
+        self.combo_score = np.zeros(len(names), dtype=np.float64)
+        self.round_class = np.zeros(0, dtype=np.int8)
+        self.round_points = np.zeros(0, dtype=np.uint32)
+        self.round_discards = np.zeros(0, dtype=np.uint16)
+        self.round_seen = np.zeros(0, dtype=bool)
+        self.last_kind = np.zeros(0, dtype=np.uint8)
+        self.round_undo = np.zeros(0, dtype=bool)
+        self.replayed = {}  # round id -> ActionTree of (kind, combo, score)
+        self.after_discard = np.zeros(2, dtype=np.int64)        # plays without / with a discard before
+        self.after_discard_score = np.zeros(2, dtype=np.float64)
+
+    def _grow(self, max_round):
+        size = len(self.round_points)
+        if max_round < size:
+            return
+        extra = max(max_round + 1, size * 2) - size
+        self.round_class = np.concatenate([self.round_class, np.full(extra, -1, np.int8)])
+        self.round_points = np.concatenate([self.round_points, np.zeros(extra, np.uint32)])
+        self.round_discards = np.concatenate([self.round_discards, np.zeros(extra, np.uint16)])
+        self.round_seen = np.concatenate([self.round_seen, np.zeros(extra, bool)])
+        self.last_kind = np.concatenate([self.last_kind, np.zeros(extra, np.uint8)])
+        self.round_undo = np.concatenate([self.round_undo, np.zeros(extra, bool)])
+
+    def mark(self, chunk):
+        """First pass: note the rounds that hold an undo or redo"""
+        undo = chunk['round_id'][(chunk['kind'] == KIND_UNDO) | (chunk['kind'] == KIND_REDO)].astype(np.int64)
+        if len(undo):
+            self._grow(int(undo.max()))
+            self.round_undo[undo] = True
+
+    def add(self, chunk):
+        """Fold one chunk of records (a slice of a memmap) into the report"""
+        chunk = chunk[(chunk['kind'] >= KIND_DEAL) & (chunk['kind'] <= KIND_REDO)]
+        if not len(chunk):
+            return
+        round_ids = chunk['round_id'].astype(np.int64)
+        self._grow(int(round_ids.max()))
+        self.round_seen[round_ids] = True
+
+        # Points after the last record of each round (undo records carry the restored points)
+        order = np.argsort(round_ids, kind='stable')
+        ordered_rounds = round_ids[order]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = ordered_rounds[1:] != ordered_rounds[:-1]
+        self.round_points[ordered_rounds[last]] = chunk['points'][order][last]
+
+        deals = chunk[(chunk['kind'] == KIND_DEAL) & (chunk['count'] == 8)]
+        if len(deals):
+            self.round_class[deals['round_id'].astype(np.int64)] = hand_classes(
+                deals['cards'].astype(np.int64))
+
+        replayed = self.round_undo[round_ids]
+        if replayed.any():
+            self._replay(chunk[replayed])
+        chunk = chunk[~replayed]
+        chunk = chunk[(chunk['kind'] == KIND_PLAY) | (chunk['kind'] == KIND_DISCARD)]
+        if not len(chunk):
+            return
+        round_ids = chunk['round_id'].astype(np.int64)
+        kinds = chunk['kind']
+
+        plays = chunk[kinds == KIND_PLAY]
+        combos = plays['combo'].astype(np.int64)
+        valid = combos < len(self.names)
+        self.combo_count += np.bincount(combos[valid], minlength=len(self.names))
+        self.combo_score += np.bincount(combos[valid], weights=plays['score'][valid],
+                                        minlength=len(self.names))
+
+        discards = round_ids[kinds == KIND_DISCARD]
+        np.add.at(self.round_discards, discards, 1)
+
+        # Previous action of the same round, carried across chunks through last_kind
+        order = np.argsort(round_ids, kind='stable')
+        ordered_rounds = round_ids[order]
+        ordered_kinds = kinds[order]
+        previous = np.empty_like(ordered_kinds)
+        previous[1:] = ordered_kinds[:-1]
+        first = np.ones(len(order), dtype=bool)
+        first[1:] = ordered_rounds[1:] != ordered_rounds[:-1]
+        previous[first] = self.last_kind[ordered_rounds[first]]
+        last = np.ones(len(order), dtype=bool)
+        last[:-1] = first[1:]
+        self.last_kind[ordered_rounds[last]] = ordered_kinds[last]
+
+        is_play = ordered_kinds == KIND_PLAY
+        followed = (previous[is_play] == KIND_DISCARD).astype(np.int64)
+        scores = chunk['score'][order][is_play]
+        self.after_discard += np.bincount(followed, minlength=2)
+        self.after_discard_score += np.bincount(followed, weights=scores, minlength=2)
+
+    def _replay(self, records):
+        """Undo/redo trees of the marked rounds, one record at a time"""
+        for round_id, kind, combo, score, flags in zip(
+                records['round_id'].tolist(), records['kind'].tolist(), records['combo'].tolist(),
+                records['score'].tolist(), records['flags'].tolist()):
+            tree = self.replayed.setdefault(round_id, ActionTree())
+            if kind == KIND_PLAY or kind == KIND_DISCARD:
+                tree.add((kind, combo, score))
+            elif kind == KIND_UNDO:
+                tree.undo()
+            elif kind == KIND_REDO:
+                tree.redo(None if flags == NO_BRANCH else flags - 1)
+
+    def _replayed_totals(self):
+        """Combo, discard and after-discard totals of the replayed rounds' final actions"""
+        combo_count = self.combo_count.copy()
+        combo_score = self.combo_score.copy()
+        round_discards = self.round_discards.copy()
+        after_discard = self.after_discard.copy()
+        after_discard_score = self.after_discard_score.copy()
+        for round_id, tree in self.replayed.items():
+            previous = None
+            for kind, combo, score in tree.path():
+                if kind == KIND_DISCARD:
+                    round_discards[round_id] += 1
+                else:
+                    if combo < len(self.names):
+                        combo_count[combo] += 1
+                        combo_score[combo] += score
+                    followed = int(previous == KIND_DISCARD)
+                    after_discard[followed] += 1
+                    after_discard_score[followed] += score
+                previous = kind
+        return combo_count, combo_score, round_discards, after_discard, after_discard_score
+
+    def result(self):
+        combo_count, combo_score, round_discards, after_discard, after_discard_score = self._replayed_totals()
+        combos = [
+            {'combo': name, 'plays': int(count),
+             'mean_score': round(float(total / count), 2) if count else None}
+            for name, count, total in zip(self.names, combo_count, combo_score)
+        ]
+
+        seen = self.round_seen & (self.round_class >= 0)
+        cleared = self.round_points >= self.required_points
+        classes = []
+        for index, name in enumerate(HAND_CLASSES):
+            in_class = seen & (self.round_class == index)
+            rounds = int(in_class.sum())
+            classes.append({'hand_class': name, 'rounds': rounds,
+                            'clear_rate': round(float(cleared[in_class].mean()), 4) if rounds else None})
+
+        def mean(total, count):
+            return round(float(total / count), 2) if count else None
+
+        rounds = self.round_seen
+        with_discard = rounds & (round_discards > 0)
+        without_discard = rounds & (round_discards == 0)
+        discards = {
+            'plays_after_discard': int(after_discard[1]),
+            'mean_score_after_discard': mean(after_discard_score[1], after_discard[1]),
+            'plays_without_discard': int(after_discard[0]),
+            'mean_score_without_discard': mean(after_discard_score[0], after_discard[0]),
+            'mean_points_rounds_with_discards': mean(self.round_points[with_discard].sum(),
+                                                     with_discard.sum()),
+            'mean_points_rounds_without_discards': mean(self.round_points[without_discard].sum(),
+                                                        without_discard.sum()),
+        }
+        return {
+            'rounds': int(rounds.sum()),
+            'combos': combos,
+            'clear_rate_by_hand_class': classes,
+            'discards': discards
+        }
+
+
+def build_report(paths, names, required_points=300, chunk_records=1 << 20):
+    report = ReplayReport(names, required_points)
+    files = [file_path for path in paths
+             for file_path in ([path] if path.endswith('.npy') else log_files(path))]
+    for fold in (report.mark, report.add):
+        for file_path in files:
+            columns = open_columns(file_path)
+            for start in range(0, len(columns), chunk_records):
+                fold(np.asarray(columns[start:start + chunk_records]))
+            del columns
+    return report.result()
+
+
+def print_report(result):
+    print(f"Rounds: {result['rounds']}")
+    print("\nCombo frequency and mean score:")
+    for row in result['combos']:
+        mean = '-' if row['mean_score'] is None else f"{row['mean_score']:.2f}"
+        print(f"  {row['combo']:<16} {row['plays']:>10}  mean {mean}")
+    print("\nClear rate by starting hand class:")
+    for row in result['clear_rate_by_hand_class']:
+        rate = '-' if row['clear_rate'] is None else f"{row['clear_rate'] * 100:.1f}%"
+        print(f"  {row['hand_class']:<16} {row['rounds']:>10}  clear {rate}")
+    print("\nDiscards:")
+    for key, value in result['discards'].items():
+        print(f"  {key.replace('_', ' ')}: {value}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate reports over replay logs / .npy records")
+    parser.add_argument('paths', nargs='+', help="replay log files or directories, or .npy files")
+    parser.add_argument('--required', type=int, default=300, help="points needed to clear a round")
+    parser.add_argument('--chunk', type=int, default=1 << 20, help="records per chunk")
+    parser.add_argument('--json', action='store_true', help="print the report as JSON")
+    args = parser.parse_args()
+
+    from game_logic import BalatroPoker
+    result = build_report(args.paths, combo_names(BalatroPoker.COMBO_DEFINITIONS),
+                          args.required, args.chunk)
+    if args.json:
+        print(json.dumps(result, indent=2))
+    else:
+        print_report(result)
+
+
+if __name__ == "__main__":
+    main()
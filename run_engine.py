@@ -0,0 +1,270 @@
+# Run penuh: ante dan blind dengan target yang naik, deck yang terbawa antar blind, simulasi paralel
+import argparse
+import json
+import random
+
+from best_play import best_play
+from card_codes import card_id
+from deck_config import STANDARD
+from hand_levels import HandLevels
+from planner import CARDS, DISCARDS_PER_ROUND, HAND_SIZE, PLAYS_PER_ROUND
+from scoring import ScoringPipeline
+
+# Base target of each ante, scaled by the blind
+ANTE_TARGETS = (300, 400, 550, 700, 900, 1150, 1450, 1800)
+BLINDS = (('Small Blind', 1.0), ('Big Blind', 1.25), ('Boss Blind', 1.5))
+
+
+class RunConfig:
+    """Shape of a run: antes, blinds per ante, per-blind limits and the deck.
+
+    With carry_deck the draw pile carries over from blind to blind, and the
+    played and discarded cards are only shuffled back in when it runs dry;
+    otherwise every blind starts from a freshly shuffled deck.
+    """
+
+    def __init__(self, antes=len(ANTE_TARGETS), ante_targets=ANTE_TARGETS, blinds=BLINDS,
+                 plays=PLAYS_PER_ROUND, discards=DISCARDS_PER_ROUND, hand_size=HAND_SIZE,
+                 deck_config=STANDARD, carry_deck=False, modifiers=()):
+        self.antes = antes
+        self.ante_targets = ante_targets
+        self.blinds = blinds
+        self.plays = plays
+        self.discards = discards
+        self.hand_size = hand_size
+        self.deck_config = deck_config
+        self.carry_deck = carry_deck
+        self.modifiers = list(modifiers)
+
+    def target(self, ante, blind):
+        """Points needed for blind (index) of ante (1-based); antes past the table keep growing"""
+        targets = self.ante_targets
+        if ante <= len(targets):
+            base = targets[ante - 1]
+        else:
+            base = targets[-1] * (1.25 ** (ante - len(targets)))
+        return int(base * self.blinds[blind][1])
+
+
+def identify_combo(cards, combo_definitions):
+    """Same rule as BalatroPoker.identify_combo: the first rule passing on its first cards"""
+    for combo_def in combo_definitions:
+        required_count = combo_def['card_count']
+        if len(cards) >= required_count and combo_def['check'](cards[:required_count]):
+            return combo_def['name']
+    return 'High Card'
+
+
+class Run:
+    """One run in progress. Cards are ids (0..51); the draw pile deals from its end.
+
+    Strategies read hand, draw, points, target, plays_left, discards_left,
+    ante and blind, and act through play(positions) / discard(positions).
+    """
+
+    def __init__(self, config, combo_definitions, seed=None, levels=None):
+        self.config = config
+        self.combo_definitions = combo_definitions
+        self.rng = random.Random(seed)
+        self.levels = levels or HandLevels(combo_definitions)
+        self.scorer = ScoringPipeline(config.modifiers).compile(self.levels.all_definitions())
+        self.scorer.version = self.levels.version
+        self.ante = 1
+        self.blind = 0
+        self.round_number = 0
+        self.draw = []
+        self.hand = []
+        self.played = []
+        self.discarded = []
+        self.total_score = 0
+        self.blinds_cleared = 0
+        self.blind_scores = []
+        self.over = False
+        self.won = False
+        self.start_blind()
+
+    @property
+    def target(self):
+        return self.config.target(self.ante, self.blind)
+
+    def hand_cards(self):
+        return [CARDS[cid] for cid in self.hand]
+
+    def start_blind(self):
+        config = self.config
+        self.round_number += 1
+        self.points = 0
+        self.plays_left = config.plays
+        self.discards_left = config.discards
+        if config.carry_deck and self.draw:
+            self.draw.extend(self.hand)
+            self.rng.shuffle(self.draw)
+        else:
+            self.draw = config.deck_config.card_ids()
+            self.rng.shuffle(self.draw)
+            self.played = []
+            self.discarded = []
+        self.hand = []
+        self._refill()
+
+    def _refill(self):
+        needed = self.config.hand_size - len(self.hand)
+        if needed > len(self.draw) and self.config.carry_deck:
+            # Reshuffle the used cards back in instead of running dry
+            recycled = self.played + self.discarded
+            self.rng.shuffle(recycled)
+            self.draw[:0] = recycled
+            self.played = []
+            self.discarded = []
+        for _ in range(min(needed, len(self.draw))):
+            self.hand.append(self.draw.pop())
+
+    def _take(self, positions):
+        positions = sorted(set(positions), reverse=True)
+        if not positions or positions[-1] < 0 or positions[0] >= len(self.hand):
+            raise ValueError(f"Invalid card positions: {positions}")
+        return [self.hand.pop(i) for i in positions][::-1]
+
+    def play(self, positions):
+        """Play up to 5 cards from the hand; returns the combo name and score"""
+        if self.over or len(positions) > 5:
+            raise ValueError("Cannot play these cards")
+        cards = self._take(positions)
+        name = identify_combo([CARDS[cid] for cid in cards], self.combo_definitions)
+        self.levels.sync(self.scorer)
+        score = self.scorer.score_ids(self.scorer.index[name], cards, self.hand)
+        self.points += score
+        self.total_score += score
+        self.plays_left -= 1
+        self.played.extend(cards)
+        self._finish_action()
+        return name, score
+
+    def discard(self, positions):
+        """Discard up to 5 cards and redraw"""
+        if self.over or self.discards_left <= 0 or len(positions) > 5:
+            raise ValueError("No discards left")
+        self.discarded.extend(self._take(positions))
+        self.discards_left -= 1
+        self._finish_action()
+
+    def _finish_action(self):
+        if self.points >= self.target:
+            self.blind_scores.append(self.points)
+            self.blinds_cleared += 1
+            if self.blind == len(self.config.blinds) - 1:
+                if self.ante == self.config.antes:
+                    self.over = self.won = True
+                    return
+                self.ante += 1
+                self.blind = 0
+            else:
+                self.blind += 1
+            self.start_blind()
+            return
+        self._refill()
+        if self.plays_left == 0 or not self.hand:
+            self.blind_scores.append(self.points)
+            self.over = True
+
+    def result(self):
+        return {
+            'won': self.won,
+            'ante': self.ante,
+            'antes_cleared': self.ante - 1 + (1 if self.won else 0),
+            'blinds_cleared': self.blinds_cleared,
+            'rounds': self.round_number,
+            'total_score': self.total_score,
+            'blind_scores': self.blind_scores
+        }
+
+
+def greedy_strategy(run):
+    """Always play the best combo in hand"""
+    best = best_play(run.hand_cards(), run.combo_definitions)
+    return 'play', hand_positions(run.hand, best.cards)
+
+
+def chase_strategy(run):
+    """Play the best combo when it keeps pace with the target, otherwise discard around it"""
+    best = best_play(run.hand_cards(), run.combo_definitions)
+    needed = (run.target - run.points) / run.plays_left
+    keep = hand_positions(run.hand, best.cards)
+    if best.score >= needed or run.discards_left == 0:
+        return 'play', keep
+    others = [i for i in range(len(run.hand)) if i not in keep]
+    others.sort(key=lambda i: CARDS[run.hand[i]].chip_value)
+    return 'discard', others[:5] if others else keep
+
+
+def hand_positions(hand, cards):
+    """Positions in hand (card ids) of the given cards; copies take successive positions"""
+    positions = []
+    for card in cards:
+        i = hand.index(card_id(card))
+        while i in positions:
+            i = hand.index(card_id(card), i + 1)
+        positions.append(i)
+    return positions
+
+
+def summarize(results, config):
+    """Depth report for one strategy's run results"""
+    blinds_per_ante = len(config.blinds)
+    total_blinds = config.antes * blinds_per_ante
+    reached = [0] * (total_blinds + 1)
+    for result in results:
+        reached[result['blinds_cleared']] += 1
+    depths = sorted(result['blinds_cleared'] for result in results)
+    n = len(results)
+    return {
+        'runs': n,
+        'win_rate': round(sum(result['won'] for result in results) / n, 4) if n else None,
+        'mean_blinds_cleared': round(sum(depths) / n, 3) if n else None,
+        'median_blinds_cleared': depths[n // 2] if n else None,
+        'mean_antes_cleared': round(sum(r['antes_cleared'] for r in results) / n, 3) if n else None,
+        'mean_total_score': round(sum(r['total_score'] for r in results) / n, 1) if n else None,
+        # Share of runs that cleared at least b blinds, for b = 1..total
+        'survival': [round(sum(reached[b:]) / n, 4) if n else None for b in range(1, total_blinds + 1)],
+    }
+
+
+def print_summary(summary, config):
+    for name, row in summary.items():
+        print(f"{name}: {row['runs']} runs, win rate {row['win_rate'] * 100:.1f}%, "
+              f"mean blinds cleared {row['mean_blinds_cleared']} (median {row['median_blinds_cleared']})")
+        for b, share in enumerate(row['survival'], 1):
+            ante = (b - 1) // len(config.blinds) + 1
+            blind = config.blinds[(b - 1) % len(config.blinds)][0]
+            print(f"  ante {ante} {blind:<12} cleared by {share * 100:5.1f}%")
+
+
+def main():
+    from strategies import STRATEGIES, evaluate
+
+    parser = argparse.ArgumentParser(description="Simulate full multi-blind runs per strategy")
+    parser.add_argument('--strategies', nargs='+', default=['chase', 'greedy'],
+                        help=f"registered names ({', '.join(sorted(STRATEGIES))}) or module:Class")
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--antes', type=int, default=len(ANTE_TARGETS))
+    parser.add_argument('--carry-deck', action='store_true', help="keep the draw pile between blinds")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    from game_logic import BalatroPoker
+    config = RunConfig(antes=args.antes, carry_deck=args.carry_deck)
+    try:
+        summary = evaluate(args.strategies, args.runs, BalatroPoker.COMBO_DEFINITIONS, config,
+                           args.workers, args.seed)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print_summary(summary, config)
+
+
+if __name__ == "__main__":
+    main()
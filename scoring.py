@@ -0,0 +1,207 @@
+# Pipeline skor (joker/modifier): chip, mult, xmult dan trigger per kartu, dikompilasi menjadi tabel
+from card_codes import SUIT_INDEX, card_from_id, card_id, card_slot
+
+HIGH_CARD = {'name': 'High Card', 'card_count': 1, 'score': {'base': 5, 'mult': 1}}
+CARDS = [card_from_id(cid) for cid in range(52)]
+
+
+class ChipAdd:
+    """+chips when the played combo is one of combos (every combo when None)"""
+
+    def __init__(self, chips, combos=None):
+        self.chips = chips
+        self.combos = combos
+
+
+class MultAdd:
+    """+mult when the played combo is one of combos (every combo when None)"""
+
+    def __init__(self, mult, combos=None):
+        self.mult = mult
+        self.combos = combos
+
+
+class MultTimes:
+    """xmult when the played combo is one of combos (every combo when None)"""
+
+    def __init__(self, factor, combos=None):
+        self.factor = factor
+        self.combos = combos
+
+
+class CardTrigger:
+    """For every scored card with when(card) true: +chips, +mult, then xmult"""
+
+    def __init__(self, when, chips=0, mult=0, xmult=1):
+        self.when = when
+        self.chips = chips
+        self.mult = mult
+        self.xmult = xmult
+
+
+class ScoringPipeline:
+    """Ordered list of modifiers, like jokers from left to right.
+
+    A play is scored the Balatro way: the combo's base chips and mult, then
+    each scored card in order (its chip value plus every CardTrigger on it),
+    then the combo-level modifiers in pipeline order. score = chips * mult,
+    rounded down. With no modifiers this is exactly (base + chip_sum) * mult.
+    """
+
+    def __init__(self, modifiers=()):
+        self.modifiers = list(modifiers)
+
+    def add(self, modifier):
+        self.modifiers.append(modifier)
+        return self
+
+    def compile(self, combo_definitions, card_store=None):
+        return CompiledScorer(self.modifiers, combo_definitions, card_store)
+
+
+class CompiledScorer:
+    """A ScoringPipeline folded into per-combo and per-card tables.
+
+    Combo-level modifiers collapse to chips + chip_add and
+    mult * mult_scale + mult_offset. Card triggers, together with the card's
+    enhancement and edition from an optional card_store.CardStore, collapse to
+    a chips/mult/xmult entry per card: per card id (0..51), or per card slot
+    when the store keeps several copies. Scoring a play never walks the
+    modifier list.
+    """
+
+    def __init__(self, modifiers, combo_definitions, card_store=None):
+        definitions = list(combo_definitions)
+        if all(combo_def['name'] != HIGH_CARD['name'] for combo_def in definitions):
+            definitions.append(HIGH_CARD)
+        self.names = [combo_def['name'] for combo_def in definitions]
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.modifiers = list(modifiers)
+        self.card_store = card_store
+        self.version = 0  # hand_levels version the base tables match
+        self.card_version = card_store.version if card_store is not None else 0
+        self.base_chips = [combo_def['score']['base'] for combo_def in definitions]
+        self.base_mult = [combo_def['score']['mult'] for combo_def in definitions]
+        self.chip_add = [0] * len(definitions)
+        self.mult_scale = [1] * len(definitions)
+        self.mult_offset = [0] * len(definitions)
+        self.card_triggers = [m for m in modifiers if isinstance(m, CardTrigger)]
+        self.slots = 52 * card_store.copies if card_store is not None else 52
+        self.card_chips = [0] * self.slots
+        self.card_mult = [0] * self.slots
+        self.card_xmult = [1] * self.slots
+        self.held_xmult = [1] * self.slots
+        for slot in range(self.slots):
+            self.refresh_card(slot)
+
+        for modifier in modifiers:
+            if isinstance(modifier, CardTrigger):
+                continue
+            if not isinstance(modifier, (ChipAdd, MultAdd, MultTimes)):
+                raise TypeError(f"Unknown modifier: {modifier!r}")
+            for i, name in enumerate(self.names):
+                if modifier.combos is not None and name not in modifier.combos:
+                    continue
+                if isinstance(modifier, ChipAdd):
+                    self.chip_add[i] += modifier.chips
+                elif isinstance(modifier, MultAdd):
+                    self.mult_offset[i] += modifier.mult
+                else:
+                    self.mult_scale[i] *= modifier.factor
+                    self.mult_offset[i] *= modifier.factor
+        self._update_flags()
+
+    def refresh_card(self, slot):
+        """Rebuild one card's entries from the card store and the card triggers"""
+        store = self.card_store
+        card = CARDS[slot % 52]
+        if store is None:
+            chips, mult, xmult, held = card.chip_value, 0, 1, 1
+        else:
+            chips, mult, xmult, held = (store.chips[slot], store.mult_add[slot], store.xmult[slot],
+                                        store.held_xmult[slot])
+        # Per card everything composes to mult -> mult * card_xmult + card_mult
+        for trigger in self.card_triggers:
+            if trigger.when(card):
+                chips += trigger.chips
+                mult = (mult + trigger.mult) * trigger.xmult
+                xmult *= trigger.xmult
+        self.card_chips[slot] = chips
+        self.card_mult[slot] = mult
+        self.card_xmult[slot] = xmult
+        self.held_xmult[slot] = held
+
+    def sync_cards(self):
+        """Refresh only the cards changed in the card store since the last sync"""
+        store = self.card_store
+        if store is None or store.version == self.card_version:
+            return
+        for slot in store.changed_since(self.card_version):
+            self.refresh_card(slot)
+        self.card_version = store.version
+        self._update_flags()
+
+    def _update_flags(self):
+        self.card_effects = any(m != 0 for m in self.card_mult) or any(x != 1 for x in self.card_xmult)
+        self.held_effects = any(x != 1 for x in self.held_xmult)
+        # plain: exactly (base + chip_sum) * mult, the ordering combo_stream and best_play rely on
+        self.plain = not self.modifiers and (self.card_store is None or self.card_store.is_plain())
+
+    def set_combo_score(self, name, base, mult):
+        """Replace one combo's base chips and mult (e.g. a level change) in place"""
+        i = self.index[name]
+        self.base_chips[i] = base
+        self.base_mult[i] = mult
+
+    def score_ids(self, combo_index, ids, held=()):
+        """Score of a play given the combo index (into self.names), scored and held card ids (or slots)"""
+        card_chips = self.card_chips
+        chips = self.base_chips[combo_index] + self.chip_add[combo_index]
+        for cid in ids:
+            chips += card_chips[cid]
+        mult = self.base_mult[combo_index]
+        if self.card_effects:
+            card_mult = self.card_mult
+            card_xmult = self.card_xmult
+            for cid in ids:
+                mult = mult * card_xmult[cid] + card_mult[cid]
+        if held and self.held_effects:
+            for cid in held:
+                mult *= self.held_xmult[cid]
+        mult = mult * self.mult_scale[combo_index] + self.mult_offset[combo_index]
+        return int(chips * mult)
+
+    def score(self, name, cards, held=()):
+        """Score of playing cards as combo name, with the cards in held left in hand"""
+        slot = card_slot if self.slots > 52 else card_id
+        return self.score_ids(self.index[name], [slot(c) for c in cards], [slot(c) for c in held])
+
+    def evaluate_many(self, plays):
+        """Scores for many (name, cards) plays in one call (no held cards), tables bound once"""
+        index = self.index
+        base_chips = self.base_chips
+        base_mult = self.base_mult
+        chip_add = self.chip_add
+        mult_scale = self.mult_scale
+        mult_offset = self.mult_offset
+        card_chips = self.card_chips
+        card_mult = self.card_mult
+        card_xmult = self.card_xmult
+        card_effects = self.card_effects
+        copies = self.slots > 52
+        scores = []
+        for name, cards in plays:
+            i = index[name]
+            if copies:
+                ids = [card_slot(c) for c in cards]
+            else:
+                ids = [SUIT_INDEX[c.suit] * 13 + c.value - 2 for c in cards]
+            chips = base_chips[i] + chip_add[i]
+            for cid in ids:
+                chips += card_chips[cid]
+            mult = base_mult[i]
+            if card_effects:
+                for cid in ids:
+                    mult = mult * card_xmult[cid] + card_mult[cid]
+            scores.append(int(chips * (mult * mult_scale[i] + mult_offset[i])))
+        return scores
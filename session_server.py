@@ -0,0 +1,305 @@
+# Multi-session game server: banyak ronde BalatroPoker independen dalam satu proses
+import argparse
+import asyncio
+import json
+import os
+import secrets
+import struct
+import time
+from collections import OrderedDict
+
+from card_codes import card_id, ids_to_cards, id_to_code
+
+# Snapshot layout: format version, then points, required, round, discard_count, replay round
+# and the hand, deck, played and discarded lengths. Bump SNAPSHOT_VERSION on any change.
+SNAPSHOT_VERSION = 1
+_HEADER = struct.Struct('<BIIIBIHHHH')
+
+
+class Session:
+    """Compact per-session state: card ids in bytearrays plus small integer counters"""
+    __slots__ = ('session_id', 'hand', 'deck', 'played', 'discarded', 'current_points',
+                 'required_points', 'round_number', 'discard_count', 'replay_round', 'last_active')
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+        self.hand = bytearray()
+        self.deck = bytearray()  # dealt from the end, like game_state['deck'].pop()
+        self.played = bytearray()
+        self.discarded = bytearray()
+        self.current_points = 0
+        self.required_points = 300
+        self.round_number = 0
+        self.discard_count = 0
+        self.replay_round = 0
+        self.last_active = time.monotonic()
+
+    def load_into(self, game):
+        """Copy this session into the shared engine's game_state"""
+        game.game_state = {
+            'hand': ids_to_cards(self.hand),
+            'played_cards': ids_to_cards(self.played),
+            'discarded': ids_to_cards(self.discarded),
+            'discard_count': self.discard_count,
+            'required_points': self.required_points,
+            'current_points': self.current_points,
+            'round_number': self.round_number,
+            'deck': ids_to_cards(self.deck)
+        }
+        game.selected_indices = []
+        game.notification = None
+        game.history.reset()  # the shared engine must not keep journals across sessions
+        game.replay_round = self.replay_round
+
+    def store_from(self, game):
+        state = game.game_state
+        self.hand = bytearray(card_id(c) for c in state['hand'])
+        self.deck = bytearray(card_id(c) for c in state['deck'])
+        self.played = bytearray(card_id(c) for c in state['played_cards'])
+        self.discarded = bytearray(card_id(c) for c in state['discarded'])
+        self.current_points = state['current_points']
+        self.required_points = state['required_points']
+        self.round_number = state['round_number']
+        self.discard_count = state['discard_count']
+        self.replay_round = game.replay_round
+
+    def to_bytes(self):
+        header = _HEADER.pack(SNAPSHOT_VERSION, self.current_points, self.required_points,
+                              self.round_number, self.discard_count, self.replay_round, len(self.hand),
+                              len(self.deck), len(self.played), len(self.discarded))
+        return header + bytes(self.hand + self.deck + self.played + self.discarded)
+
+    @classmethod
+    def from_bytes(cls, session_id, data):
+        if len(data) < _HEADER.size or data[0] != SNAPSHOT_VERSION:
+            raise ValueError(f"Unsupported session snapshot (format {data[0] if data else None})")
+        session = cls(session_id)
+        (_, session.current_points, session.required_points, session.round_number,
+         session.discard_count, session.replay_round, n_hand, n_deck, n_played,
+         n_discarded) = _HEADER.unpack_from(data)
+        pos = _HEADER.size
+        if len(data) != pos + n_hand + n_deck + n_played + n_discarded:
+            raise ValueError("Truncated session snapshot")
+        for name, size in (('hand', n_hand), ('deck', n_deck), ('played', n_played),
+                           ('discarded', n_discarded)):
+            setattr(session, name, bytearray(data[pos:pos + size]))
+            pos += size
+        return session
+
+    def summary(self):
+        return {
+            'session': self.session_id,
+            'hand': [id_to_code(cid) for cid in self.hand],
+            'current_points': self.current_points,
+            'required_points': self.required_points,
+            'round_number': self.round_number,
+            'discard_count': self.discard_count,
+            'deck_left': len(self.deck),
+            'played': len(self.played),
+            'discarded': len(self.discarded)
+        }
+
+
+class SessionManager:
+    """Hosts many independent rounds addressed by session id, with LRU/idle eviction.
+
+    All sessions share one headless BalatroPoker: a session is loaded into it,
+    the action runs through the normal rules, and the result is stored back.
+    Evicted sessions are written to snapshot_dir (if given) and restored on
+    their next request.
+    """
+
+    def __init__(self, game=None, max_sessions=10000, idle_timeout=600.0, snapshot_dir=None):
+        if game is None:
+            from game_logic import BalatroPoker
+            game = BalatroPoker()
+        self.game = game
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.snapshot_dir = snapshot_dir
+        self.sessions = OrderedDict()
+        if snapshot_dir:
+            os.makedirs(snapshot_dir, exist_ok=True)
+
+    def new_session(self):
+        session = Session(secrets.token_hex(8))
+        self._add(session)
+        self._run(session, self.game.start_round)
+        return session
+
+    def get(self, session_id):
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self._restore(session_id)
+            if session is None:
+                return None
+            self._add(session)
+        self.sessions.move_to_end(session_id)
+        session.last_active = time.monotonic()
+        return session
+
+    def close(self, session_id):
+        self.sessions.pop(session_id, None)
+        path = self._snapshot_path(session_id)
+        if path and os.path.exists(path):
+            os.remove(path)
+
+    def deal(self, session):
+        """Start a new round for the session (fresh deck, new hand)"""
+        return self._run(session, self.game.start_round)
+
+    def play(self, session, indices):
+        return self._run(session, self.game.play_combo, indices)
+
+    def discard(self, session, indices):
+        return self._run(session, self.game.discard_cards, indices)
+
+    def evict_idle(self):
+        """Evict sessions idle for longer than idle_timeout; returns how many"""
+        cutoff = time.monotonic() - self.idle_timeout
+        evicted = 0
+        while self.sessions:
+            session = next(iter(self.sessions.values()))
+            if session.last_active > cutoff:
+                break
+            self._evict(session)
+            evicted += 1
+        return evicted
+
+    def _run(self, session, action, indices=None):
+        session.load_into(self.game)
+        if indices is not None:
+            hand_size = len(session.hand)
+            self.game.selected_indices = [i for i in dict.fromkeys(indices) if 0 <= i < hand_size]
+        points_before = session.current_points
+        action()
+        session.store_from(self.game)
+        return {
+            'message': self.game.notification,
+            'earned': session.current_points - points_before
+        }
+
+    def _add(self, session):
+        self.sessions[session.session_id] = session
+        while len(self.sessions) > self.max_sessions:
+            self._evict(next(iter(self.sessions.values())))
+
+    def _evict(self, session):
+        del self.sessions[session.session_id]
+        path = self._snapshot_path(session.session_id)
+        if path:
+            with open(path, 'wb') as f:
+                f.write(session.to_bytes())
+
+    def _restore(self, session_id):
+        path = self._snapshot_path(session_id)
+        if not path or not os.path.exists(path):
+            return None
+        with open(path, 'rb') as f:
+            data = f.read()
+        try:
+            return Session.from_bytes(session_id, data)
+        except ValueError as e:
+            # Written by an older format or cut short: the session cannot be resumed
+            print(f"Dropping snapshot {path}: {e}")
+            return None
+
+    def _snapshot_path(self, session_id):
+        if not self.snapshot_dir or not session_id.isalnum():
+            return None
+        return os.path.join(self.snapshot_dir, f"{session_id}.session")
+
+
+def handle_request(manager, request):
+    """One JSON request -> JSON-ready response; ops: new, state, deal, play, discard, close"""
+    op = request.get('op')
+    if op == 'new':
+        session = manager.new_session()
+        return {'ok': True, 'state': session.summary()}
+
+    session_id = str(request.get('session', ''))
+    session = manager.get(session_id)
+    if session is None:
+        return {'ok': False, 'error': f"unknown session '{session_id}'"}
+
+    if op == 'state':
+        result = {}
+    elif op == 'deal':
+        result = manager.deal(session)
+    elif op in ('play', 'discard'):
+        indices = request.get('cards', [])
+        if not isinstance(indices, list) or not all(isinstance(i, int) for i in indices):
+            return {'ok': False, 'error': "'cards' must be a list of hand indices"}
+        action = manager.play if op == 'play' else manager.discard
+        result = action(session, indices)
+    elif op == 'close':
+        manager.close(session_id)
+        return {'ok': True}
+    else:
+        return {'ok': False, 'error': f"unknown op '{op}'"}
+    return dict(result, ok=True, state=session.summary())
+
+
+async def _serve_client(manager, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                request = json.loads(line)
+                response = handle_request(manager, request) if isinstance(request, dict) else \
+                    {'ok': False, 'error': 'request must be a JSON object'}
+            except ValueError as e:
+                response = {'ok': False, 'error': f"bad request: {e}"}
+            writer.write(json.dumps(response).encode('utf-8') + b'\n')
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def _evict_periodically(manager, interval):
+    while True:
+        await asyncio.sleep(interval)
+        manager.evict_idle()
+
+
+async def serve(manager, host='127.0.0.1', port=8766, sweep_interval=30.0):
+    server = await asyncio.start_server(
+        lambda reader, writer: _serve_client(manager, reader, writer), host, port)
+    sweeper = asyncio.create_task(_evict_periodically(manager, sweep_interval))
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        sweeper.cancel()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Acelatro multi-session game server (JSON lines)")
+    parser.add_argument('--port', type=int, default=8766)
+    parser.add_argument('--max-sessions', type=int, default=10000)
+    parser.add_argument('--idle-timeout', type=float, default=600.0, help="seconds before eviction")
+    parser.add_argument('--snapshot-dir', default=None, help="persist evicted sessions here")
+    parser.add_argument('--replay-dir', default=None, help="write a binary replay log here")
+    args = parser.parse_args()
+
+    manager = SessionManager(max_sessions=args.max_sessions, idle_timeout=args.idle_timeout,
+                             snapshot_dir=args.snapshot_dir)
+    if args.replay_dir:
+        from replay_log import RotatingReplayWriter
+        manager.game.recorder = RotatingReplayWriter(args.replay_dir, manager.game.COMBO_DEFINITIONS)
+    print(f"Serving game sessions on 127.0.0.1:{args.port} (one JSON request per line)")
+    try:
+        asyncio.run(serve(manager, port=args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if manager.game.recorder is not None:
+            manager.game.recorder.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,213 @@
+# Transposition table di shared memory, dipakai bersama oleh worker process dari parallel search
+import os
+import random
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+from card_codes import card_id, hand_mask, mask_to_ids
+from planner import (PLAYS_PER_ROUND, DISCARDS_PER_ROUND, HAND_SIZE, RoundPlanner)
+
+_HEADER = struct.Struct('<Q')   # generation, shared by every process
+_SLOT = struct.Struct('<QQ')    # key ^ data, data
+_MASK64 = 0xFFFFFFFFFFFFFFFF
+
+
+def _pack_data(value, depth, generation):
+    value_bits = struct.unpack('<I', struct.pack('<f', value))[0]
+    return value_bits | (depth & 0xFFFF) << 32 | (generation & 0xFFFF) << 48
+
+
+def _unpack_data(data):
+    value = struct.unpack('<f', struct.pack('<I', data & 0xFFFFFFFF))[0]
+    return value, (data >> 32) & 0xFFFF, data >> 48
+
+
+class SharedTranspositionTable:
+    """Fixed-size open-addressing table in multiprocessing.shared_memory.
+
+    Same interface and replacement rule as planner.TranspositionTable, but
+    every process attached to the same block sees every result. Slots are
+    written lock-free: each slot stores (key ^ data, data), so a slot torn by
+    two concurrent writers no longer matches its key and simply reads as a
+    miss. Keys probe `probes` consecutive slots before replacing one.
+    """
+
+    def __init__(self, size=1 << 20, name=None, probes=4):
+        self.size = size
+        self.probes = probes
+        nbytes = _HEADER.size + size * _SLOT.size
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=nbytes)
+            self.shm.buf[:nbytes] = bytes(nbytes)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.buf = self.shm.buf
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.rejected = 0
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    @property
+    def generation(self):
+        return _HEADER.unpack_from(self.buf, 0)[0] & 0xFFFF
+
+    def new_search(self):
+        """Age existing entries; call from the coordinating process only"""
+        _HEADER.pack_into(self.buf, 0, _HEADER.unpack_from(self.buf, 0)[0] + 1)
+
+    def _offset(self, index):
+        return _HEADER.size + (index % self.size) * _SLOT.size
+
+    def get(self, key, depth):
+        key &= _MASK64
+        for probe in range(self.probes):
+            checked, data = _SLOT.unpack_from(self.buf, self._offset(key + probe))
+            if data and checked ^ data == key:
+                value, stored_depth, _ = _unpack_data(data)
+                if stored_depth >= depth:
+                    self.hits += 1
+                    return value
+                break
+        self.misses += 1
+        return None
+
+    def put(self, key, depth, value):
+        key &= _MASK64
+        generation = self.generation
+        victim = None
+        for probe in range(self.probes):
+            offset = self._offset(key + probe)
+            checked, data = _SLOT.unpack_from(self.buf, offset)
+            if not data or checked ^ data == key:
+                victim = (offset, data)
+                break
+            _, stored_depth, stored_generation = _unpack_data(data)
+            # Prefer slots from older searches, then the shallowest entry
+            rank = (stored_generation == generation, stored_depth)
+            if victim is None or rank < victim[2]:
+                victim = (offset, data, rank)
+        offset, data = victim[0], victim[1]
+        if data:
+            _, stored_depth, stored_generation = _unpack_data(data)
+            if stored_generation == generation and stored_depth > depth:
+                self.rejected += 1
+                return
+        data = _pack_data(value, depth, generation) or 1
+        _SLOT.pack_into(self.buf, offset, key ^ data, data)
+        self.stores += 1
+
+    def clear(self):
+        nbytes = self.size * _SLOT.size
+        self.buf[_HEADER.size:_HEADER.size + nbytes] = bytes(nbytes)
+
+    def close(self):
+        self.buf = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+# Per-worker planner attached to the shared table, built once by the pool initializer
+_worker_planner = None
+
+
+def _init_worker(table_name, table_size, combo_definitions, planner_options):
+    global _worker_planner
+    table = SharedTranspositionTable(table_size, name=table_name)
+    _worker_planner = RoundPlanner(combo_definitions, table=table, **planner_options)
+
+
+def _evaluate_branch(task):
+    """Value of one sampled redraw after one root action"""
+    (action, hand_bits, deck_bits, points, plays_left, discards_left, required_points,
+     depth, seed) = task
+    planner = _worker_planner
+    planner.required_points = required_points
+    terminal, kept, points, plays_left, discards_left = planner.apply_action(
+        action, hand_bits, points, plays_left, discards_left)
+    if terminal is not None:
+        return terminal
+    deck_ids = mask_to_ids(deck_bits)
+    draw = min(HAND_SIZE - bin(kept).count('1'), len(deck_ids))
+    drawn = hand_mask(random.Random(seed).sample(deck_ids, draw)) if draw else 0
+    planner.rng.seed(seed)
+    return planner.value(kept | drawn, deck_bits & ~drawn, points, plays_left, discards_left,
+                         depth - 1)
+
+
+class ParallelPlanner:
+    """Splits the root of a RoundPlanner search across worker processes.
+
+    Every (root action, chance sample) pair is an independent task, so a root
+    with a few actions still yields enough tasks to keep many cores busy; all
+    workers share one SharedTranspositionTable, so a position searched by one
+    worker is reused by the others.
+    """
+
+    def __init__(self, combo_definitions, workers=None, table_size=1 << 20, max_depth=3,
+                 chance_samples=8, **planner_options):
+        self.combo_definitions = combo_definitions
+        self.max_depth = max_depth
+        self.chance_samples = chance_samples
+        self.table = SharedTranspositionTable(table_size)
+        self.root = RoundPlanner(combo_definitions, table=self.table, max_depth=max_depth,
+                                 chance_samples=chance_samples, **planner_options)
+        planner_options = dict(planner_options, max_depth=max_depth, chance_samples=chance_samples)
+        self.workers = workers or os.cpu_count()
+        self.pool = ProcessPoolExecutor(
+            max_workers=self.workers, initializer=_init_worker,
+            initargs=(self.table.name, table_size, combo_definitions, planner_options))
+
+    def plan(self, hand, deck, points=0, plays_left=PLAYS_PER_ROUND,
+             discards_left=DISCARDS_PER_ROUND, required_points=300, seed=None):
+        """Same result format as RoundPlanner.plan()"""
+        rng = random.Random(seed)
+        by_id = {card_id(c): c for c in hand}
+        hand_bits = hand_mask(by_id)
+        deck_bits = hand_mask(card_id(c) for c in deck)
+        self.table.new_search()
+        self.root.required_points = required_points
+        actions = self.root.actions(hand_bits, plays_left, discards_left)
+        if not actions:
+            return None
+
+        tasks = []
+        for action in actions:
+            for _ in range(self.chance_samples):
+                tasks.append((action, hand_bits, deck_bits, points, plays_left, discards_left,
+                              required_points, self.max_depth, rng.getrandbits(32)))
+        values = list(self.pool.map(_evaluate_branch, tasks,
+                                    chunksize=max(1, len(tasks) // (4 * self.workers))))
+
+        best = None
+        for i, action in enumerate(actions):
+            samples = values[i * self.chance_samples:(i + 1) * self.chance_samples]
+            value = sum(samples) / len(samples)
+            if best is None or value > best[0]:
+                best = (value, action)
+        value, (kind, ids, name, score) = best
+        return {
+            'action': kind,
+            'cards': [by_id[cid] for cid in ids],
+            'name': name,
+            'score': score,
+            'probability': value
+        }
+
+    def plan_game(self, game, plays_left=PLAYS_PER_ROUND, discards_left=None, seed=None):
+        state = game.game_state
+        if discards_left is None:
+            discards_left = max(DISCARDS_PER_ROUND - state['discard_count'], 0)
+        return self.plan(state['hand'], state['deck'], state['current_points'], plays_left,
+                         discards_left, state['required_points'], seed)
+
+    def close(self):
+        self.pool.shutdown()
+        self.table.close()
@@ -0,0 +1,123 @@
+# Prakomputasi spekulatif: analisis hand berikutnya yang paling mungkin, dihitung saat CPU menganggur
+import queue
+import threading
+
+from combo_stream import iter_combos
+from multiset import multiset_key
+
+HAND_SIZE = 8
+
+
+def predicted_hands(hand, deck, combo_definitions, plays=2, discards=3, max_discard=5):
+    """Hands that follow the likeliest next actions, most likely first.
+
+    The actions are playing one of the best `plays` combos (the recommended
+    one first) and discarding the lowest-chip cards around one of the best
+    `discards` combos. The deck order is known (deck[-1] is dealt next), so
+    every predicted hand is exact. Returns a list of (action, cards, next_hand).
+    """
+    ranked = []
+    seen = set()
+    for record in iter_combos(hand, combo_definitions):
+        ids = multiset_key(record.cards)
+        if ids not in seen:
+            seen.add(ids)
+            ranked.append(record.cards)
+        if len(ranked) >= max(plays, discards):
+            break
+
+    def after(removed):
+        kept = [c for c in hand if not any(c is r for r in removed)]
+        needed = min(HAND_SIZE - len(kept), len(deck))
+        return kept + deck[len(deck) - needed:][::-1]
+
+    predictions = [('play', cards, after(cards)) for cards in ranked[:plays]]
+    for cards in ranked[:discards]:
+        rest = sorted((c for c in hand if not any(c is k for k in cards)), key=lambda c: c.chip_value)
+        discard = tuple(rest[:max_discard])
+        if discard:
+            predictions.append(('discard', discard, after(discard)))
+    return predictions
+
+
+class Speculator:
+    """Precomputes the analyses of predicted next hands on a background thread.
+
+    analyze(cards) must compute a hand's analysis and store it in the
+    frontend's cache, so the real call after the user acts is a cache hit;
+    it runs on the worker, so it must not sync shared state (levels, scorer)
+    itself. Call schedule() when the screen is idle and cancel() as soon as
+    the user acts: the worker checks the cancel flag between hands and stops
+    there. One worker thread serves the session, fed through a queue, and
+    scheduling the state it is already working on again does nothing.
+    """
+
+    def __init__(self, game, analyze, plays=2, discards=3, max_discard=5):
+        self.game = game
+        self.analyze = analyze
+        self.plays = plays
+        self.discards = discards
+        self.max_discard = max_discard
+        self.cancel_event = threading.Event()
+        self.jobs = queue.Queue()
+        self.thread = None
+        self.scheduled = None  # (hand, deck size) of the job in progress, until cancelled
+        self.pending = 0
+        self.idle = threading.Condition()
+        self.computed = 0
+        self.cancelled = 0
+
+    def schedule(self):
+        """Speculate from the current hand, replacing any job still in progress"""
+        state = self.game.game_state
+        hand = list(state['hand'])
+        key = (tuple(id(c) for c in hand), len(state['deck']))
+        if not hand or key == self.scheduled:
+            return
+        self.cancel()
+        self.scheduled = key
+        self.cancel_event = threading.Event()
+        with self.idle:
+            self.pending += 1
+        self.jobs.put((hand, list(state['deck']), self.cancel_event))
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._loop, daemon=True)
+            self.thread.start()
+
+    def _loop(self):
+        while True:
+            job = self.jobs.get()
+            try:
+                self._run(*job)
+            finally:
+                with self.idle:
+                    self.pending -= 1
+                    self.idle.notify_all()
+
+    def _run(self, hand, deck, cancel_event):
+        if cancel_event.is_set():
+            self.cancelled += 1
+            return
+        predictions = predicted_hands(hand, deck, self.game.COMBO_DEFINITIONS, self.plays,
+                                      self.discards, self.max_discard)
+        for _, _, next_hand in predictions:
+            if cancel_event.is_set():
+                self.cancelled += 1
+                return
+            if next_hand:
+                self.analyze(next_hand)
+                self.computed += 1
+
+    def cancel(self):
+        """Stop the running speculation; the real action takes over"""
+        self.cancel_event.set()
+        self.scheduled = None
+
+    @property
+    def running(self):
+        return self.pending > 0
+
+    def wait(self, timeout=None):
+        """Block until every scheduled job is done; False on timeout"""
+        with self.idle:
+            return self.idle.wait_for(lambda: self.pending == 0, timeout)
@@ -0,0 +1,391 @@
+# Strategi yang bisa dipasang: antarmuka play/discard, evaluasi per batch di proses paralel
+import argparse
+import importlib
+import json
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from best_play import best_play
+from card_codes import hand_mask
+from combo_stream import iter_combos
+from multiset import multiset_key
+from planner import CARDS, RoundPlanner
+from run_engine import ANTE_TARGETS, Run, RunConfig, chase_strategy, greedy_strategy, hand_positions, \
+    print_summary, summarize
+
+
+class Strategy:
+    """Decides the next action of a state: ('play' | 'discard', hand positions).
+
+    A state is a run_engine.Run (or anything with the same attributes):
+    hand (card ids), draw (unseen card ids), points, target, plays_left,
+    discards_left, ante, blind and combo_definitions. The runner always
+    calls decide_batch() with every live state at once; override it to
+    share work across states, or just implement decide(). Strategies are
+    pickled into the worker processes, so keep their attributes picklable.
+    """
+
+    name = None
+
+    def decide(self, state):
+        raise NotImplementedError
+
+    def decide_batch(self, states):
+        return [self.decide(state) for state in states]
+
+
+class FunctionStrategy(Strategy):
+    """Adapter for a plain run_engine-style function(run) -> (action, positions)"""
+
+    def __init__(self, function, name=None):
+        self.function = function
+        self.name = name or function.__name__
+
+    def decide(self, state):
+        return self.function(state)
+
+
+class GreedyStrategy(Strategy):
+    """Always play the best combo in hand (the recommendation of analyze_hand)"""
+
+    name = 'greedy'
+
+    def decide(self, state):
+        return greedy_strategy(state)
+
+
+class ChaseStrategy(Strategy):
+    """run_engine.chase_strategy: play when on pace for the target, else discard around the best combo"""
+
+    name = 'chase'
+
+    def decide(self, state):
+        return chase_strategy(state)
+
+
+class EVDiscardStrategy(Strategy):
+    """Play when the best combo keeps pace with the target; otherwise pick the discard with the best
+    expected score after redrawing, estimated from `samples` draws of the unseen cards.
+
+    Discard candidates are the lowest-chip cards around each of the best `candidates` combos, in
+    every size of discard_sizes. When no candidate beats playing now, the best combo is played.
+    """
+
+    name = 'ev-discard'
+
+    def __init__(self, samples=8, candidates=3, discard_sizes=(1, 3, 5), seed=0):
+        self.samples = samples
+        self.candidates = candidates
+        self.discard_sizes = discard_sizes
+        self.rng = random.Random(seed)
+
+    def decide(self, state):
+        hand = state.hand_cards()
+        defs = state.combo_definitions
+        best = best_play(hand, defs)
+        keep = hand_positions(state.hand, best.cards)
+        needed = (state.target - state.points) / state.plays_left
+        if best.score >= needed or state.discards_left == 0 or not state.draw:
+            return 'play', keep
+
+        best_option = None
+        for positions in self.discard_options(state, hand):
+            kept = [card for i, card in enumerate(hand) if i not in positions]
+            size = min(len(positions), len(state.draw))
+            total = 0
+            for _ in range(self.samples):
+                drawn = [CARDS[cid] for cid in self.rng.sample(state.draw, size)]
+                total += best_play(kept + drawn, defs).score
+            expected = total / self.samples
+            if best_option is None or expected > best_option[0]:
+                best_option = (expected, positions)
+        if best_option is None or best_option[0] <= best.score:
+            return 'play', keep
+        return 'discard', list(best_option[1])
+
+    def discard_options(self, state, hand):
+        """Distinct discard position sets around the best combos"""
+        options = []
+        seen_plays = set()
+        for record in iter_combos(hand, state.combo_definitions):
+            ids = multiset_key(record.cards)
+            if ids in seen_plays:
+                continue
+            seen_plays.add(ids)
+            keep = set(hand_positions(state.hand, record.cards))
+            rest = sorted((i for i in range(len(hand)) if i not in keep), key=lambda i: hand[i].chip_value)
+            for size in self.discard_sizes:
+                positions = tuple(sorted(rest[:size]))
+                if positions and positions not in options:
+                    options.append(positions)
+            if len(seen_plays) >= self.candidates:
+                break
+        return options
+
+
+def _draw_shape(cards):
+    """Longest suit, longest rank run and number of paired cards"""
+    rank_counts = {}
+    suit_counts = {}
+    for c in cards:
+        rank_counts[c.value] = rank_counts.get(c.value, 0) + 1
+        suit_counts[c.suit] = suit_counts.get(c.suit, 0) + 1
+    longest = run = 0
+    for value in range(2, 15):
+        run = run + 1 if value in rank_counts else 0
+        longest = max(longest, run)
+    paired = sum(n for n in rank_counts.values() if n > 1)
+    return max(suit_counts.values(), default=0), longest, paired
+
+
+class WeightedStrategy(Strategy):
+    """Heuristic with tunable weights (see tuner.py).
+
+    Plays the best combo when it scores at least `pace` times the per-play
+    pace of the target. Otherwise it discards: the candidate keeps (around
+    the best combos, the longest suit and the longest rank run) are valued
+    as score_weight * their best score now plus flush_draw per suited card,
+    straight_draw per run card (both beyond two) and pair per paired card,
+    and the cards outside the best keep are discarded, lowest chips first.
+    """
+
+    name = 'weighted'
+    # Search space for tuner.py: (low, high) ranges or lists of choices
+    SPACE = {
+        'pace': (0.5, 2.0),
+        'score_weight': (0.0, 2.0),
+        'flush_draw': (0.0, 80.0),
+        'straight_draw': (0.0, 80.0),
+        'pair': (0.0, 60.0),
+        'max_discard': [2, 3, 4, 5],
+    }
+
+    def __init__(self, pace=1.0, score_weight=1.0, flush_draw=20.0, straight_draw=15.0, pair=10.0,
+                 max_discard=5, candidates=3):
+        self.pace = pace
+        self.score_weight = score_weight
+        self.flush_draw = flush_draw
+        self.straight_draw = straight_draw
+        self.pair = pair
+        self.max_discard = max_discard
+        self.candidates = candidates
+
+    def decide(self, state):
+        hand = state.hand_cards()
+        best = best_play(hand, state.combo_definitions)
+        keep = hand_positions(state.hand, best.cards)
+        needed = (state.target - state.points) / state.plays_left
+        if best.score >= self.pace * needed or state.discards_left == 0 or not state.draw:
+            return 'play', keep
+
+        best_keep = None
+        for kept in self.keep_options(state, hand):
+            rest = sorted((i for i in range(len(hand)) if i not in kept), key=lambda i: hand[i].chip_value)
+            discard = rest[:self.max_discard]
+            if not discard:
+                continue
+            value = self.keep_value([hand[i] for i in range(len(hand)) if i not in discard], state)
+            if best_keep is None or value > best_keep[0]:
+                best_keep = (value, discard)
+        if best_keep is None:
+            return 'play', keep
+        return 'discard', best_keep[1]
+
+    def keep_value(self, kept, state):
+        suited, run, paired = _draw_shape(kept)
+        best = best_play(kept, state.combo_definitions)
+        return (self.score_weight * (best.score if best is not None else 0)
+                + self.flush_draw * max(suited - 2, 0)
+                + self.straight_draw * max(run - 2, 0)
+                + self.pair * paired)
+
+    def keep_options(self, state, hand):
+        """Position sets worth keeping: the best combos, the longest suit, the longest rank run"""
+        options = []
+        seen_plays = set()
+        for record in iter_combos(hand, state.combo_definitions):
+            ids = multiset_key(record.cards)
+            if ids in seen_plays:
+                continue
+            seen_plays.add(ids)
+            options.append(set(hand_positions(state.hand, record.cards)))
+            if len(seen_plays) >= self.candidates:
+                break
+        suits = {}
+        for i, c in enumerate(hand):
+            suits.setdefault(c.suit, set()).add(i)
+        options.append(max(suits.values(), key=len))
+        by_value = {}
+        for i, c in enumerate(hand):
+            by_value.setdefault(c.value, i)
+        run = []
+        best_run = []
+        for value in range(2, 15):
+            run = run + [by_value[value]] if value in by_value else []
+            if len(run) > len(best_run):
+                best_run = run
+        options.append(set(best_run))
+        return options
+
+
+class SearchStrategy(Strategy):
+    """planner.RoundPlanner over the current blind: maximizes the chance of reaching its target.
+
+    The deck order is treated as unknown. One planner per target is shared by every state of a
+    batch, so the play rankings and the transposition table carry over between decisions.
+    Cards are tracked as masks, so duplicate cards (multi-deck configs) are not supported.
+    """
+
+    name = 'search'
+
+    def __init__(self, max_depth=1, chance_samples=3, seed=0):
+        self.max_depth = max_depth
+        self.chance_samples = chance_samples
+        self.seed = seed
+        self.planners = {}
+
+    def planner(self, state):
+        planner = self.planners.get(state.target)
+        if planner is None:
+            planner = RoundPlanner(state.combo_definitions, state.target, max_depth=self.max_depth,
+                                   chance_samples=self.chance_samples, seed=self.seed)
+            self.planners[state.target] = planner
+        return planner
+
+    def decide(self, state):
+        plan = self.planner(state).plan_bits(hand_mask(state.hand), hand_mask(state.draw), state.points,
+                                             state.plays_left, state.discards_left)
+        if plan is None:
+            return greedy_strategy(state)
+        return plan['action'], hand_positions(state.hand, [CARDS[cid] for cid in plan['cards']])
+
+    def __getstate__(self):
+        # Planners hold large tables; workers build their own
+        return dict(self.__dict__, planners={})
+
+
+STRATEGIES = {
+    'greedy': GreedyStrategy,
+    'chase': ChaseStrategy,
+    'ev-discard': EVDiscardStrategy,
+    'weighted': WeightedStrategy,
+    'search': SearchStrategy,
+}
+
+
+def get_strategy(spec, **options):
+    """A Strategy from a registered name or 'module:Class' (researchers' own policies)"""
+    if isinstance(spec, Strategy):
+        return spec
+    if spec in STRATEGIES:
+        return STRATEGIES[spec](**options)
+    module_name, _, class_name = spec.partition(':')
+    if not class_name:
+        raise ValueError(f"Unknown strategy: {spec} (use one of {sorted(STRATEGIES)} or module:Class)")
+    strategy = getattr(importlib.import_module(module_name), class_name)(**options)
+    if strategy.name is None:
+        strategy.name = spec
+    return strategy
+
+
+def play_runs(strategy, seeds, config, combo_definitions, max_actions=10000):
+    """Play one run per seed in lockstep, handing the strategy every live run per step.
+
+    Returns (run results, number of decisions made).
+    """
+    runs = [Run(config, combo_definitions, seed) for seed in seeds]
+    live = runs
+    decisions = 0
+    for _ in range(max_actions):
+        live = [run for run in live if not run.over]
+        if not live:
+            break
+        actions = strategy.decide_batch(live)
+        decisions += len(live)
+        for run, (action, positions) in zip(live, actions):
+            if action == 'discard' and run.discards_left > 0:
+                run.discard(positions)
+            else:
+                run.play(positions[:5])
+    return [run.result() for run in runs], decisions
+
+
+def _play_batch(task):
+    key, strategy, seeds, config, combo_definitions = task
+    started = time.perf_counter()
+    results, decisions = play_runs(strategy, seeds, config, combo_definitions)
+    return key, results, decisions, time.perf_counter() - started
+
+
+def evaluate(strategies, runs, combo_definitions, config=None, workers=None, seed=0, chunk=50):
+    """Run every strategy `runs` times across a process pool; same seeds for every strategy.
+
+    strategies is a list of Strategy objects or specs for get_strategy. Returns
+    {name: run_engine.summarize() report plus 'decisions' and 'decisions_per_second'
+    (per worker process)}.
+    """
+    config = config or RunConfig()
+    strategies = [get_strategy(spec) for spec in strategies]
+    names = [strategy.name for strategy in strategies]
+    if len(set(names)) != len(names):
+        raise ValueError(f"Duplicate strategy names: {names}")
+    seeds = [seed * 1000003 + i for i in range(runs)]
+    tasks = [(strategy.name, strategy, seeds[start:start + chunk], config, combo_definitions)
+             for strategy in strategies for start in range(0, runs, chunk)]
+    results = {name: [] for name in names}
+    decisions = dict.fromkeys(names, 0)
+    seconds = dict.fromkeys(names, 0.0)
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        batches = map(_play_batch, tasks)
+        for name, batch, count, elapsed in batches:
+            results[name].extend(batch)
+            decisions[name] += count
+            seconds[name] += elapsed
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for name, batch, count, elapsed in pool.map(_play_batch, tasks):
+                results[name].extend(batch)
+                decisions[name] += count
+                seconds[name] += elapsed
+    report = {}
+    for name in names:
+        report[name] = summarize(results[name], config)
+        report[name]['decisions'] = decisions[name]
+        # Per worker process: time spent in the strategy's own batches
+        report[name]['decisions_per_second'] = round(decisions[name] / seconds[name], 1) if seconds[name] else None
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate play/discard strategies over full runs")
+    parser.add_argument('--strategies', nargs='+', default=['greedy', 'chase', 'ev-discard'],
+                        help=f"registered names ({', '.join(sorted(STRATEGIES))}) or module:Class")
+    parser.add_argument('--runs', type=int, default=1000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--chunk', type=int, default=50, help="runs per batch handed to a worker")
+    parser.add_argument('--antes', type=int, default=len(ANTE_TARGETS))
+    parser.add_argument('--carry-deck', action='store_true', help="keep the draw pile between blinds")
+    parser.add_argument('--json', action='store_true')
+    args = parser.parse_args()
+
+    from game_logic import BalatroPoker
+    config = RunConfig(antes=args.antes, carry_deck=args.carry_deck)
+    try:
+        report = evaluate(args.strategies, args.runs, BalatroPoker.COMBO_DEFINITIONS, config,
+                          args.workers, args.seed, args.chunk)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_summary(report, config)
+        for name, row in report.items():
+            print(f"{name}: {row['decisions']} decisions, {row['decisions_per_second']} decisions/s per worker")
+
+
+if __name__ == "__main__":
+    main()
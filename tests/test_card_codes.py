@@ -0,0 +1,29 @@
+from card_codes import code_to_id, id_to_code, iter_code_file, parse_codes, parse_mask, INVALID_ID
+
+
+def codes(ids):
+    return [id_to_code(cid) for cid in ids]
+
+
+def test_invalid_tokens_are_reported_with_their_position():
+    ids, errors = parse_codes("Ah xx 10d 1h Th")
+    assert codes(ids) == ['Ah', '10d']
+    assert errors == [(1, 'xx'), (3, '1h'), (4, 'Th')]
+
+
+def test_commas_empty_lines_and_rare_spellings():
+    assert codes(parse_codes("Ah, Kd,,Qc")[0]) == ['Ah', 'Kd', 'Qc']
+    ids, errors = parse_codes("")
+    assert len(ids) == 0 and errors == []
+    ids, errors = parse_codes("ah 010d xx")  # the fallback parser takes these; xx still fails
+    assert codes(ids) == ['Ah', '10d'] and errors == [(2, 'xx')]
+    assert code_to_id('Zz') == INVALID_ID
+
+
+def test_mask_and_file_errors(tmp_path):
+    mask, errors = parse_mask("Ah zz")
+    assert mask == 1 << parse_codes("Ah")[0][0] and errors == [(1, 'zz')]
+    path = tmp_path / 'hands.txt'
+    path.write_text("Ah Kd\n\n2c ??\n", encoding='utf-8')
+    rows = [(line, codes(ids), errors) for line, ids, errors in iter_code_file(str(path))]
+    assert rows == [(1, ['Ah', 'Kd'], []), (3, ['2c'], [(1, '??')])]
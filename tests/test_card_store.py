@@ -0,0 +1,67 @@
+import pytest
+
+import combos
+from card_codes import card_slot, parse_codes, ids_to_cards
+from card_store import CardStore
+from deck_config import DeckConfig
+from scoring import ScoringPipeline
+
+DEFINITIONS = [
+    {'name': 'Flush', 'card_count': 5, 'check': combos.is_flush, 'score': {'base': 35, 'mult': 4}},
+    {'name': 'Pair', 'card_count': 2, 'check': combos.is_pair, 'score': {'base': 10, 'mult': 2}},
+]
+
+
+def hand(codes):
+    ids, errors = parse_codes(codes)
+    assert not errors
+    return ids_to_cards(ids)
+
+
+def aces_of_hearts(deck):
+    return [c for c in deck if c.suit == 'Hearts' and c.value == 14]
+
+
+def test_copies_keep_their_own_enhancement():
+    deck = DeckConfig(decks=2).build()
+    first, second = aces_of_hearts(deck)
+    assert card_slot(first) != card_slot(second)
+    store = CardStore(copies=2)
+    store.set_card(second, 'glass')
+    scorer = ScoringPipeline().compile(DEFINITIONS, store)
+    spade = hand("As")[0]
+    assert scorer.score('Pair', [first, spade]) == (10 + 22) * 2
+    assert scorer.score('Pair', [second, spade]) == (10 + 22) * 4
+    assert store.ids_suffice([first, spade]) and not store.ids_suffice([second, spade])
+
+
+def test_wild_card_fits_any_suit():
+    store = CardStore()
+    cards = hand("2s 5s 9s Js Kh")
+    assert not combos.is_flush(store.suit_view(cards))
+    store.set_card(cards[4], 'wild')
+    assert combos.is_flush(store.suit_view(cards))
+    assert store.suit_view(cards)[:4] == tuple(cards[:4])
+    assert not store.ids_suffice(cards)
+    store.set_card(cards[4], 'none')
+    assert store.wild == 0 and store.ids_suffice(cards)
+
+
+def test_game_scores_copies_and_wild_cards_apart():
+    pytest.importorskip('flet')
+    from analysis_cache import AnalysisCache
+    from game_logic import BalatroPoker
+
+    game = BalatroPoker(analysis_cache=AnalysisCache(), deck_config=DeckConfig(decks=2))
+    first, second = aces_of_hearts(game.deck_config.build())
+    rest = hand("7c 4d 2s 9h Jc 3d")
+    game.enhance(second, 'glass')
+    plain = game.analyze_cards([first, hand("As")[0]] + rest)
+    glass = game.analyze_cards([second, hand("As")[0]] + rest)
+    assert plain[0]['score'] < glass[0]['score']
+
+    flush = hand("2s 5s 9s Js Kh 7c 4d 9h")
+    assert all(c['name'] != 'Flush' for c in game.analyze_cards(flush))
+    game.enhance(flush[4], 'wild')
+    assert game.analyze_cards(flush)[0]['name'] == 'Flush'
+    assert game.identify_combo(flush[:5])['name'] == 'Flush'
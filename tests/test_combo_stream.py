@@ -0,0 +1,49 @@
+import random
+from itertools import combinations
+
+import pytest
+
+import combo_stream
+from card_codes import card_from_id
+from combo_stream import subsets_by_chip_sum
+from multiset import multiset_combinations
+
+
+def sorted_subsets(hand, k):
+    """The eager order: every distinct subset, stable-sorted by chip sum"""
+    subsets = [(sum(c.chip_value for c in cards), cards) for cards, _ in multiset_combinations(hand, k)]
+    subsets.sort(key=lambda subset: subset[0], reverse=True)
+    return subsets
+
+
+@pytest.fixture(params=[True, False], ids=['lazy', 'eager'])
+def lazy(request, monkeypatch):
+    if request.param:
+        monkeypatch.setattr(combo_stream, 'EAGER_SUBSETS', 0)
+    return request.param
+
+
+def test_order_matches_sorted_combinations(lazy):
+    rng = random.Random(7)
+    for _ in range(50):
+        hand = [card_from_id(cid) for cid in rng.sample(range(52), 8)]
+        for k in range(1, 6):
+            assert list(subsets_by_chip_sum(hand, k)) == sorted_subsets(hand, k)
+            assert len(list(subsets_by_chip_sum(hand, k))) == len(list(combinations(hand, k)))
+
+
+def test_multi_deck_copies_appear_once(lazy):
+    rng = random.Random(11)
+    for _ in range(50):
+        hand = [card_from_id(cid) for cid in rng.choices(range(20), k=8)]
+        for k in range(1, 6):
+            assert list(subsets_by_chip_sum(hand, k)) == sorted_subsets(hand, k)
+
+
+def test_subsets_are_made_on_demand(monkeypatch):
+    monkeypatch.setattr(combo_stream, 'EAGER_SUBSETS', 0)
+    hand = [card_from_id(cid) for cid in range(8)]
+    subsets = subsets_by_chip_sum(hand, 5)
+    assert subsets[0][0] == max(sum(c.chip_value for c in cards) for cards in combinations(hand, 5))
+    assert len(subsets.items) == 1
+    assert not subsets.has(56) and subsets.has(55)
@@ -0,0 +1,56 @@
+import sqlite3
+import time
+
+import pytest
+
+import combos
+from card_codes import ids_to_cards, parse_codes
+from disk_cache import DiskCache
+
+DEFINITIONS = [
+    {'name': 'Pair', 'card_count': 2, 'check': combos.is_pair, 'score': {'base': 10, 'mult': 2}},
+]
+
+
+def test_reads_do_not_wait_for_another_writer(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    cache = DiskCache(path, DEFINITIONS, touch_batch=1)
+    cache.put(('k',), [1, 2])
+    other = sqlite3.connect(path, isolation_level=None)
+    other.execute("BEGIN IMMEDIATE")  # another process holds the write lock
+    try:
+        start = time.monotonic()
+        assert cache.get(('k',)) == (1, 2)
+        assert time.monotonic() - start < 1.0
+        assert cache.touched  # kept for a later flush
+    finally:
+        other.execute("ROLLBACK")
+        other.close()
+    cache.flush()
+    assert not cache.touched
+    cache.close()
+
+
+def test_game_and_server_share_one_cache_file(tmp_path):
+    pytest.importorskip('flet')
+    from disk_cache import TieredCache
+    from game_logic import BalatroPoker
+    from recommend_server import _run_analyze, build_key
+
+    path = str(tmp_path / 'shared.db')
+    server = BalatroPoker()
+    server_cache = TieredCache(DiskCache(path, BalatroPoker.COMBO_DEFINITIONS))
+    key, error = build_key('analyze', {'hand': 'Ah As 7c 4d 2s 9h Jc 3d'})
+    assert error is None
+    server_cache.put(key, _run_analyze(server, list(key[1:])))
+
+    game = BalatroPoker()
+    game.disk_cache = DiskCache(path, BalatroPoker.COMBO_DEFINITIONS)
+    ids, _ = parse_codes('Ah As 7c 4d 2s 9h Jc 3d')
+    game.game_state['hand'] = ids_to_cards(ids)
+    fresh = game.analyze_hand()
+    again = BalatroPoker()
+    again.disk_cache = game.disk_cache
+    again.game_state['hand'] = ids_to_cards(ids)
+    assert again.analyze_hand()[0]['score'] == fresh[0]['score']
+    assert server_cache.get(key)[0]['name'] == fresh[0]['name']
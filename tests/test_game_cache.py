@@ -0,0 +1,42 @@
+import pytest
+
+pytest.importorskip('flet')
+
+from analysis_cache import AnalysisCache
+from card_codes import parse_codes, ids_to_cards
+from game_logic import BalatroPoker
+
+
+def hand(codes):
+    ids, errors = parse_codes(codes)
+    assert not errors
+    return ids_to_cards(ids)
+
+
+def pair_score(game, cards):
+    return next(c['score'] for c in game.analyze_cards(cards) if c['name'] == 'Pair')
+
+
+def test_shared_cache_is_not_read_across_games_with_different_levels():
+    cache = AnalysisCache()
+    a = BalatroPoker(analysis_cache=cache)
+    b = BalatroPoker(analysis_cache=cache)
+    cards = hand("Ah As 7c 4d 2s 9h Jc 3d")
+    a.levels.level_up('Pair', 3)
+    b.levels.level_up('Two Pair')  # same version number as a's levels after one change each
+    a_score = pair_score(a, cards)
+    b_score = pair_score(b, cards)
+    fresh = pair_score(BalatroPoker(), cards)
+    assert b_score == fresh
+    assert a_score > fresh
+
+
+def test_shared_cache_is_not_read_across_games_with_different_cards():
+    cache = AnalysisCache()
+    a = BalatroPoker(analysis_cache=cache)
+    b = BalatroPoker(analysis_cache=cache)
+    cards = hand("Ah As 7c 4d 2s 9h Jc 3d")
+    a.enhance(cards[0], 'bonus')
+    b.enhance(cards[2], 'bonus')
+    pair_score(a, cards)
+    assert pair_score(b, cards) == pair_score(BalatroPoker(), cards)
@@ -0,0 +1,35 @@
+import pytest
+
+from card_codes import parse_codes, ids_to_cards
+from hand_strength import backoff_keys, load_table, ordinal
+
+
+def hand(codes):
+    ids, errors = parse_codes(codes)
+    assert not errors
+    return ids_to_cards(ids)
+
+
+def test_finest_key_keeps_ranks():
+    aces = hand("Ah As 7c 4d 9s Jh Kc 3d")
+    deuces = hand("2h 2s 7c 4d 9s Jh Kc 3d")
+    assert backoff_keys(aces)[0] != backoff_keys(deuces)[0]
+
+
+def test_keys_ignore_suit_labels():
+    cards = hand("Ah As 7c 4d 9s Jh Kc 3d")
+    relabelled = hand("Ac Ad 7h 4s 9d Jc Kh 3s")
+    assert backoff_keys(cards) == backoff_keys(relabelled)
+
+
+def test_table_keys_match_the_lookup_keys():
+    table = load_table()
+    if table is None:
+        pytest.skip("hand_strength.json not built")
+    levels = {k.split(':')[0] for clear in table.clear.values() for k in clear if k}
+    assert levels <= {k.split(':')[0] for k in backoff_keys(hand("Ah As 7c 4d 9s Jh Kc 3d")) if k}
+
+
+def test_ordinal_suffixes():
+    assert [ordinal(n) for n in (1, 2, 3, 4, 11, 12, 13, 21, 22, 33, 100, 111)] == [
+        '1st', '2nd', '3rd', '4th', '11th', '12th', '13th', '21st', '22nd', '33rd', '100th', '111th']
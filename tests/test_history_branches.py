@@ -0,0 +1,41 @@
+import random
+
+import pytest
+
+pytest.importorskip('tkinter')
+
+from gui_version import BalatroPoker
+from replay_log import (KIND_DEAL, KIND_DISCARD, KIND_PLAY, KIND_REDO, KIND_UNDO, RotatingReplayWriter,
+                        iter_records)
+
+
+def test_branches_are_labelled_by_their_cards_and_can_be_redone():
+    random.seed(3)
+    game = BalatroPoker()
+    game.start_round()
+    hand = list(game.game_state['hand'])
+    game.play_combo(hand[:1])
+    first_points_hand = list(game.game_state['hand'])
+    assert game.undo()
+    game.discard_cards([0, 1])
+    assert game.undo()
+    branches = game.history.branches()
+    assert branches == [f"Play {hand[0]!r}", f"Discard {hand[0]!r}, {hand[1]!r}"]
+    assert game.redo(0)
+    assert game.game_state['hand'] == first_points_hand
+
+
+def test_replay_log_follows_the_redone_branch(tmp_path):
+    random.seed(4)
+    game = BalatroPoker()
+    game.recorder = RotatingReplayWriter(str(tmp_path), game.COMBO_DEFINITIONS)
+    game.start_round()
+    game.play_combo(game.game_state['hand'][:2])
+    game.undo()
+    game.discard_cards([0])
+    game.undo()
+    game.redo(0)
+    game.recorder.close()
+    records = list(iter_records(str(tmp_path)))
+    assert [r.kind for r in records] == [KIND_DEAL, KIND_PLAY, KIND_UNDO, KIND_DISCARD, KIND_UNDO, KIND_REDO]
+    assert records[-1].branch == 0
@@ -0,0 +1,81 @@
+from card_codes import ids_to_cards, parse_codes
+from history_db import HistoryStore
+
+DEFINITIONS = [{'name': 'Flush'}, {'name': 'Pair'}]
+
+
+def cards(codes):
+    ids, errors = parse_codes(codes)
+    assert not errors
+    return ids_to_cards(ids)
+
+
+def round_row(store, round_id):
+    return store.db.execute("SELECT plays, discards, final_points FROM rounds WHERE id = ?",
+                            (round_id,)).fetchone()
+
+
+def play_three_and_undo(store, flush_before_undo=False):
+    rid = store.new_round()
+    store.log_deal(rid, cards("2h 5h 9h Jh Kh 2c 3d 4s"))
+    store.log_play(rid, cards("2c 2h"), 'Pair', 28, 28)
+    store.log_discard(rid, cards("3d 4s"), 28)
+    store.log_play(rid, cards("3c 3s"), 'Pair', 30, 58)
+    store.log_play(rid, cards("5h 9h Jh Kh Ah"), 'Flush', 352, 410)
+    if flush_before_undo:
+        store.flush()
+    store.log_undo(rid, 58)
+    store.flush()
+    return rid
+
+
+def test_undone_play_is_left_out(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'), DEFINITIONS)
+    play_three_and_undo(store)
+    assert round_row(store, 1) == (2, 1, 58)
+    assert store.plays('Flush') == []
+    assert [row['combo'] for row in store.combo_counts()] == ['Pair']
+    actions = store.round_actions(1)
+    assert [a['kind'] for a in actions] == ['deal', 'play', 'discard', 'play', 'play', 'undo']
+    assert actions[4]['undone']
+
+
+def test_undo_of_an_action_written_earlier(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'), DEFINITIONS)
+    rid = play_three_and_undo(store, flush_before_undo=True)
+    assert round_row(store, 1) == (2, 1, 58)
+    assert store.plays('Flush') == []
+    store.log_redo(rid, 410)
+    store.close()
+
+    store = HistoryStore(str(tmp_path / 'history.db'), DEFINITIONS)
+    assert round_row(store, 1) == (3, 1, 410)
+    assert [row['score'] for row in store.plays('Flush')] == [352]
+
+
+def test_new_play_after_undo_drops_the_redo(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'), DEFINITIONS)
+    rid = store.new_round()
+    store.log_play(rid, cards("2c 2h"), 'Pair', 28, 28)
+    store.log_undo(rid, 0)
+    store.log_play(rid, cards("3c 3h"), 'Pair', 30, 30)
+    store.log_redo(rid, 30)  # nothing left to redo
+    store.flush()
+    assert [row['cards'] for row in store.plays()] == [['3c', '3h']]
+    assert round_row(store, 1) == (1, 0, 30)
+
+
+def test_redo_of_an_older_branch(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history.db'), DEFINITIONS)
+    rid = store.new_round()
+    store.log_play(rid, cards("2c 2h"), 'Pair', 28, 28)
+    store.log_undo(rid, 0)
+    store.log_play(rid, cards("3c 3h"), 'Pair', 30, 30)
+    store.flush()
+    store.log_undo(rid, 0)
+    store.log_redo(rid, 28, branch=0)  # back to the first play, as GameHistory.redo(0)
+    store.close()
+
+    store = HistoryStore(str(tmp_path / 'history.db'), DEFINITIONS)
+    assert [row['cards'] for row in store.plays()] == [['2c', '2h']]
+    assert round_row(store, 1) == (1, 0, 28)
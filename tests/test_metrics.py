@@ -0,0 +1,21 @@
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WRITE_AT_EXIT = """
+import sys
+from metrics import REGISTRY, write_at_exit
+write_at_exit(sys.argv[1])
+REGISTRY.inc('plays', 3)
+"""
+
+
+def test_metrics_are_written_on_exit(tmp_path):
+    path = str(tmp_path / 'metrics.json')
+    subprocess.run([sys.executable, '-c', WRITE_AT_EXIT, path], cwd=ROOT, check=True,
+                   env=dict(os.environ, PYTHONPATH=ROOT))
+    with open(path, encoding='utf-8') as f:
+        assert json.load(f)['counters'] == {'plays': 3}
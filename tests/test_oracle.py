@@ -0,0 +1,22 @@
+import combos
+from card_codes import hand_mask, parse_codes
+from compact_state import CompactState
+from oracle import BeamOracle
+
+DEFINITIONS = [
+    {'name': 'Flush', 'card_count': 5, 'check': combos.is_flush, 'score': {'base': 35, 'mult': 4}},
+    {'name': 'Pair', 'card_count': 2, 'check': combos.is_pair, 'score': {'base': 10, 'mult': 2}},
+]
+
+
+def ids(codes):
+    found, errors = parse_codes(codes)
+    assert not errors
+    return found
+
+
+def test_graded_play_scores_its_kickers():
+    hand = ids("Ah As Kc 4d 2s 9h Jc 3d")
+    state = CompactState(hand=hand_mask(hand), deck=bytes(ids("5c 6c 7c 8s 10h")))
+    graded = BeamOracle(DEFINITIONS).grade(state, ('play', ids("Ah As Kc")), plays_left=1)
+    assert graded['after'] == (10 + 11 + 11 + 10) * 2  # the king kicker's chips count, as in the game
@@ -0,0 +1,51 @@
+import combos
+from card_codes import hand_mask, parse_codes
+from planner import MAX_FRESH_SUMS, RoundPlanner, TranspositionTable, fresh_hand_sums
+
+DEFINITIONS = [
+    {'name': 'Flush', 'card_count': 5, 'check': combos.is_flush, 'score': {'base': 35, 'mult': 4}},
+    {'name': 'Pair', 'card_count': 2, 'check': combos.is_pair, 'score': {'base': 10, 'mult': 2}},
+]
+
+
+def bits(codes):
+    ids, errors = parse_codes(codes)
+    assert not errors
+    return hand_mask(ids)
+
+
+def test_estimate_is_a_clear_probability():
+    planner = RoundPlanner(DEFINITIONS, required_points=300)
+    hand = bits("Ah As 7c 4d 2s 9h Jc 3d")  # pair of aces: (10 + 22) * 2 = 64
+    assert planner.estimate(hand, 0, 1) == 0.0
+    assert planner.estimate(hand, 236, 1) == 1.0
+    two_plays = planner.estimate(hand, 0, 2)
+    scores = planner.fresh_scores
+    assert two_plays == sum(64 + score >= 300 for score in scores) / len(scores)
+    assert 0.0 < two_plays < planner.estimate(hand, 0, 3) < 1.0
+
+
+def test_table_values_do_not_leak_across_targets():
+    table = TranspositionTable(1 << 12)
+    hand = bits("Ah As 7c 4d 2s 9h Jc 3d")
+    deck = bits("Kh Kd 5c 6c 8s 10h Qd 2h 3c 4h")
+    easy = RoundPlanner(DEFINITIONS, required_points=50, table=table, seed=1)
+    assert easy.value(hand, deck, 0, 2, 1, 2) == 1.0
+    hard = RoundPlanner(DEFINITIONS, required_points=5000, table=table, seed=1)
+    assert hard.value(hand, deck, 0, 2, 1, 2) == 0.0
+
+
+def test_fresh_hand_scores_follow_the_combo_scores():
+    richer = [dict(combo_def, score={'base': combo_def['score']['base'], 'mult': 10 * combo_def['score']['mult']})
+              for combo_def in DEFINITIONS]
+    plain = RoundPlanner(DEFINITIONS).fresh_scores
+    assert RoundPlanner(DEFINITIONS).fresh_scores is plain  # sampled once per set of scores
+    assert RoundPlanner(richer).fresh_scores[-1] > plain[-1]
+
+
+def test_fresh_hand_sums_stay_bounded():
+    scores = RoundPlanner(DEFINITIONS).fresh_scores
+    assert len(fresh_hand_sums(scores, 2)) == len(scores) ** 2
+    many = fresh_hand_sums(scores, 6)
+    assert len(many) == MAX_FRESH_SUMS and many == sorted(many)
+    assert many[0] >= 6 * scores[0] and many[-1] <= 6 * scores[-1]
@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from card_codes import ids_to_cards, parse_codes
+from recommend_server import build_key
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DISCARD_IN_WORKER = """
+from types import SimpleNamespace
+import combos
+from recommend_server import build_key, _run_discard
+definitions = [{'name': 'Flush', 'card_count': 5, 'check': combos.is_flush, 'score': {'base': 35, 'mult': 4}},
+               {'name': 'Pair', 'card_count': 2, 'check': combos.is_pair, 'score': {'base': 10, 'mult': 2}}]
+key, _ = build_key('discard', {'hand': 'Ah Kh 7h 2c 5d 9s Jh 3d', 'samples': 3})
+print(_run_discard(SimpleNamespace(COMBO_DEFINITIONS=definitions), key))
+"""
+
+
+def discard_in_worker(hash_seed):
+    env = dict(os.environ, PYTHONHASHSEED=str(hash_seed), PYTHONPATH=ROOT)
+    return subprocess.run([sys.executable, '-c', DISCARD_IN_WORKER], env=env, cwd=ROOT,
+                          capture_output=True, text=True, check=True).stdout
+
+
+def test_discard_advice_is_the_same_in_every_worker():
+    assert discard_in_worker(1) == discard_in_worker(2)
+
+
+def test_discard_rejects_bad_samples_and_overlapping_deck():
+    hand = 'Ah Kh 7h 2c 5d 9s Jh 3d'
+    for body in ({'hand': hand, 'samples': 0}, {'hand': hand, 'samples': -4},
+                 {'hand': hand, 'max_discard': 0}, {'hand': hand, 'deck': 'Qh Ah 4c'}):
+        key, error = build_key('discard', body)
+        assert key is None and 'error' in error
+    key, error = build_key('discard', {'hand': hand, 'deck': 'Qh 4c', 'samples': 5})
+    assert error is None and key[-1] == 5
+
+
+def test_oversized_hands_are_rejected():
+    nine = 'Ah Kh 7h 2c 5d 9s Jh 3d 4c'
+    for endpoint in ('analyze', 'discard'):
+        key, error = build_key(endpoint, {'hand': nine})
+        assert key is None and 'at most 8' in error['error']
+    key, error = build_key('identify', {'cards': 'Ah Ad As Kh Kd Qc'})
+    assert key is None and 'at most 5' in error['error']
+
+
+def test_identify_batch_scores_every_play():
+    pytest.importorskip('flet')
+    from game_logic import BalatroPoker
+    from recommend_server import _run_identify
+    game = BalatroPoker()
+    plays = [['Ah', 'Ad'], ['Ah', 'Ad', 'Kc'], ['2c']]
+    results = _run_identify(game, [list(parse_codes(' '.join(codes))[0]) for codes in plays])
+    for codes, result in zip(plays, results):
+        cards = ids_to_cards(list(parse_codes(' '.join(codes))[0]))
+        assert result['name'] == game.identify_combo(cards)['name']
+        assert result['points'] == (result['base'] + sum(c.chip_value for c in cards)) * result['mult']
@@ -0,0 +1,107 @@
+import os
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from card_codes import ids_to_cards, parse_codes
+from replay_log import RotatingReplayWriter, combo_names, iter_records, log_files
+from replay_stats import build_report, open_columns
+
+DEFINITIONS = [{'name': 'Straight Flush'}, {'name': 'Pair'}]
+
+
+def cards(codes):
+    ids, errors = parse_codes(codes)
+    assert not errors
+    return ids_to_cards(ids)
+
+
+def combo_row(result, name):
+    return next(row for row in result['combos'] if row['combo'] == name)
+
+
+def write_log(directory, actions):
+    with RotatingReplayWriter(str(directory), DEFINITIONS) as writer:
+        for action in actions:
+            action(writer)
+
+
+def test_undone_play_does_not_count(tmp_path):
+    deal = cards("9h 10h Jh Qh Kh 2c 3d 4s")
+
+    def round_with_undo(writer):
+        rid = writer.new_round()
+        writer.log_deal(rid, deal)
+        writer.log_play(rid, deal[:5], 'Straight Flush', 320, 320)
+        writer.log_undo(rid, 0)
+        writer.log_play(rid, cards("2c 2d"), 'Pair', 50, 50)
+
+    write_log(tmp_path, [round_with_undo])
+    result = build_report([str(tmp_path)], combo_names(DEFINITIONS), required_points=300)
+    assert combo_row(result, 'Straight Flush')['plays'] == 0
+    assert combo_row(result, 'Pair')['plays'] == 1
+    straight_flush = result['clear_rate_by_hand_class'][0]
+    assert straight_flush['rounds'] == 1
+    assert straight_flush['clear_rate'] == 0.0
+
+
+def test_redo_restores_the_play(tmp_path):
+    deal = cards("9h 10h Jh Qh Kh 2c 3d 4s")
+
+    def round_with_redo(writer):
+        rid = writer.new_round()
+        writer.log_deal(rid, deal)
+        writer.log_discard(rid, deal[5:], 0)
+        writer.log_play(rid, deal[:5], 'Straight Flush', 320, 320)
+        writer.log_undo(rid, 0)
+        writer.log_redo(rid, 320)
+
+    write_log(tmp_path, [round_with_redo])
+    result = build_report([str(tmp_path)], combo_names(DEFINITIONS), required_points=300)
+    assert combo_row(result, 'Straight Flush')['plays'] == 1
+    assert result['clear_rate_by_hand_class'][0]['clear_rate'] == 1.0
+    assert result['discards']['plays_after_discard'] == 1
+
+
+def test_torn_last_record_is_ignored(tmp_path):
+    def one_round(writer):
+        rid = writer.new_round()
+        writer.log_deal(rid, cards("2c 2d 5h 7s 9c Jd Qh Ks"))
+        writer.log_play(rid, cards("2c 2d"), 'Pair', 24, 24)
+
+    write_log(tmp_path, [one_round])
+    path = log_files(str(tmp_path))[0]
+    with open(path, 'ab') as f:
+        f.write(b'\x00' * 7)
+    assert len(open_columns(path)) == 2
+    result = build_report([str(tmp_path)], combo_names(DEFINITIONS))
+    assert combo_row(result, 'Pair')['plays'] == 1
+
+
+def test_header_only_log(tmp_path):
+    write_log(tmp_path, [lambda writer: writer.log_deal(writer.new_round(), cards("2c"))])
+    path = log_files(str(tmp_path))[0]
+    with open(path, 'r+b') as f:
+        f.truncate(os.path.getsize(path) - 10)
+    assert len(open_columns(path)) == 0
+
+
+def test_redo_of_an_older_branch(tmp_path):
+    deal = cards("9h 10h Jh Qh Kh 2c 2d 4s")
+
+    def round_with_branches(writer):
+        rid = writer.new_round()
+        writer.log_deal(rid, deal)
+        writer.log_play(rid, deal[:5], 'Straight Flush', 320, 320)
+        writer.log_undo(rid, 0)
+        writer.log_play(rid, deal[5:7], 'Pair', 24, 24)
+        writer.log_undo(rid, 0)
+        writer.log_redo(rid, 320, branch=0)
+
+    write_log(tmp_path, [round_with_branches])
+    assert [record.branch for record in iter_records(str(tmp_path))][-1] == 0
+    result = build_report([str(tmp_path)], combo_names(DEFINITIONS), required_points=300)
+    assert combo_row(result, 'Straight Flush')['plays'] == 1
+    assert combo_row(result, 'Pair')['plays'] == 0
+    assert result['clear_rate_by_hand_class'][0]['clear_rate'] == 1.0
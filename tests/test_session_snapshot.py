@@ -0,0 +1,44 @@
+import pytest
+
+from session_server import Session, SessionManager
+
+
+def make_session():
+    session = Session('abc123')
+    session.hand = bytearray([0, 13, 26, 39, 5, 6, 7, 8])
+    session.deck = bytearray(range(9, 13))
+    session.played = bytearray([40, 41])
+    session.discarded = bytearray([50])
+    session.current_points = 412
+    session.required_points = 300
+    session.round_number = 7
+    session.discard_count = 2
+    session.replay_round = 70001
+    return session
+
+
+def test_snapshot_round_trip_keeps_every_field():
+    session = make_session()
+    restored = Session.from_bytes('abc123', session.to_bytes())
+    for name in ('hand', 'deck', 'played', 'discarded', 'current_points', 'required_points',
+                 'round_number', 'discard_count', 'replay_round'):
+        assert getattr(restored, name) == getattr(session, name), name
+
+
+def test_snapshot_of_another_format_is_refused():
+    data = bytearray(make_session().to_bytes())
+    data[0] = 0
+    with pytest.raises(ValueError):
+        Session.from_bytes('abc123', bytes(data))
+    with pytest.raises(ValueError):
+        Session.from_bytes('abc123', make_session().to_bytes()[:-1])
+
+
+def test_evicted_session_is_restored_with_its_replay_round(tmp_path):
+    manager = SessionManager(game=object(), max_sessions=1, snapshot_dir=str(tmp_path))
+    manager._add(make_session())
+    manager._add(Session('other1'))
+    assert 'abc123' not in manager.sessions
+    restored = manager.get('abc123')
+    assert restored.replay_round == 70001
+    assert restored.hand == make_session().hand
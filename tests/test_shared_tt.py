@@ -0,0 +1,53 @@
+import multiprocessing
+
+import pytest
+
+from shared_tt import _SLOT, SharedTranspositionTable, _pack_data
+
+
+@pytest.fixture
+def table():
+    table = SharedTranspositionTable(64)
+    yield table
+    table.close()
+
+
+def test_round_trip(table):
+    table.put(12345, 3, 0.75)
+    assert table.get(12345, 3) == 0.75
+    assert table.get(12345, 4) is None  # searched too shallow
+
+
+def test_torn_slot_reads_as_a_miss(table):
+    key = 77
+    table.put(key, 2, 0.5)
+    offset = table._offset(key)
+    checked, data = _SLOT.unpack_from(table.buf, offset)
+    # Half of the slot from another writer: the data word no longer matches the check word
+    _SLOT.pack_into(table.buf, offset, checked, _pack_data(0.9, 5, table.generation))
+    assert table.get(key, 0) is None
+
+
+def test_other_key_in_the_same_slot_is_a_miss(table):
+    table.put(5, 1, 0.25)
+    assert table.get(5 + table.size, 0) is None
+    assert table.get(5, 0) == 0.25
+
+
+def _child(name, size, results):
+    table = SharedTranspositionTable(size, name=name)
+    results.put(table.get(1, 1))
+    table.put(2, 4, 0.125)
+    table.close()
+
+
+def test_entries_are_shared_across_processes(table):
+    context = multiprocessing.get_context('fork')
+    table.put(1, 1, 0.5)
+    results = context.Queue()
+    child = context.Process(target=_child, args=(table.name, table.size, results))
+    child.start()
+    child.join(30)
+    assert child.exitcode == 0
+    assert results.get(timeout=5) == 0.5
+    assert table.get(2, 4) == 0.125
@@ -0,0 +1,59 @@
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import combos
+from card_codes import ids_to_cards, parse_codes
+from speculation import Speculator, predicted_hands
+
+DEFINITIONS = [
+    {'name': 'Flush', 'card_count': 5, 'check': combos.is_flush, 'score': {'base': 35, 'mult': 4}},
+    {'name': 'Pair', 'card_count': 2, 'check': combos.is_pair, 'score': {'base': 10, 'mult': 2}},
+]
+
+
+def cards(codes):
+    ids, errors = parse_codes(codes)
+    assert not errors
+    return ids_to_cards(ids)
+
+
+def test_one_worker_and_one_job_per_state():
+    state = {'hand': cards("Ah As 7c 4d 2s 9h Jc 3d"), 'deck': cards("Kh Kd 5c 6c 8s 10h Qd 2h")}
+    game = SimpleNamespace(game_state=state, COMBO_DEFINITIONS=DEFINITIONS)
+    threads = set()
+    speculator = Speculator(game, lambda hand: threads.add(threading.current_thread()))
+    for _ in range(5):
+        speculator.schedule()  # e.g. one redraw per click
+    assert speculator.wait(5)
+    expected = len(predicted_hands(state['hand'], state['deck'], DEFINITIONS))
+    assert speculator.computed == expected
+
+    state['hand'] = cards("Kh Kd 5c 6c 8s 10h Qd 2h")
+    state['deck'] = cards("Ah As 7c 4d 2s 9h Jc 3d")
+    speculator.schedule()
+    assert speculator.wait(5)
+    assert speculator.computed > expected
+    assert len(threads) == 1 and threading.current_thread() not in threads
+
+
+class Page:
+    def update(self):
+        pass
+
+
+def test_game_schedules_once_per_action_not_per_redraw():
+    pytest.importorskip('flet')
+    from game_logic import BalatroPoker
+    game = BalatroPoker(Page())
+    scheduled = []
+    game.speculator = SimpleNamespace(schedule=lambda: scheduled.append(list(game.game_state['hand'])),
+                                      cancel=lambda: None)
+    game.start_round()
+    for index in (0, 1, 0):
+        game.toggle_card_selection(index)  # redraws only
+    assert len(scheduled) == 1
+    game.selected_indices = [0]
+    game.play_combo()
+    assert len(scheduled) == 2 and scheduled[-1] == game.game_state['hand']
@@ -0,0 +1,18 @@
+from combos import is_flush, is_pair
+from run_engine import RunConfig, chase_strategy
+from strategies import ChaseStrategy, FunctionStrategy, evaluate
+
+DEFINITIONS = [
+    {'name': 'Flush', 'card_count': 5, 'check': is_flush, 'score': {'base': 35, 'mult': 4}},
+    {'name': 'Pair', 'card_count': 2, 'check': is_pair, 'score': {'base': 10, 'mult': 2}},
+]
+
+
+def test_plain_function_policy_matches_its_registered_strategy():
+    config = RunConfig(antes=1)
+    report = evaluate([ChaseStrategy(), FunctionStrategy(chase_strategy, 'chase-function')], 6,
+                      DEFINITIONS, config, workers=1, chunk=4)
+    registered, function = report['chase'], report['chase-function']
+    assert registered['runs'] == function['runs'] == 6
+    assert registered['survival'] == function['survival']
+    assert registered['mean_total_score'] == function['mean_total_score']
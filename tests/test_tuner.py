@@ -0,0 +1,42 @@
+import pytest
+
+from combos import is_flush, is_pair
+from run_engine import RunConfig
+from tuner import Tuner, params_key
+
+DEFINITIONS = [
+    {'name': 'Flush', 'card_count': 5, 'check': is_flush, 'score': {'base': 35, 'mult': 4}},
+    {'name': 'Pair', 'card_count': 2, 'check': is_pair, 'score': {'base': 10, 'mult': 2}},
+]
+SPACE = {'pace': [1.0, 1.5]}
+
+
+def make_tuner(checkpoint, seed=0, antes=1, chunk=5):
+    return Tuner('weighted', DEFINITIONS, SPACE, RunConfig(antes=antes), min_runs=chunk, max_runs=2 * chunk,
+                 eta=2, chunk=chunk, workers=1, seed=seed, checkpoint=str(checkpoint))
+
+
+def test_checkpoint_resumes_without_replaying(tmp_path):
+    checkpoint = tmp_path / 'tune.json'
+    first = make_tuner(checkpoint)
+    best = first.grid_search()
+    resumed = make_tuner(checkpoint)
+    assert resumed.stats(best) == first.stats(best)
+    assert resumed.evaluate([best], 10) == 0
+
+
+@pytest.mark.parametrize('changes', [{'seed': 1}, {'antes': 2}, {'chunk': 10}])
+def test_checkpoint_with_other_settings_is_refused(tmp_path, changes):
+    checkpoint = tmp_path / 'tune.json'
+    make_tuner(checkpoint).grid_search()
+    with pytest.raises(ValueError):
+        make_tuner(checkpoint, **changes)
+
+
+def test_stats_only_count_chunks_of_the_own_seeds(tmp_path):
+    tuner = make_tuner(tmp_path / 'tune.json', seed=1)
+    params = {'pace': 1.0}
+    base = tuner.seeds(1)[0]
+    tuner.chunks[params_key(params)] = {0: [50.0, 500.0, 5], base: [10.0, 20.0, 5]}
+    assert tuner.stats(params, 5) == (2.0, 0.0, 5)
+    assert tuner.stats(params)[2] == 5
@@ -0,0 +1,311 @@
+# Tuning parameter strategi: grid, random dan evolutionary search dengan simulasi paralel
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from combos import definitions_signature
+from run_engine import ANTE_TARGETS, RunConfig
+from strategies import STRATEGIES, get_strategy, play_runs
+
+METRICS = ('blinds_cleared', 'total_score', 'won')
+
+
+def params_key(params):
+    return json.dumps(params, sort_keys=True)
+
+
+def grid_candidates(space, steps=3):
+    """Every combination of `steps` evenly spaced values per range (choices as given)"""
+    axes = []
+    for name, domain in sorted(space.items()):
+        if isinstance(domain, list):
+            values = domain
+        else:
+            low, high = domain
+            values = [low + (high - low) * i / (steps - 1) for i in range(steps)] if steps > 1 else [low]
+            if isinstance(low, int) and isinstance(high, int):
+                values = sorted(set(round(v) for v in values))
+        axes.append([(name, v) for v in values])
+    return [dict(combo) for combo in itertools.product(*axes)]
+
+
+def random_params(space, rng):
+    params = {}
+    for name, domain in sorted(space.items()):
+        if isinstance(domain, list):
+            params[name] = rng.choice(domain)
+        elif isinstance(domain[0], int) and isinstance(domain[1], int):
+            params[name] = rng.randint(*domain)
+        else:
+            params[name] = round(rng.uniform(*domain), 4)
+    return params
+
+
+def mutate(params, space, rng, rate=0.2):
+    """Gaussian step (sigma = rate * range) on every range, re-draw of a choice with probability rate"""
+    child = dict(params)
+    for name, domain in sorted(space.items()):
+        if isinstance(domain, list):
+            if rng.random() < rate:
+                child[name] = rng.choice(domain)
+            continue
+        low, high = domain
+        value = min(max(child[name] + rng.gauss(0, rate * (high - low)), low), high)
+        child[name] = round(value) if isinstance(low, int) and isinstance(high, int) else round(value, 4)
+    return child
+
+
+def crossover(a, b, rng):
+    return {name: (a if rng.random() < 0.5 else b)[name] for name in sorted(a)}
+
+
+def _describe(modifier):
+    """Stable text for a scoring modifier (functions by name, combos sorted)"""
+    fields = []
+    for name, value in sorted(vars(modifier).items()):
+        if callable(value):
+            value = getattr(value, '__qualname__', type(value).__name__)
+        elif isinstance(value, (set, frozenset, list, tuple)):
+            value = sorted(value)
+        fields.append(f"{name}={value!r}")
+    return f"{type(modifier).__name__}({', '.join(fields)})"
+
+
+def _evaluate_chunk(task):
+    key, strategy_name, params, seeds, config, combo_definitions, metric = task
+    results, _ = play_runs(get_strategy(strategy_name, **params), seeds, config, combo_definitions)
+    values = [float(result[metric]) for result in results]
+    return key, seeds[0], sum(values), sum(v * v for v in values), len(values)
+
+
+class Tuner:
+    """Searches a strategy's parameters with the full-run simulator as the objective.
+
+    Every candidate plays the same seeds (common random numbers), in chunks
+    of `chunk` runs spread over a process pool. Candidates are compared by
+    successive halving: all start with min_runs runs, the best 1/eta move on
+    with eta times as many runs, up to max_runs, so hopeless candidates stop
+    early. Finished chunks are saved to the JSON checkpoint after each rung;
+    re-running the same search with the checkpoint skips them.
+    """
+
+    def __init__(self, strategy_name, combo_definitions, space=None, config=None, metric='blinds_cleared',
+                 min_runs=20, max_runs=540, eta=3, chunk=20, workers=None, seed=0, checkpoint=None):
+        if metric not in METRICS:
+            raise ValueError(f"Unknown metric: {metric} (use one of {METRICS})")
+        if min_runs % chunk or max_runs % chunk:
+            raise ValueError("min_runs and max_runs must be multiples of chunk")
+        self.strategy_name = strategy_name
+        self.combo_definitions = combo_definitions
+        self.space = space if space is not None else get_strategy(strategy_name).SPACE
+        self.config = config or RunConfig()
+        self.metric = metric
+        self.min_runs = min_runs
+        self.max_runs = max_runs
+        self.eta = eta
+        self.chunk = chunk
+        self.workers = workers or os.cpu_count()
+        self.seed = seed
+        self.checkpoint = checkpoint
+        self.chunks = {}  # params key -> {first seed: [sum, sum of squares, runs]}
+        self.history = []
+        if checkpoint and os.path.exists(checkpoint):
+            self.load()
+
+    # ---- Checkpoints ------------------------------------------------------------------------
+
+    def settings(self):
+        """Everything a finished chunk depends on; a checkpoint only resumes under the same settings"""
+        config = self.config
+        return {'strategy': self.strategy_name, 'metric': self.metric, 'seed': self.seed, 'chunk': self.chunk,
+                'definitions': definitions_signature(self.combo_definitions),
+                'config': {'antes': config.antes, 'ante_targets': list(config.ante_targets),
+                           'blinds': [list(blind) for blind in config.blinds], 'plays': config.plays,
+                           'discards': config.discards, 'hand_size': config.hand_size,
+                           'carry_deck': config.carry_deck, 'deck': sorted(config.deck_config.card_ids()),
+                           'modifiers': [_describe(modifier) for modifier in config.modifiers]}}
+
+    def load(self):
+        with open(self.checkpoint) as f:
+            data = json.load(f)
+        saved = data.get('settings') or {}
+        current = self.settings()
+        differ = sorted(key for key in current if saved.get(key) != current[key])
+        if differ:
+            raise ValueError(f"Checkpoint {self.checkpoint} was made with other settings: {', '.join(differ)}")
+        self.chunks = {key: {int(first): stats for first, stats in chunks.items()}
+                       for key, chunks in data['chunks'].items()}
+        self.history = data.get('history', [])
+
+    def save(self):
+        if not self.checkpoint:
+            return
+        data = {'settings': self.settings(), 'space': self.space,
+                'chunks': self.chunks, 'history': self.history, 'best': self.leaderboard(1)}
+        temp = self.checkpoint + '.tmp'
+        with open(temp, 'w') as f:
+            json.dump(data, f)
+        os.replace(temp, self.checkpoint)
+
+    # ---- Evaluation -------------------------------------------------------------------------
+
+    def seeds(self, runs):
+        return [self.seed * 1000003 + i for i in range(runs)]
+
+    def stats(self, params, runs=None):
+        """(mean, standard error, runs) of a candidate over its finished chunks among the first `runs` seeds"""
+        base = self.seeds(1)[0]
+        chunks = [c for first, c in self.chunks.get(params_key(params), {}).items()
+                  if base <= first < base + (self.max_runs if runs is None else runs)]
+        total = sum(c[0] for c in chunks)
+        total_sq = sum(c[1] for c in chunks)
+        n = sum(c[2] for c in chunks)
+        if not n:
+            return None, None, 0
+        mean = total / n
+        variance = max(total_sq / n - mean * mean, 0.0)
+        return mean, math.sqrt(variance / n), n
+
+    def evaluate(self, candidates, runs):
+        """Make sure every candidate has played the first `runs` seeds"""
+        seeds = self.seeds(runs)
+        tasks = []
+        for params in candidates:
+            key = params_key(params)
+            done = self.chunks.setdefault(key, {})
+            for start in range(0, runs, self.chunk):
+                batch = seeds[start:start + self.chunk]
+                if batch[0] not in done:
+                    tasks.append((key, self.strategy_name, params, batch, self.config,
+                                  self.combo_definitions, self.metric))
+        if self.workers == 1:
+            finished = map(_evaluate_chunk, tasks)
+            for key, first, total, total_sq, n in finished:
+                self.chunks[key][first] = [total, total_sq, n]
+        elif tasks:
+            with ProcessPoolExecutor(max_workers=self.workers) as pool:
+                for key, first, total, total_sq, n in pool.map(_evaluate_chunk, tasks):
+                    self.chunks[key][first] = [total, total_sq, n]
+        return len(tasks)
+
+    def successive_halving(self, candidates, survivors=1):
+        """Rank candidates with growing run budgets; returns the last rung's candidates, best first"""
+        unique = {params_key(p): p for p in candidates}
+        alive = list(unique.values())
+        runs = self.min_runs
+        while True:
+            played = self.evaluate(alive, runs)
+            # Same seeds for every candidate, even those with more runs from earlier searches
+            alive.sort(key=lambda p: -self.stats(p, runs)[0])
+            best = self.stats(alive[0], runs)
+            self.history.append({'runs': runs, 'candidates': len(alive), 'chunks_played': played,
+                                 'best': alive[0], 'best_mean': round(best[0], 4)})
+            self.save()
+            print(f"  {len(alive)} candidates x {runs} runs: best {self.metric} {best[0]:.3f} "
+                  f"(+-{best[1]:.3f}) {alive[0]}", flush=True)
+            if runs >= self.max_runs or len(alive) <= survivors:
+                return alive
+            alive = alive[:max(survivors, math.ceil(len(alive) / self.eta))]
+            runs = min(runs * self.eta, self.max_runs)
+
+    # ---- Searches ---------------------------------------------------------------------------
+
+    def grid_search(self, steps=3):
+        return self.successive_halving(grid_candidates(self.space, steps))[0]
+
+    def random_search(self, samples=27):
+        rng = random.Random(self.seed)
+        return self.successive_halving([random_params(self.space, rng) for _ in range(samples)])[0]
+
+    def evolve(self, generations=5, population=12, parents=3, mutation=0.2, start=None):
+        """Evolutionary search: each generation is ranked by successive halving; the best `parents`
+        carry over and breed the rest by crossover and mutation"""
+        rng = random.Random(self.seed)
+        pool = [dict(start)] if start else []
+        while len(pool) < population:
+            pool.append(random_params(self.space, rng))
+        elite = []
+        for generation in range(generations):
+            print(f"generation {generation + 1}/{generations}", flush=True)
+            ranked = self.successive_halving(pool, survivors=parents)
+            elite = ranked[:parents]
+            pool = list(elite)
+            while len(pool) < population:
+                a, b = rng.sample(elite, 2) if len(elite) > 1 else (elite[0], elite[0])
+                pool.append(mutate(crossover(a, b, rng), self.space, rng, mutation))
+        return elite[0]
+
+    def leaderboard(self, top=10):
+        """Best candidates so far, preferring those with the most runs"""
+        rows = []
+        for key in self.chunks:
+            mean, error, n = self.stats(json.loads(key))
+            if n:
+                rows.append({'params': json.loads(key), 'mean': round(mean, 4),
+                             'stderr': round(error, 4), 'runs': n})
+        rows.sort(key=lambda row: (-row['runs'], -row['mean']))
+        return rows[:top]
+
+
+def parse_space(items):
+    """name=low:high ranges and name=a,b,c choices from the command line"""
+    space = {}
+    for item in items:
+        name, _, domain = item.partition('=')
+        if ':' in domain:
+            low, high = domain.split(':')
+            space[name] = (int(low), int(high)) if low.lstrip('-').isdigit() and high.lstrip('-').isdigit() \
+                else (float(low), float(high))
+        elif domain:
+            space[name] = [json.loads(value) for value in domain.split(',')]
+        else:
+            raise ValueError(f"Bad parameter range: {item} (use name=low:high or name=a,b,c)")
+    return space
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tune a strategy's parameters with parallel full-run simulations")
+    parser.add_argument('--strategy', default='weighted', help=f"one of {sorted(STRATEGIES)} or module:Class")
+    parser.add_argument('--method', choices=('grid', 'random', 'evolve'), default='evolve')
+    parser.add_argument('--param', action='append', default=[],
+                        help="search range, name=low:high or name=a,b,c (default: the strategy's SPACE)")
+    parser.add_argument('--metric', choices=METRICS, default='blinds_cleared')
+    parser.add_argument('--steps', type=int, default=3, help="grid points per range")
+    parser.add_argument('--samples', type=int, default=27, help="random search candidates")
+    parser.add_argument('--generations', type=int, default=5)
+    parser.add_argument('--population', type=int, default=12)
+    parser.add_argument('--min-runs', type=int, default=20)
+    parser.add_argument('--max-runs', type=int, default=540)
+    parser.add_argument('--eta', type=int, default=3, help="keep 1/eta of the candidates per rung")
+    parser.add_argument('--chunk', type=int, default=20, help="runs per worker task")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--antes', type=int, default=len(ANTE_TARGETS))
+    parser.add_argument('--checkpoint', default=None, help="JSON file to save and resume progress")
+    args = parser.parse_args()
+
+    from game_logic import BalatroPoker
+    try:
+        space = parse_space(args.param) if args.param else None
+        tuner = Tuner(args.strategy, BalatroPoker.COMBO_DEFINITIONS, space, RunConfig(antes=args.antes),
+                      args.metric, args.min_runs, args.max_runs, args.eta, args.chunk, args.workers,
+                      args.seed, args.checkpoint)
+    except (ValueError, ImportError, AttributeError) as e:
+        parser.error(str(e))
+    if args.method == 'grid':
+        best = tuner.grid_search(args.steps)
+    elif args.method == 'random':
+        best = tuner.random_search(args.samples)
+    else:
+        best = tuner.evolve(args.generations, args.population)
+    mean, error, runs = tuner.stats(best)
+    print(f"best {args.metric}: {mean:.3f} (+-{error:.3f}, {runs} runs)")
+    print(json.dumps(best, sort_keys=True))
+
+
+if __name__ == "__main__":
+    main()